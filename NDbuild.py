@@ -0,0 +1,129 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+import NDdata
+import NDpaths
+import NDtable
+
+## 派生数据集的构建
+## 由nndc导出数据生成NuclidesClassifiedHalflife.json、NuclidesClassifiedDecayModes.json及haveDecayPage.json
+## 导出数据经NDcache读取，只解析一次(其二进制缓存有效时无需解析)，各核素的紧凑json直接取自其字符串表
+## 构建状态中记录各核素数据的哈希及分类结果，导出数据更新后只对新增及内容变化的核素重新分类
+## haveDecayPage为nndc网站上是否有该核素的衰变页面，无法由导出数据得到：已有的核素沿用原值，新增的记为False并在结果中列出
+## 各派生文件先写入临时文件再替换，内容未变的不重写
+
+BUILD_STATE_VERSION = 1
+build_state_path = NDpaths.cachePath("derived_state.json")
+
+nuclides_data_path = NDpaths.nuclides_data_path
+data_NuclidesClassifiedHalflife_path = NDpaths.data_NuclidesClassifiedHalflife_path
+data_NuclidesClassifiedDecayModes_path = NDpaths.data_NuclidesClassifiedDecayModes_path
+haveDecayPage_path = NDpaths.haveDecayPage_path
+
+## 单个核素的分类：(半衰期分类, 主要衰变模式)，同NDfilter.nuclidesClassifyHalflife()及nuclidesClassifyDecayMode()
+def classifyNuclide(name, data):
+    ground = NDtable.GroundState(name, data)
+    return ground.halflife_type, ground.dominant_mode
+
+## 构建状态：{"version", "export_hash", "outputs", "nuclides": {名称: [哈希, 半衰期分类, 主要衰变模式]}}
+def readState(state_path):
+    try:
+        with open(state_path, "r", encoding="utf-8") as file:
+            state = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if state.get("version") != BUILD_STATE_VERSION:
+        return None
+    return state
+
+## 内容有变化时先写入临时文件再替换，返回是否写入
+def writeTextAtomic(path, text):
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as file:
+            if file.read() == text:
+                return False
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8", newline="") as file:
+        file.write(text)
+    os.replace(tmp_path, path)
+    return True
+
+## 构建全部派生数据集，返回本次构建的摘要
+## force为True时忽略构建状态，全部重新分类
+def buildDerived(export_path=nuclides_data_path, halflife_path=data_NuclidesClassifiedHalflife_path, decaymodes_path=data_NuclidesClassifiedDecayModes_path, decay_page_path=haveDecayPage_path, state_path=build_state_path, force=False):
+    start = time.perf_counter()
+    nuclides_data = NDdata.getNuclides(export_path)
+    outputs = (halflife_path, decaymodes_path, decay_page_path)
+
+    state = None if force else readState(state_path)
+    previous = {} if state is None else state["nuclides"]
+    summary = {"nuclides": len(nuclides_data), "reclassified": 0, "added": 0, "changed": 0, "removed": 0, "written": [], "decay_page_missing": []}
+
+    ## 导出数据及派生文件均未变化时无需再比较各核素
+    if not state is None and state.get("export_hash") == nuclides_data.content_hash and state.get("outputs") == list(outputs) and all(os.path.exists(path) for path in outputs):
+        summary["sec"] = time.perf_counter() - start
+        return summary
+
+    entries = {}
+    for name in nuclides_data:
+        digest = nuclides_data.recordHash(name)
+        old = previous.get(name)
+        if not old is None and old[0] == digest:
+            entries[name] = old
+            continue
+        ## 只解析需要重新分类的核素
+        entries[name] = [digest, *classifyNuclide(name, nuclides_data[name])]
+        summary["reclassified"] += 1
+        if old is None:
+            summary["added"] += 1
+        else:
+            summary["changed"] += 1
+    summary["removed"] = sum(1 for name in previous if not name in entries)
+
+    ## 已有的衰变页面记录沿用，新增的核素记为False
+    decay_pages = NDdata.loadJson(decay_page_path) if os.path.exists(decay_page_path) else {}
+    have_decay_page = {}
+    for name in nuclides_data:
+        if not name in decay_pages:
+            summary["decay_page_missing"].append(name)
+        have_decay_page[name] = bool(decay_pages.get(name, False))
+
+    ## 派生文件的格式同原先的文件(json.dump的默认格式)，核素按导出数据中的顺序
+    ## Z、N取自核素表的列，沿用分类的核素无需解析
+    table = nuclides_data.table
+    halflife_rows = []
+    decaymode_rows = []
+    for idx, name in enumerate(nuclides_data):
+        z = int(table.z[idx])
+        n = int(table.n[idx])
+        halflife_rows.append({"z": z, "n": n, "type": entries[name][1]})
+        decaymode_rows.append({"z": z, "n": n, "type": entries[name][2]})
+    texts = {
+        halflife_path: json.dumps(halflife_rows),
+        decaymodes_path: json.dumps(decaymode_rows),
+        decay_page_path: json.dumps(have_decay_page)
+    }
+    for path, text in texts.items():
+        if writeTextAtomic(path, text):
+            summary["written"].append(path)
+
+    ## 构建状态最后写入，中途出错时下次构建重新比较
+    writeTextAtomic(state_path, json.dumps({"version": BUILD_STATE_VERSION, "export_hash": nuclides_data.content_hash, "outputs": list(outputs), "nuclides": entries}, separators=(",", ":")))
+    summary["sec"] = time.perf_counter() - start
+    return summary
+
+## 用法：python NDbuild.py [--export 导出数据] [--force]
+## 派生文件写入data目录，构建摘要以json写到标准输出
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="由nndc导出数据构建派生数据集")
+    parser.add_argument("--export", default=nuclides_data_path)
+    parser.add_argument("--force", action="store_true")
+    args = parser.parse_args()
+
+    summary = buildDerived(args.export, force=args.force)
+    json.dump(summary, sys.stdout, ensure_ascii=False, indent=2)
+    print()
@@ -0,0 +1,167 @@
+import hashlib
+import json
+import os
+import tempfile
+from collections.abc import Mapping
+
+import numpy as np
+
+import NDpaths
+import NDtable
+
+## nndc导出数据的二进制缓存
+## 核素表的各列保存为npz中的numpy数组，各核素的原始数据以紧凑json写入一段字节串(字符串表)，
+## 读取时按需解析单个核素，不再对整个2MB的json进行解析
+## 缓存中记录源json的sha256，源文件变化后自动重建
+## 缓存文件名含源json绝对路径的短哈希，不同目录中的同名导出数据各自缓存
+## data目录中的导出数据缓存于data/cache，其余的缓存于用户的缓存目录(NDpaths.user_cache_dir)
+## 缓存文件的权限同普通新建的文件(按umask)，可供其他用户读取
+
+CACHE_VERSION = 2
+cache_dir = NDpaths.cache_dir
+user_cache_dir = os.path.join(NDpaths.user_cache_dir, "exports")
+
+## 进程的umask，读取时须先设置，只在导入时读取一次
+_umask = os.umask(0o022)
+os.umask(_umask)
+
+def cachePathOf(json_path):
+    name = os.path.splitext(os.path.basename(json_path))[0]
+    path_hash = hashlib.sha1(os.path.abspath(json_path).encode("utf-8")).hexdigest()[:12]
+    directory = cache_dir if NDpaths.isPackageData(json_path) else user_cache_dir
+    return os.path.join(directory, f"{name}-{path_hash}.npz")
+
+def fileHash(path):
+    with open(path, "rb") as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+## 按需解析的核素数据，可当作nuclides_data字典使用(只读)
+## 各核素解析一次后保留，同一核素多次取得的是同一个字典对象
+class NuclidesData(Mapping):
+    def __init__(self, names, blob, offsets, content_hash):
+        self.names = list(names)
+        self.name_idx = {name: idx for idx, name in enumerate(self.names)}
+        self.content_hash = content_hash
+        self._blob = blob
+        self._offsets = offsets
+        self._parsed = [None] * len(self.names)
+        self._hashes = [None] * len(self.names)
+        self.table = None
+
+    def __getitem__(self, name):
+        idx = self.name_idx[name]
+        data = self._parsed[idx]
+        if data is None:
+            data = json.loads(self._blob[self._offsets[idx]:self._offsets[idx + 1]])
+            self._parsed[idx] = data
+        return data
+
+    ## 核素数据的紧凑json文本，直接取自字符串表，无需解析
+    def recordJson(self, name):
+        idx = self.name_idx[name]
+        return self._blob[self._offsets[idx]:self._offsets[idx + 1]].decode("utf-8")
+
+    ## 核素数据的sha1(紧凑json)，计算一次后保留，比较两份数据时相同的核素无需解析
+    def recordHash(self, name):
+        idx = self.name_idx[name]
+        digest = self._hashes[idx]
+        if digest is None:
+            digest = hashlib.sha1(self._blob[self._offsets[idx]:self._offsets[idx + 1]]).hexdigest()
+            self._hashes[idx] = digest
+        return digest
+
+    def __contains__(self, name):
+        return name in self.name_idx
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+## 字符串表：各核素数据的紧凑json依次拼接，offsets为各段起止位置
+def packRecords(nuclides_data):
+    records = [json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8") for data in nuclides_data.values()]
+    offsets = np.zeros(len(records) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(record) for record in records])
+    return b"".join(records), offsets
+
+## 将nndc导出的json转换为二进制缓存
+def buildCache(json_path, cache_path=None):
+    if cache_path is None:
+        cache_path = cachePathOf(json_path)
+
+    with open(json_path, "rb") as file:
+        raw = file.read()
+    content_hash = hashlib.sha256(raw).hexdigest()
+    nuclides_data = json.loads(raw)
+    table = NDtable.NuclidesTable(nuclides_data)
+
+    blob, offsets = packRecords(nuclides_data)
+
+    arrays = table.columns()
+    arrays["names"] = np.array(list(nuclides_data.keys()), dtype=str)
+    arrays["decay_modes"] = np.array(table.decay_modes, dtype=str)
+    arrays["records"] = np.frombuffer(blob, dtype=np.uint8)
+    arrays["record_offsets"] = offsets
+    arrays["content_hash"] = np.array(content_hash)
+    arrays["version"] = np.array(CACHE_VERSION)
+
+    ## 临时文件名各不相同，多个进程同时构建时互不覆盖，最后替换的为准
+    cache_dir_of = os.path.dirname(cache_path) or "."
+    os.makedirs(cache_dir_of, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir_of, prefix=".tmp", suffix=".npz")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            np.savez(file, **arrays)
+        ## mkstemp所建的文件仅所有者可读写，替换前改为普通文件的权限
+        os.chmod(tmp_path, 0o644 & ~_umask)
+        os.replace(tmp_path, cache_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    return cache_path
+
+def readCache(cache_path):
+    with np.load(cache_path, allow_pickle=False) as npz:
+        arrays = {key: npz[key] for key in npz.files}
+    if int(arrays["version"]) != CACHE_VERSION:
+        return None
+    return arrays
+
+## 读取nndc导出数据，返回NuclidesData；缓存不存在或过期时重建
+## 缓存目录不可写时直接由json构建，不影响使用
+def loadNuclides(json_path):
+    content_hash = fileHash(json_path)
+    cache_path = cachePathOf(json_path)
+
+    arrays = None
+    if os.path.exists(cache_path):
+        try:
+            arrays = readCache(cache_path)
+        except (OSError, ValueError, KeyError):
+            arrays = None
+        if not arrays is None and str(arrays["content_hash"]) != content_hash:
+            arrays = None
+
+    if arrays is None:
+        try:
+            buildCache(json_path, cache_path)
+            arrays = readCache(cache_path)
+        except OSError:
+            arrays = None
+
+    if arrays is None:
+        with open(json_path, "r", encoding="utf-8") as file:
+            nuclides_data = json.load(file)
+        blob, offsets = packRecords(nuclides_data)
+        data = NuclidesData(nuclides_data.keys(), blob, offsets, content_hash)
+        data._parsed = list(nuclides_data.values())
+        data.table = NDtable.NuclidesTable(data)
+    else:
+        data = NuclidesData(arrays["names"].tolist(), arrays["records"].tobytes(), arrays["record_offsets"], content_hash)
+        data.table = NDtable.NuclidesTable.fromColumns(data, data.names, arrays["decay_modes"].tolist(), arrays)
+
+    NDtable.registerTable(data.table)
+    return data
@@ -0,0 +1,410 @@
+import importlib.util
+import io
+import os
+import struct
+
+import numpy as np
+
+import NDplot
+
+## 不经过matplotlib的核素图绘制，用于无显示信息(text_mode=0)的核素图：只有方块、坐标轴及图例
+## 版面由NDplot.chartLayout()计算，与nucildesChartPlotPLT()一致；坐标轴、刻度及图例的尺寸取matplotlib的默认值
+## svg中同一行相邻的同色方块合并为一个矩形，每种颜色一个path；png由颜色网格按像素复制得到
+## 文字的字体同NDplot：坐标轴标题为NDplot.label_font，其余为matplotlib的默认字体
+## 字体文件由matplotlib.font_manager按与matplotlib相同的规则查找(未找到时同样退回DejaVu Sans)，字形度量及png上的文字由PIL提供
+
+CHART_FORMATS = ("svg", "png")
+
+## matplotlib的默认参数，长度单位为磅，图例的各项为字号的倍数
+SUBPLOT_BOX = (0.125, 0.11, 0.9, 0.88)
+SPINE_WIDTH = 0.8
+TICK_LENGTH = 3.5
+TICK_PAD = 3.5
+LABEL_PAD = 4.0
+LEGEND_BORDERPAD = 0.4
+LEGEND_LABELSPACING = 0.5
+LEGEND_HANDLELENGTH = 2.0
+LEGEND_HANDLEHEIGHT = 0.7
+LEGEND_HANDLETEXTPAD = 0.8
+LEGEND_BORDERAXESPAD = 0.5
+LEGEND_ROUNDING = 0.2
+LEGEND_ALPHA = 0.8
+LEGEND_EDGECOLOR = (204, 204, 204)
+LEGEND_EDGEWIDTH = 1.0
+
+FONT_FILE = "DejaVuSans.ttf"
+FONT_FAMILY = "DejaVu Sans"
+LABEL_FONT_FAMILY = NDplot.label_font
+
+## svg中各字体的通用字体族，查看时未安装该字体则使用通用字体族
+FONT_GENERIC = {FONT_FAMILY: "sans-serif", LABEL_FONT_FAMILY: "serif"}
+
+## 各字体的文件路径，family为None时为matplotlib的默认字体
+_font_paths = {}
+
+def fontPath(family=None):
+    if not family in _font_paths:
+        try:
+            from matplotlib import font_manager
+            properties = font_manager.FontProperties() if family is None else font_manager.FontProperties(family=family)
+            _font_paths[family] = font_manager.findfont(properties)
+        except ImportError:
+            _font_paths[family] = None
+    return _font_paths[family]
+
+## 字体文件依次取matplotlib查找到的、matplotlib自带的(不导入matplotlib)及系统中的DejaVu Sans
+def fontPaths(family=None):
+    paths = []
+    path = fontPath(family)
+    if not path is None:
+        paths.append(path)
+    spec = importlib.util.find_spec("matplotlib")
+    if not spec is None and not spec.origin is None:
+        paths.append(os.path.join(os.path.dirname(spec.origin), "mpl-data", "fonts", "ttf", FONT_FILE))
+    paths.append(FONT_FILE)
+    return paths
+
+## 字体OS/2表中的排版上下沿(sTypoAscender、sTypoDescender)，以字号(em)为单位
+## matplotlib以其作为每行文本高度的下限
+def fontTypoMetrics(path):
+    with open(path, "rb") as file:
+        data = file.read()
+    tables = {}
+    num_tables = struct.unpack(">H", data[4:6])[0]
+    for idx in range(num_tables):
+        tag, _, offset, _ = struct.unpack(">4sIII", data[12 + 16 * idx:28 + 16 * idx])
+        tables[tag] = offset
+    units_per_em = struct.unpack(">H", data[tables[b"head"] + 18:tables[b"head"] + 20])[0]
+    ascender, descender = struct.unpack(">hh", data[tables[b"OS/2"] + 68:tables[b"OS/2"] + 72])
+    return ascender / units_per_em, -descender / units_per_em
+
+## 按字体及像素字号缓存的字体及其排版上下沿，均找不到时使用PIL的默认字体
+_fonts = {}
+
+def fontGet(size_px, family=None):
+    return fontEntryGet(size_px, family)[0]
+
+def fontEntryGet(size_px, family=None):
+    from PIL import ImageFont
+
+    key = (family, size_px)
+    if not key in _fonts:
+        for path in fontPaths(family):
+            try:
+                _fonts[key] = (ImageFont.truetype(path, size_px), fontTypoMetrics(path))
+                break
+            except (OSError, KeyError, struct.error):
+                pass
+        else:
+            _fonts[key] = (ImageFont.load_default(size_px), (0., 0.))
+    return _fonts[key]
+
+## 文本的排版度量(像素)：字形左右边界(相对于起笔点)、步进宽度及上下沿
+## 上下沿同matplotlib，取字形边界与字体排版上下沿中较大者
+def textMetrics(text, size_px, family=None):
+    font, (typo_ascent, typo_descent) = fontEntryGet(size_px, family)
+    x0, top, x1, bottom = font.getbbox(text, anchor="ls")
+    return x0, x1, font.getlength(text), max(-top, typo_ascent * size_px), max(bottom, typo_descent * size_px)
+
+## 文本项：(文本, 起笔点x, 基线y, 像素字号, 对齐方式, 是否竖排, 字体)
+## 对齐方式仅供svg使用，起笔点已按字形边界对齐；字体为None时为matplotlib的默认字体
+def textItem(text, x, y, size_px, ha="left", va="baseline", rotated=False, family=None):
+    x0, x1, advance, ascent, descent = textMetrics(text, size_px, family)
+    if ha == "left":
+        offset = -x0
+    elif ha == "right":
+        offset = -x1
+    else:
+        offset = -(x0 + x1) / 2
+
+    if va == "top":
+        baseline = y + ascent
+    elif va == "center_baseline":
+        baseline = y + ascent / 2
+    elif va == "bottom":
+        baseline = y - descent
+    else:
+        baseline = y
+
+    ## 竖排的文本逆时针旋转90度，自下而上书写，x为旋转后下沿(右侧)的位置
+    if rotated:
+        return (text, x - descent, y - offset, size_px, ha, True, family)
+    return (text, x + offset, baseline, size_px, ha, False, family)
+
+## 核素图的各元素在图片中的位置，单位为像素，原点在左上角
+## raster为True时图片大小取整(同matplotlib的png输出)
+def chartGeometry(plot_mode=0, area=((0,0),(118,177)), text_mode=0, have_legend=True, raster=False):
+    layout = NDplot.chartLayout(area, text_mode)
+    dpi = layout["dpi"]
+    pt = dpi / 72
+
+    fig_width = layout["figsize"][0] * dpi
+    fig_height = layout["figsize"][1] * dpi
+    if raster:
+        width = int(fig_width)
+        height = int(fig_height)
+    else:
+        width = fig_width
+        height = fig_height
+
+    ## 坐标轴位置，同matplotlib的默认子图边距
+    left = SUBPLOT_BOX[0] * fig_width
+    right = SUBPLOT_BOX[2] * fig_width
+    bottom = height - SUBPLOT_BOX[1] * fig_height
+    top = height - SUBPLOT_BOX[3] * fig_height
+
+    ## 数据坐标(英寸)到像素
+    x_lo, x_hi = layout["xlim_shown"]
+    y_lo, y_hi = layout["ylim_shown"]
+    def xpx(x):
+        return left + (np.asarray(x) - x_lo) / (x_hi - x_lo) * (right - left)
+    def ypx(y):
+        return bottom - (np.asarray(y) - y_lo) / (y_hi - y_lo) * (bottom - top)
+
+    z_min, n_min, z_max, n_max = layout["area"]
+    area_ysize, area_xsize = layout["area_size"]
+    color_data = np.full((area_ysize, area_xsize, 3), 255, dtype=np.uint8)
+    NDplot.nucildesChartPlotPLTColor(color_data, plot_mode, z_min, n_min, z_max, n_max)
+
+    geometry = {
+        "dpi": dpi,
+        "width": width,
+        "height": height,
+        "axes": (left, top, right, bottom),
+        "color_data": color_data,
+        "xedges": xpx(layout["xposg"] / dpi),
+        "yedges": ypx(layout["yposg"] / dpi),
+        "edge_width": layout["edge_linewidth"] * pt,
+        "spine_width": SPINE_WIDTH * pt,
+        "tick_length": TICK_LENGTH * pt,
+        "xticks": xpx(layout["xtickspos"]),
+        "yticks": ypx(layout["ytickspos"]),
+        "texts": [],
+        "legend": None
+    }
+
+    ## 刻度文字
+    tick_px = layout["fontsize_ticks"] * pt
+    tick_out = (TICK_LENGTH + TICK_PAD) * pt
+    texts = geometry["texts"]
+    ticklabels_bottom = bottom
+    for tick, x in zip(layout["xticks"], geometry["xticks"]):
+        texts.append(textItem(str(tick), x, bottom + tick_out, tick_px, "center", "top"))
+        _, _, _, ascent, descent = textMetrics(str(tick), tick_px)
+        ticklabels_bottom = max(ticklabels_bottom, bottom + tick_out + ascent + descent)
+    ticklabels_left = left
+    for tick, y in zip(layout["yticks"], geometry["yticks"]):
+        item = textItem(str(tick), left - tick_out, y, tick_px, "right", "center_baseline")
+        texts.append(item)
+        ticklabels_left = min(ticklabels_left, item[1] + textMetrics(item[0], tick_px)[0])
+
+    ## 坐标轴标题位于刻度文字之外
+    label_px = layout["fontsize_label"] * pt
+    texts.append(textItem("Neutron number", (left + right) / 2, ticklabels_bottom + LABEL_PAD * pt, label_px, "center", "top", family=LABEL_FONT_FAMILY))
+    texts.append(textItem("Proton number", ticklabels_left - LABEL_PAD * pt, (top + bottom) / 2, label_px, "center", rotated=True, family=LABEL_FONT_FAMILY))
+
+    ## 图例位于右下角，各项自上而下排列
+    if have_legend:
+        entries = NDplot.legendEntriesGet(plot_mode)
+        if len(entries) > 0:
+            legend_px = NDplot.legendFontsize(len(entries), layout["fontsize_ticks"]) * pt
+            ## 各行的宽度、基线以上及以下的高度，色块底边位于基线
+            rows = []
+            for _, label in entries:
+                x0, x1, _, ascent, descent = textMetrics(label, legend_px)
+                rows.append((x1 - x0, max(ascent, LEGEND_HANDLEHEIGHT * legend_px), descent))
+            pad = LEGEND_BORDERPAD * legend_px
+            spacing = LEGEND_LABELSPACING * legend_px
+            box_width = 2 * pad + (LEGEND_HANDLELENGTH + LEGEND_HANDLETEXTPAD) * legend_px + max(row[0] for row in rows)
+            box_height = 2 * pad + sum(row[1] + row[2] for row in rows) + (len(rows) - 1) * spacing
+            box_right = right - LEGEND_BORDERAXESPAD * legend_px
+            box_bottom = bottom - LEGEND_BORDERAXESPAD * legend_px
+            box_left = box_right - box_width
+            box_top = box_bottom - box_height
+
+            patches = []
+            row_top = box_top + pad
+            patch_left = box_left + pad
+            for (color, label), (_, ascent, descent) in zip(entries, rows):
+                baseline = row_top + ascent
+                row_top = baseline + descent + spacing
+                patches.append((color, (patch_left, baseline - LEGEND_HANDLEHEIGHT * legend_px, patch_left + LEGEND_HANDLELENGTH * legend_px, baseline)))
+                texts.append(textItem(label, patch_left + (LEGEND_HANDLELENGTH + LEGEND_HANDLETEXTPAD) * legend_px, baseline, legend_px))
+
+            geometry["legend"] = {
+                "box": (box_left, box_top, box_right, box_bottom),
+                "radius": LEGEND_ROUNDING * legend_px,
+                "edge_width": LEGEND_EDGEWIDTH * pt,
+                "patches": patches
+            }
+
+    return geometry
+
+## 同一行相邻的同色方块合并，返回{颜色: [(行, 起始列, 结束列), ...]}，白色(背景)不计
+def colorRuns(color_data):
+    runs = {}
+    ncols = color_data.shape[1]
+    for row, colors in enumerate(color_data):
+        changes = np.flatnonzero(np.any(colors[1:] != colors[:-1], axis=1)) + 1
+        starts = np.concatenate(([0], changes))
+        ends = np.concatenate((changes, [ncols]))
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            color = tuple(colors[start].tolist())
+            if color != (255, 255, 255):
+                runs.setdefault(color, []).append((row, start, end))
+    return runs
+
+def svgNumber(value):
+    text = f"{value:.2f}".rstrip("0").rstrip(".")
+    return "0" if text == "-0" else text
+
+def svgColor(color):
+    return "#{:02x}{:02x}{:02x}".format(*color)
+
+def svgEscape(text):
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+## 写出svg，图片大小以磅为单位(同matplotlib)，内部坐标为像素
+def chartSVG(plot_mode=0, area=((0,0),(118,177)), text_mode=0, have_legend=True):
+    geometry = chartGeometry(plot_mode, area, text_mode, have_legend)
+    width = geometry["width"]
+    height = geometry["height"]
+    left, top, right, bottom = geometry["axes"]
+    xedges = geometry["xedges"]
+    yedges = geometry["yedges"]
+    num = svgNumber
+    pt = 72 / geometry["dpi"]
+
+    out = io.StringIO()
+    out.write('<?xml version="1.0" encoding="utf-8" standalone="no"?>\n')
+    out.write(f'<svg xmlns="http://www.w3.org/2000/svg" width="{num(width * pt)}pt" height="{num(height * pt)}pt" viewBox="0 0 {num(width)} {num(height)}" version="1.1">\n')
+    out.write(f'<rect x="0" y="0" width="{num(width)}" height="{num(height)}" style="fill:#ffffff"/>\n')
+
+    ## 方块：每种颜色一个path
+    for color, runs in colorRuns(geometry["color_data"]).items():
+        out.write(f'<path style="fill:{svgColor(color)}" d="')
+        out.write("".join(f"M{num(xedges[start])} {num(yedges[row + 1])}H{num(xedges[end])}V{num(yedges[row])}H{num(xedges[start])}Z" for row, start, end in runs))
+        out.write('"/>\n')
+
+    ## 方块间的白色边框
+    out.write(f'<path style="fill:none;stroke:#ffffff;stroke-width:{num(geometry["edge_width"])}" d="')
+    out.write("".join(f"M{num(x)} {num(yedges[0])}V{num(yedges[-1])}" for x in xedges))
+    out.write("".join(f"M{num(xedges[0])} {num(y)}H{num(xedges[-1])}" for y in yedges))
+    out.write('"/>\n')
+
+    ## 坐标轴及刻度
+    spine_width = num(geometry["spine_width"])
+    tick_length = geometry["tick_length"]
+    out.write(f'<path style="fill:none;stroke:#000000;stroke-width:{spine_width};stroke-linejoin:miter;stroke-linecap:square" d="M{num(left)} {num(top)}H{num(right)}V{num(bottom)}H{num(left)}Z"/>\n')
+    out.write(f'<path style="fill:none;stroke:#000000;stroke-width:{spine_width}" d="')
+    out.write("".join(f"M{num(x)} {num(bottom)}v{num(tick_length)}" for x in geometry["xticks"]))
+    out.write("".join(f"M{num(left)} {num(y)}h{num(-tick_length)}" for y in geometry["yticks"]))
+    out.write('"/>\n')
+
+    ## 图例
+    legend = geometry["legend"]
+    if not legend is None:
+        x0, y0, x1, y1 = legend["box"]
+        out.write(f'<rect x="{num(x0)}" y="{num(y0)}" width="{num(x1 - x0)}" height="{num(y1 - y0)}" rx="{num(legend["radius"])}" style="fill:#ffffff;fill-opacity:{LEGEND_ALPHA};stroke:{svgColor(LEGEND_EDGECOLOR)};stroke-opacity:{LEGEND_ALPHA};stroke-width:{num(legend["edge_width"])}"/>\n')
+        for color, (px0, py0, px1, py1) in legend["patches"]:
+            out.write(f'<rect x="{num(px0)}" y="{num(py0)}" width="{num(px1 - px0)}" height="{num(py1 - py0)}" style="fill:{svgColor(color)}"/>\n')
+
+    ## 文字：按起笔点定位，对齐点由步进宽度换算，以便查看时替换为其他字体也大致对齐
+    anchors = {"left": "start", "center": "middle", "right": "end"}
+    for text, x, y, size_px, ha, rotated, family in geometry["texts"]:
+        advance = fontGet(size_px, family).getlength(text)
+        shift = {"left": 0, "center": advance / 2, "right": advance}[ha]
+        family = FONT_FAMILY if family is None else family
+        style = f"font-family:'{family}',{FONT_GENERIC.get(family, 'sans-serif')};font-size:{num(size_px)}px;text-anchor:{anchors[ha]}"
+        if rotated:
+            out.write(f'<text transform="translate({num(x)} {num(y - shift)}) rotate(-90)" style="{style}">{svgEscape(text)}</text>\n')
+        else:
+            out.write(f'<text x="{num(x + shift)}" y="{num(y)}" style="{style}">{svgEscape(text)}</text>\n')
+
+    out.write("</svg>\n")
+    return out.getvalue().encode("utf-8")
+
+## 由颜色网格按像素复制绘制png
+## 各方块的边界取整到像素，方块宽度随之相差至多一像素
+## 白色边框不足一像素，同matplotlib(Agg)对齐像素后的效果，绘制为跨边界的两像素
+def chartImage(plot_mode=0, area=((0,0),(118,177)), text_mode=0, have_legend=True):
+    from PIL import Image, ImageDraw
+
+    geometry = chartGeometry(plot_mode, area, text_mode, have_legend, raster=True)
+    width = geometry["width"]
+    height = geometry["height"]
+    image = np.full((height, width, 3), 255, dtype=np.uint8)
+
+    ## 方块，第一行为Z最大的一侧
+    xedges = np.rint(geometry["xedges"]).astype(int)
+    yedges = np.rint(geometry["yedges"]).astype(int)
+    block = np.repeat(geometry["color_data"][::-1], (yedges[:-1] - yedges[1:])[::-1], axis=0)
+    block = np.repeat(block, np.diff(xedges), axis=1)
+    image[yedges[-1]:yedges[0], xedges[0]:xedges[-1]] = block
+
+    region = image[yedges[-1]:yedges[0], xedges[0]:xedges[-1]]
+    xgaps = np.floor(geometry["xedges"] - 0.5).astype(int) - xedges[0]
+    ygaps = np.floor(geometry["yedges"] - 0.5).astype(int) - yedges[-1]
+    for offset in (0, 1):
+        columns = xgaps + offset
+        region[:, columns[(columns >= 0) & (columns < region.shape[1])]] = 255
+        rows = ygaps + offset
+        region[rows[(rows >= 0) & (rows < region.shape[0])]] = 255
+
+    ## 坐标轴及刻度，线宽不足两像素时按一像素绘制
+    left, top, right, bottom = (int(value) for value in geometry["axes"])
+    line = max(1, int(round(geometry["spine_width"])))
+    tick_length = int(round(geometry["tick_length"]))
+    image[top:bottom + line, left:left + line] = 0
+    image[top:bottom + line, right:right + line] = 0
+    image[top:top + line, left:right + line] = 0
+    image[bottom:bottom + line, left:right + line] = 0
+    for x in geometry["xticks"].astype(int):
+        image[bottom:bottom + line + tick_length, x:x + line] = 0
+    for y in geometry["yticks"].astype(int):
+        image[y:y + line, left - tick_length:left + line] = 0
+
+    canvas = Image.fromarray(image)
+
+    ## 图例：半透明的圆角边框，其上为各项的色块
+    legend = geometry["legend"]
+    if not legend is None:
+        ## 只在图例所在的区域内混合
+        x0, y0, x1, y1 = legend["box"]
+        crop = (max(0, int(x0) - 1), max(0, int(y0) - 1), min(width, int(x1) + 2), min(height, int(y1) + 2))
+        box = (x0 - crop[0], y0 - crop[1], x1 - crop[0], y1 - crop[1])
+        overlay = Image.new("RGBA", (crop[2] - crop[0], crop[3] - crop[1]), (0, 0, 0, 0))
+        alpha = int(round(255 * LEGEND_ALPHA))
+        ImageDraw.Draw(overlay).rounded_rectangle(box, radius=legend["radius"], fill=(255, 255, 255, alpha), outline=LEGEND_EDGECOLOR + (alpha,), width=max(1, int(round(legend["edge_width"]))))
+        canvas.paste(Image.alpha_composite(canvas.crop(crop).convert("RGBA"), overlay).convert("RGB"), crop[:2])
+        draw = ImageDraw.Draw(canvas)
+        for color, box in legend["patches"]:
+            draw.rectangle(tuple(int(round(value)) for value in box), fill=tuple(color))
+
+    draw = ImageDraw.Draw(canvas)
+    for text, x, y, size_px, ha, rotated, family in geometry["texts"]:
+        font = fontGet(size_px, family)
+        if rotated:
+            ## 横排绘制于蒙版后逆时针旋转
+            x0, x1, advance, ascent, descent = textMetrics(text, size_px, family)
+            mask_width = int(np.ceil(x1 - x0)) + 2
+            mask = Image.new("L", (mask_width, int(np.ceil(ascent + descent)) + 2), 0)
+            ImageDraw.Draw(mask).text((1 - x0, 1 + ascent), text, fill=255, font=font, anchor="ls")
+            mask = mask.rotate(90, expand=True)
+            canvas.paste((0, 0, 0), (int(round(x - 1 - ascent)), int(round(y - mask_width + 2 - x0))), mask)
+        else:
+            draw.text((x, y), text, fill=(0, 0, 0), font=font, anchor="ls")
+
+    return canvas
+
+def chartPNG(plot_mode=0, area=((0,0),(118,177)), text_mode=0, have_legend=True):
+    buffer = io.BytesIO()
+    chartImage(plot_mode, area, text_mode, have_legend).save(buffer, format="png")
+    return buffer.getvalue()
+
+def chartBytes(plot_mode=0, area=((0,0),(118,177)), text_mode=0, have_legend=True, fmt="svg"):
+    if fmt == "svg":
+        return chartSVG(plot_mode, area, text_mode, have_legend)
+    elif fmt == "png":
+        return chartPNG(plot_mode, area, text_mode, have_legend)
+    raise ValueError(f"unknown chart format: {fmt}")
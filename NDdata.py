@@ -0,0 +1,80 @@
+import json
+import os
+import threading
+
+import NDcache
+
+## 进程内共享的数据集注册表
+## 各数据文件首次使用时读取，之后直接返回内存中的对象；文件的mtime或大小变化后重新读取
+## 返回的对象为各处共享，调用方不应修改
+## loads/hits计数用于确认预热后的请求不再读取文件
+
+def loadJson(path):
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+class DatasetRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._entries = {}
+        self._counters = {}
+
+    def _keyLock(self, key):
+        with self._lock:
+            if not key in self._key_locks:
+                self._key_locks[key] = threading.Lock()
+                self._counters[key] = {"loads": 0, "hits": 0}
+            return self._key_locks[key]
+
+    ## 取得path对应的数据集，loader为读取函数(默认按json读取)
+    def get(self, path, loader=loadJson):
+        key = (path, loader)
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        entry = self._entries.get(key)
+        if not entry is None and entry[0] == signature:
+            with self._lock:
+                self._counters[key]["hits"] += 1
+            return entry[1]
+
+        with self._keyLock(key):
+            ## 等待锁期间可能已由其他线程读取完毕
+            entry = self._entries.get(key)
+            if not entry is None and entry[0] == signature:
+                with self._lock:
+                    self._counters[key]["hits"] += 1
+                return entry[1]
+
+            value = loader(path)
+            self._entries[key] = (signature, value)
+            with self._lock:
+                self._counters[key]["loads"] += 1
+            return value
+
+    ## 各数据集的读取及命中次数，键为文件路径
+    def stats(self):
+        with self._lock:
+            stats = {}
+            for (path, loader), counter in self._counters.items():
+                total = stats.setdefault(path, {"loads": 0, "hits": 0})
+                total["loads"] += counter["loads"]
+                total["hits"] += counter["hits"]
+            return stats
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+registry = DatasetRegistry()
+
+def getJson(path):
+    return registry.get(path, loadJson)
+
+## nndc导出数据，经NDcache读取，返回NDcache.NuclidesData
+def getNuclides(path):
+    return registry.get(path, NDcache.loadNuclides)
+
+def stats():
+    return registry.stats()
@@ -0,0 +1,539 @@
+import argparse
+import json
+import math
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+import NDdata
+import NDindex
+import NDpaths
+import NDtable
+
+## 衰变链(Bateman方程)求解
+## 由各核素基态的半衰期及观测到的衰变模式、分支比构建衰变常数及母核→子核的转移矩阵(scipy稀疏矩阵)，
+## dN/dt = A·N，A[子核, 母核] = λ(母核)·分支比，A[母核, 母核] = -λ(母核)
+## 求解时只取初始核素及其全部子孙核素构成的子矩阵，
+##   expm: 衰变网络无环，按拓扑顺序排列后A为下三角矩阵，exp(A·t) = V·exp(D·t)·V⁻¹ (即Bateman解)，
+##         特征向量V由三角方程求得，各时刻、各组初始量一次矩阵乘法得到；
+##         scipy.linalg.expm的缩放平方法对衰变常数相差四十个数量级的矩阵误差过大，不使用
+##   ode: 以刚性方程求解器(solve_ivp, BDF)一次求解全部初始量，雅可比矩阵为稀疏矩阵
+## 多个时刻、多组初始量均在一次调用中完成
+## 另有只由衰变模式构建的衰变图(DecayGraph)，用于查询核素的全部子孙核素及祖先核素
+## scipy只在构建矩阵及求解时导入
+
+nuclides_data_path = NDpaths.nuclides_data_path
+
+## 各衰变模式的子核相对于母核的(ΔZ, ΔN)
+## 缓发粒子发射(如B-N)的子核为发射后的核素；放出的轻粒子(n、p、α)不计入
+DECAY_MODE_SHIFTS = {
+    "B-"   : (1, -1),
+    "2B-"  : (2, -2),
+    "B-N"  : (1, -2),
+    "B-2N" : (1, -3),
+    "B-3N" : (1, -4),
+    "B-4N" : (1, -5),
+    "B-A"  : (-1, -3),
+    "EC"   : (-1, 1),
+    "EC+B+": (-1, 1),
+    "ECP"  : (-2, 1),
+    "EC2P" : (-3, 1),
+    "EC3P" : (-4, 1),
+    "ECA"  : (-3, -1),
+    "ECAP" : (-4, -1),
+    "N"    : (0, -1),
+    "2N"   : (0, -2),
+    "P"    : (-1, 0),
+    "2P"   : (-2, 0),
+    "3P"   : (-3, 0),
+    "A"    : (-2, -2),
+    "14C"  : (-6, -8),
+    "20O"  : (-8, -12),
+    "20NE" : (-10, -10),
+    "22NE" : (-10, -12),
+    "24NE" : (-10, -14),
+    "25NE" : (-10, -15),
+    "28MG" : (-12, -16),
+    "34SI" : (-14, -20)
+}
+
+## 缓发模式所属的母模式：ENSDF中缓发模式的分支比包含在母模式之内(如B- = 100%、B-N = 30%)
+## 构建时由母模式中扣除，剩余部分才是直接衰变到母模式子核的比例
+DELAYED_PARENTS = {
+    "B-N": "B-", "B-2N": "B-", "B-3N": "B-", "B-4N": "B-", "B-A": "B-", "B-SF": "B-",
+    "ECP": ("EC+B+", "EC"), "EC2P": ("EC+B+", "EC"), "EC3P": ("EC+B+", "EC"), "ECA": ("EC+B+", "EC"), "ECAP": ("EC+B+", "EC"), "ECSF": ("EC+B+", "EC")
+}
+
+## 裂变及未给出质量的簇放射(如"NE")没有确定的子核，计为损失
+LOSS_MODES = ("SF", "B-SF", "ECSF", "NE", "MG", "SI")
+
+## 约化普朗克常数(keV·s)，半衰期以能级宽度给出时(特殊单位)由 λ = Γ/ħ 换算
+HBAR_KEV_SEC = 6.582119569e-19
+
+## 时间单位同半衰期单位
+TIME_UNITS = NDtable.HL_UNITS
+
+SOLVE_METHODS = ("expm", "ode")
+
+## 各核素按(Z, N)的索引，(Z, N)重复时取数据集中的第一个
+def znIndex(table):
+    zn_idx = {}
+    for idx, (z, n) in enumerate(zip(table.z.tolist(), table.n.tolist())):
+        zn_idx.setdefault((z, n), idx)
+    return zn_idx
+
+## 衰变模式的子核索引，裂变、未知模式、子核不在数据集中或子核为自身时返回None
+def daughterIndex(zn_idx, idx, z, n, mode):
+    mode = NDtable.DECAYMODE_REPLACE.get(mode, mode)
+    if mode in LOSS_MODES or not mode in DECAY_MODE_SHIFTS:
+        return None
+    dz, dn = DECAY_MODE_SHIFTS[mode]
+    daughter = zn_idx.get((z + dz, n + dn))
+    if daughter == idx:
+        return None
+    return daughter
+
+## 基态的衰变常数(1/s)，稳定核素为0，无半衰期数据的为nan
+def groundDecayConstant(level):
+    hl_kind, hl_sec = NDtable.levelHalflife(level)
+    if hl_kind == NDtable.HL_KIND_STABLE:
+        return 0.0
+    if hl_kind == NDtable.HL_KIND_VALUE:
+        return math.log(2) / hl_sec if hl_sec > 0 else math.inf
+    if hl_kind == NDtable.HL_KIND_SU and level["halflife"]["unit"] in NDtable.ENERGY_UNITS and isinstance(level["halflife"]["value"], (int, float)):
+        return level["halflife"]["value"] * NDtable.ENERGY_UNITS[level["halflife"]["unit"]] / HBAR_KEV_SEC
+    return math.nan
+
+## 基态各衰变模式的分支比(0~1)，缓发模式已由其母模式中扣除
+## 分支比之和超过1时按比例缩小；无分支比的模式不计
+def groundBranches(level):
+    branches = {}
+    for decay_mode in level.get("decayModes", {}).get("observed", []):
+        if not isinstance(decay_mode.get("value"), (int, float)):
+            continue
+        mode = NDtable.DECAYMODE_REPLACE.get(decay_mode["mode"], decay_mode["mode"])
+        branches[mode] = branches.get(mode, 0.0) + decay_mode["value"] / 100
+    for mode, parents in DELAYED_PARENTS.items():
+        if not mode in branches:
+            continue
+        for parent in (parents if isinstance(parents, tuple) else (parents,)):
+            if parent in branches:
+                branches[parent] = max(branches[parent] - branches[mode], 0.0)
+                break
+    total = sum(branches.values())
+    if total > 1:
+        branches = {mode: value / total for mode, value in branches.items()}
+    return branches
+
+## 全部核素的衰变网络
+## decay_const为各核素基态的衰变常数(1/s)，undetermined为有衰变模式但无半衰期数据(衰变常数记为0)的核素
+## matrix为scipy.sparse的csr矩阵，每列之和为负的损失率(裂变、子核不在数据集中、分支比之和小于1)
+class DecayNetwork:
+    def __init__(self, nuclides_data):
+        import scipy.sparse
+
+        self.source = nuclides_data
+        table = NDtable.tableOf(nuclides_data)[0]
+        self.names = [str(name) for name in table.names]
+        self.name_idx = {name: idx for idx, name in enumerate(self.names)}
+        size = len(self.names)
+        zn_idx = znIndex(table)
+
+        self.decay_const = np.zeros(size)
+        self.undetermined = []
+        rows = []
+        cols = []
+        values = []
+        for idx, name in enumerate(self.names):
+            levels = nuclides_data[name].get("levels", [])
+            if len(levels) == 0:
+                continue
+            decay_const = groundDecayConstant(levels[0])
+            branches = groundBranches(levels[0])
+            if math.isnan(decay_const):
+                if len(branches) > 0:
+                    self.undetermined.append(name)
+                continue
+            self.decay_const[idx] = decay_const
+            if decay_const == 0:
+                continue
+            rows.append(idx)
+            cols.append(idx)
+            values.append(-decay_const)
+            z, n = int(table.z[idx]), int(table.n[idx])
+            for mode, branch in branches.items():
+                daughter = daughterIndex(zn_idx, idx, z, n, mode)
+                if daughter is None or branch <= 0:
+                    continue
+                rows.append(daughter)
+                cols.append(idx)
+                values.append(decay_const * branch)
+        self.matrix = scipy.sparse.csr_matrix((values, (rows, cols)), shape=(size, size))
+        ## 按列(母核)取子核时使用
+        self._matrix_csc = self.matrix.tocsc()
+        ## 各核素在拓扑顺序(母核在子核之前)中的位置，网络有环时为None
+        self.topo_rank = topologicalRank(self.matrix)
+
+    def __len__(self):
+        return len(self.names)
+
+    ## 核素的直接子核：[(子核, 分支比)]
+    def daughters(self, name):
+        idx = self.name_idx[name]
+        col = self._matrix_csc.getcol(idx)
+        return [(self.names[row], value / self.decay_const[idx]) for row, value in zip(col.indices.tolist(), col.data.tolist()) if row != idx]
+
+    ## 由初始核素出发可达的全部核素(含自身)的索引，按索引排序
+    def closure(self, indices):
+        import scipy.sparse.csgraph
+
+        reached = np.zeros(len(self), dtype=bool)
+        ## 子核→母核的边转置为母核→子核
+        graph = self._matrix_csc.T.tocsr()
+        for idx in np.unique(np.asarray(indices, dtype=np.int64)):
+            if not reached[idx]:
+                reached[scipy.sparse.csgraph.breadth_first_order(graph, idx, directed=True, return_predecessors=False)] = True
+        return np.flatnonzero(reached)
+
+    ## 初始量转换为(初始量组数, 核素数)的数组
+    ## initial可为{核素名称: 数量}、其列表，或形如(组数, len(self))的数组；名称可用NDindex可识别的写法(如"U-238")
+    def inventoryArray(self, initial):
+        if isinstance(initial, dict):
+            initial = [initial]
+        if isinstance(initial, np.ndarray):
+            array = np.atleast_2d(np.asarray(initial, dtype=np.float64))
+            if array.shape[1] != len(self):
+                raise ValueError(f"inventory arrays must have {len(self)} columns")
+            return array
+        index = NDindex.indexOf(self.source)
+        array = np.zeros((len(initial), len(self)))
+        for row, inventory in enumerate(initial):
+            for name, amount in inventory.items():
+                idx = self.name_idx.get(name)
+                if idx is None:
+                    data = index.searchNom(name)
+                    if data is None:
+                        raise KeyError(f"unknown nuclide: {name}")
+                    idx = self.name_idx[data["name"]]
+                array[row, idx] += amount
+        return array
+
+    ## 求解各时刻(秒)的核素数量
+    ## 返回(names, amounts)：names为初始核素及其子孙核素，amounts形如(时刻数, 初始量组数, len(names))
+    def solve(self, initial, times, method="expm", rtol=1e-8, atol=1e-30):
+        if not method in SOLVE_METHODS:
+            raise ValueError(f"unknown solve method: {method}")
+        inventories = self.inventoryArray(initial)
+        times = np.atleast_1d(np.asarray(times, dtype=np.float64))
+        if np.any(times < 0):
+            raise ValueError("times must not be negative")
+
+        subset = self.closure(np.flatnonzero(np.any(inventories != 0, axis=0)))
+        names = [self.names[idx] for idx in subset]
+        sub_matrix = self.matrix[subset][:, subset]
+        initial_sub = inventories[:, subset].T
+        if len(subset) == 0:
+            return names, np.zeros((len(times), len(inventories), 0))
+
+        ## 有环时无法排成三角矩阵，改用ode
+        if method == "expm" and not self.topo_rank is None:
+            order = np.argsort(self.topo_rank[subset], kind="stable")
+            amounts = np.empty((len(times), len(inventories), len(subset)))
+            amounts[:, :, order] = solveExpm(sub_matrix[order][:, order].toarray(), initial_sub[order], times)
+        else:
+            amounts = solveODE(sub_matrix, initial_sub, times, rtol, atol)
+        return names, amounts
+
+## 拓扑排序(Kahn)，返回各节点的位置；matrix[子, 母]非零表示母→子的边，有环时返回None
+def topologicalRank(matrix):
+    coo = matrix.tocoo()
+    edges = coo.row != coo.col
+    parents = coo.col[edges]
+    children = coo.row[edges]
+    size = matrix.shape[0]
+    indegree = np.bincount(children, minlength=size)
+    order = np.argsort(parents, kind="stable")
+    starts = np.searchsorted(parents[order], np.arange(size + 1))
+    children = children[order]
+
+    queue = list(np.flatnonzero(indegree == 0))
+    rank = np.full(size, -1, dtype=np.int64)
+    pos = 0
+    while pos < len(queue):
+        node = queue[pos]
+        rank[node] = pos
+        pos += 1
+        for child in children[starts[node]:starts[node + 1]]:
+            indegree[child] -= 1
+            if indegree[child] == 0:
+                queue.append(child)
+    if pos < size:
+        return None
+    return rank
+
+## 下三角衰变矩阵(按拓扑顺序)的矩阵指数与初始量(M, K)之积，返回形如(时刻数, K, M)
+## exp(A·t) = V·exp(D·t)·V⁻¹：第k个特征向量只在k的子孙核素上非零，其上满足(L - d_k·I)·v = -A[子孙, k]，L为A在子孙核素上的子矩阵
+## 衰变常数相同的不稳定核素(特征值重复)按相对1e-10错开，避免特征向量退化
+def solveExpm(matrix, initial, times):
+    import scipy.linalg
+
+    size = matrix.shape[0]
+    decay_const = -np.diag(matrix).copy()
+    values, groups, counts = np.unique(decay_const, return_inverse=True, return_counts=True)
+    for group in np.flatnonzero((counts > 1) & (values > 0)):
+        members = np.flatnonzero(groups == group)
+        decay_const[members] *= 1 + 1e-10 * np.arange(len(members))
+    eigenvalues = -decay_const
+    matrix = matrix.copy()
+    np.fill_diagonal(matrix, eigenvalues)
+
+    ## 各核素的子孙核素(不含自身)，按拓扑顺序的逆序由子核合并得到
+    descendants = [None] * size
+    for k in range(size - 1, -1, -1):
+        children = np.flatnonzero(matrix[k + 1:, k]) + k + 1
+        merged = [children] + [descendants[child] for child in children]
+        descendants[k] = np.unique(np.concatenate(merged)) if len(children) > 0 else children
+
+    vectors = np.eye(size)
+    for k in range(size):
+        below = descendants[k]
+        ## 稳定核素及无子核的核素，其特征向量即单位向量
+        if eigenvalues[k] == 0 or len(below) == 0:
+            continue
+        lower = matrix[np.ix_(below, below)] - eigenvalues[k] * np.eye(len(below))
+        vectors[below, k] = scipy.linalg.solve_triangular(lower, -matrix[below, k], lower=True, check_finite=False)
+    coefficients = scipy.linalg.solve_triangular(vectors, initial, lower=True, unit_diagonal=True, check_finite=False)
+
+    modes = np.exp(np.outer(times, eigenvalues))
+    amounts = np.einsum("im,tm,mk->tki", vectors, modes, coefficients)
+    return np.clip(amounts, 0, None)
+
+## 全部初始量作为一个方程组求解，dY/dt = A·Y，Y形如(M, K)按行展开
+## 雅可比矩阵为kron(A, I_K)，BDF方法适用于衰变常数相差悬殊的刚性方程
+def solveODE(matrix, initial, times, rtol=1e-8, atol=1e-30):
+    import scipy.integrate
+    import scipy.sparse
+
+    size, count = initial.shape
+    jacobian = scipy.sparse.kron(matrix, scipy.sparse.identity(count), format="csr")
+    order = np.argsort(times, kind="stable")
+    t_eval = times[order]
+    t_end = float(t_eval[-1]) if len(t_eval) > 0 else 0.0
+
+    amounts = np.empty((len(times), count, size))
+    if t_end == 0:
+        amounts[:] = initial.T[None, :, :]
+        return amounts
+    result = scipy.integrate.solve_ivp(lambda t, y: jacobian @ y, (0.0, t_end), initial.ravel(), method="BDF", t_eval=t_eval, jac=jacobian, rtol=rtol, atol=atol)
+    if not result.success:
+        raise RuntimeError(result.message)
+    amounts[order] = result.y.T.reshape(len(times), size, count).transpose(0, 2, 1)
+    return np.clip(amounts, 0, None)
+
+## 衰变图
+## 由各核素基态观测到的衰变模式构建，不要求分支比及半衰期数据；边为母核→子核，"β⁻"视同"B-"
+## 拓扑顺序(母核在前)构建时一次求得，子孙、祖先核素的查询为稀疏图上的广度优先搜索，结果按核素缓存
+class DecayGraph:
+    def __init__(self, nuclides_data, closure_cache_max=256):
+        import scipy.sparse
+
+        self.source = nuclides_data
+        self.table = NDtable.tableOf(nuclides_data)[0]
+        self.names = [str(name) for name in self.table.names]
+        self.name_idx = {name: idx for idx, name in enumerate(self.names)}
+        size = len(self.names)
+        zn_idx = znIndex(self.table)
+
+        ## 各边的衰变模式，同一对母核、子核可有多个模式(如"EC+B+"与"EC")
+        self.edge_modes = {}
+        for idx, name in enumerate(self.names):
+            levels = nuclides_data[name].get("levels", [])
+            if len(levels) == 0 or not "decayModes" in levels[0]:
+                continue
+            z, n = int(self.table.z[idx]), int(self.table.n[idx])
+            for decay_mode in levels[0]["decayModes"]["observed"]:
+                mode = NDtable.DECAYMODE_REPLACE.get(decay_mode["mode"], decay_mode["mode"])
+                daughter = daughterIndex(zn_idx, idx, z, n, mode)
+                if daughter is None:
+                    continue
+                modes = self.edge_modes.setdefault((idx, daughter), [])
+                if not mode in modes:
+                    modes.append(mode)
+
+        parents = np.array([edge[0] for edge in self.edge_modes], dtype=np.int64)
+        children = np.array([edge[1] for edge in self.edge_modes], dtype=np.int64)
+        ## children_graph[母, 子]、parents_graph[子, 母]
+        self.children_graph = scipy.sparse.csr_matrix((np.ones(len(parents), dtype=np.int8), (parents, children)), shape=(size, size))
+        self.parents_graph = self.children_graph.T.tocsr()
+
+        ## topologicalRank()取matrix[子, 母]
+        self.topo_rank = topologicalRank(self.parents_graph)
+        self.topo_order = None if self.topo_rank is None else np.argsort(self.topo_rank)
+
+        self.closure_cache_max = closure_cache_max
+        self._closures = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.names)
+
+    ## 核素名称转换为索引，可用NDindex可识别的写法(如"U-238")
+    def indexOf(self, name):
+        idx = self.name_idx.get(name)
+        if idx is None:
+            data = NDindex.indexOf(self.source).searchNom(name)
+            if data is None:
+                raise KeyError(f"unknown nuclide: {name}")
+            idx = self.name_idx[data["name"]]
+        return idx
+
+    ## 直接子核：[(子核, [衰变模式])]
+    def daughters(self, name):
+        idx = self.indexOf(name)
+        return [(self.names[child], self.edge_modes[(idx, child)]) for child in self.children_graph[idx].indices.tolist()]
+
+    ## 直接母核：[(母核, [衰变模式])]
+    def parents(self, name):
+        idx = self.indexOf(name)
+        return [(self.names[parent], self.edge_modes[(parent, idx)]) for parent in self.parents_graph[idx].indices.tolist()]
+
+    ## 单个核素可达的全部核素的索引(含自身)，按拓扑顺序排列
+    def _closureOf(self, idx, ancestors=False):
+        import scipy.sparse.csgraph
+
+        key = (idx, ancestors)
+        with self._lock:
+            closure = self._closures.get(key)
+            if not closure is None:
+                self._closures.move_to_end(key)
+                return closure
+
+        graph = self.parents_graph if ancestors else self.children_graph
+        closure = scipy.sparse.csgraph.breadth_first_order(graph, idx, directed=True, return_predecessors=False)
+        if not self.topo_rank is None:
+            closure = closure[np.argsort(self.topo_rank[closure], kind="stable")]
+        with self._lock:
+            self._closures[key] = closure
+            while len(self._closures) > self.closure_cache_max:
+                self._closures.popitem(last=False)
+        return closure
+
+    ## 一个或多个核素的全部子孙(ancestors为True时为祖先)核素的布尔掩码，include_self为False时不含这些核素本身
+    def closureMask(self, names, ancestors=False, include_self=False):
+        if isinstance(names, str):
+            names = [names]
+        indices = [self.indexOf(name) for name in names]
+        mask = np.zeros(len(self), dtype=bool)
+        for idx in indices:
+            mask[self._closureOf(idx, ancestors)] = True
+        if not include_self:
+            ## 核素本身也可能是另一个所给核素的子孙，只去掉不是任何所给核素子孙的
+            reached = np.zeros(len(self), dtype=bool)
+            for idx in indices:
+                closure = self._closureOf(idx, ancestors)
+                reached[closure[closure != idx]] = True
+            mask[indices] = reached[indices]
+        return mask
+
+    ## 全部子孙核素，按拓扑顺序(母核在前)
+    def descendants(self, name, include_self=False):
+        idx = self.indexOf(name)
+        return [self.names[other] for other in self._closureOf(idx).tolist() if include_self or other != idx]
+
+    ## 全部祖先核素，按拓扑顺序(母核在前)
+    def ancestors(self, name, include_self=False):
+        idx = self.indexOf(name)
+        return [self.names[other] for other in self._closureOf(idx, True).tolist() if include_self or other != idx]
+
+    ## 掩码中的核素在核素图上的位置[(Z, N)]，供NDplot.nucildesChartPlotPLT()的highlight
+    def cellsOf(self, mask):
+        rows = np.flatnonzero(mask)
+        return list(zip(self.table.z[rows].tolist(), self.table.n[rows].tolist()))
+
+## 已构建的衰变图，按数据集对象复用
+_graphs = []
+_graphs_max = 2
+_graphs_lock = threading.Lock()
+
+def graphOf(nuclides_data):
+    with _graphs_lock:
+        for graph in _graphs:
+            if graph.source is nuclides_data:
+                return graph
+
+    ## 构建时不持有锁，同时构建的以先加入的为准
+    graph = DecayGraph(nuclides_data)
+    with _graphs_lock:
+        for other in _graphs:
+            if other.source is nuclides_data:
+                return other
+        _graphs.insert(0, graph)
+        del _graphs[_graphs_max:]
+    return graph
+
+## 核素的衰变链：ancestors为False时为全部子孙核素，否则为全部祖先核素
+def decayChain(name, ancestors=False, include_self=False, nuclides_data=None):
+    if nuclides_data is None:
+        nuclides_data = NDdata.getNuclides(nuclides_data_path)
+    graph = graphOf(nuclides_data)
+    if ancestors:
+        return graph.ancestors(name, include_self)
+    return graph.descendants(name, include_self)
+
+## 衰变链在核素图上的高亮位置[(Z, N)]，含核素本身
+def decayChainCells(name, ancestors=False, nuclides_data=None):
+    if nuclides_data is None:
+        nuclides_data = NDdata.getNuclides(nuclides_data_path)
+    graph = graphOf(nuclides_data)
+    return graph.cellsOf(graph.closureMask(name, ancestors, include_self=True))
+
+## 已构建的衰变网络，按数据集对象复用
+_networks = []
+_networks_max = 2
+_networks_lock = threading.Lock()
+
+def networkOf(nuclides_data):
+    with _networks_lock:
+        for network in _networks:
+            if network.source is nuclides_data:
+                return network
+
+    ## 构建时不持有锁，同时构建的以先加入的为准
+    network = DecayNetwork(nuclides_data)
+    with _networks_lock:
+        for other in _networks:
+            if other.source is nuclides_data:
+                return other
+        _networks.insert(0, network)
+        del _networks[_networks_max:]
+    return network
+
+## 求解衰变链，times的单位为time_unit(同半衰期单位，如"s"、"y")，返回同DecayNetwork.solve()
+def decayInventories(initial, times, time_unit="s", method="expm", nuclides_data=None):
+    if nuclides_data is None:
+        nuclides_data = NDdata.getNuclides(nuclides_data_path)
+    times_sec = np.asarray(times, dtype=np.float64) * TIME_UNITS[time_unit]
+    return networkOf(nuclides_data).solve(initial, times_sec, method)
+
+## 用法：python NDdecay.py 核素[=数量] ... -t 时刻 ... [-u 时间单位] [-m expm|ode] [--min 最小数量]
+## 各时刻的核素数量逐行以jsonl写到标准输出，小于最小数量的不输出
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="衰变链求解")
+    parser.add_argument("nuclides", nargs="+")
+    parser.add_argument("-t", "--times", type=float, nargs="+", required=True)
+    parser.add_argument("-u", "--unit", choices=list(TIME_UNITS), default="s")
+    parser.add_argument("-m", "--method", choices=SOLVE_METHODS, default="expm")
+    parser.add_argument("--min", type=float, default=1e-12)
+    args = parser.parse_args()
+
+    initial = {}
+    for item in args.nuclides:
+        name, _, amount = item.partition("=")
+        initial[name] = initial.get(name, 0.0) + (float(amount) if amount != "" else 1.0)
+
+    names, amounts = decayInventories(initial, args.times, args.unit, args.method)
+    for time_idx, time_value in enumerate(args.times):
+        inventory = {name: float(amount) for name, amount in zip(names, amounts[time_idx, 0]) if amount >= args.min}
+        sys.stdout.write(json.dumps({"time": time_value, "unit": args.unit, "inventory": inventory}, ensure_ascii=False) + "\n")
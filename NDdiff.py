@@ -0,0 +1,220 @@
+import argparse
+import hashlib
+import json
+import sys
+import time
+from collections import Counter
+
+import NDdata
+import NDpaths
+import NDtable
+
+## 两份nndc导出数据的比较
+## 各核素先比较其紧凑json的哈希(NDcache.NuclidesData.recordHash)，相同的直接跳过，不解析
+## 不同的核素再比较各能级的哈希，内容相同的能级跳过，其余能级按能量配对后逐项比较
+## 结果为逐条的变化记录，可写出为jsonl，也可按核素汇总后以核素图(NDplot的plot_mode=4)显示
+
+nuclides_data_path = NDpaths.nuclides_data_path
+
+## 变化记录的种类
+## nuclide_added/nuclide_removed: 核素增删；level_added/level_removed: 能级增删；field: 核素或能级的某项数据变化
+CHANGE_KINDS = ("nuclide_added", "nuclide_removed", "level_added", "level_removed", "field")
+
+## 核素图上各核素的类别，按此顺序取第一个符合的
+## added/removed: 核素增删，halflife: 半衰期变化，decay: 衰变模式或分支比变化，levels: 能级增删，other: 其余数据变化，same: 无变化
+CELL_TYPES = ("added", "removed", "halflife", "decay", "levels", "other", "same")
+
+def levelHash(level):
+    return hashlib.sha1(json.dumps(level, ensure_ascii=False, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+## 能级的配对键：能量的文本(NDtable.energyLabel())，同一核素中能量相同的能级(如多个"0+X keV")按出现的先后区分
+def levelKeys(levels):
+    seen = Counter()
+    keys = []
+    for level in levels:
+        label = NDtable.energyLabel(level)
+        keys.append((label, seen[label]))
+        seen[label] += 1
+    return keys
+
+## 衰变模式按(observed/predicted, 模式, 同一模式的序号)展开，值为{"value", "uncertainty"}
+def decayModeEntries(decay_modes):
+    entries = {}
+    seen = Counter()
+    for group in ("observed", "predicted"):
+        for decay_mode in decay_modes.get(group, []):
+            key = (group, decay_mode["mode"])
+            entries[key + (seen[key],)] = {key: value for key, value in decay_mode.items() if key != "mode"}
+            seen[key] += 1
+    return entries
+
+## 两个能级的逐项比较，衰变模式按模式逐个比较分支比
+def levelFieldChanges(old, new):
+    changes = []
+    for field in list(old) + [field for field in new if not field in old]:
+        old_value = old.get(field)
+        new_value = new.get(field)
+        if old_value == new_value:
+            continue
+        if field == "decayModes":
+            old_modes = decayModeEntries(old_value or {})
+            new_modes = decayModeEntries(new_value or {})
+            for key in list(old_modes) + [key for key in new_modes if not key in old_modes]:
+                if old_modes.get(key) != new_modes.get(key):
+                    changes.append({"field": field, "group": key[0], "mode": key[1], "old": old_modes.get(key), "new": new_modes.get(key)})
+        else:
+            changes.append({"field": field, "old": old_value, "new": new_value})
+    return changes
+
+## 一个核素的变化记录，old、new为该核素在两份数据中的字典
+def nuclideChanges(name, old, new):
+    base = {"nuclide": name, "z": new["z"], "n": new["n"]}
+    changes = []
+    for field in ("z", "n", "a", "name"):
+        if old.get(field) != new.get(field):
+            changes.append(dict(base, change="field", level=None, field=field, old=old.get(field), new=new.get(field)))
+
+    old_levels = old.get("levels", [])
+    new_levels = new.get("levels", [])
+    ## 内容相同的能级(哈希相同)先成对去掉，无论位置是否变化
+    new_hashes = Counter(levelHash(level) for level in new_levels)
+    old_rest = []
+    for key, level in zip(levelKeys(old_levels), old_levels):
+        digest = levelHash(level)
+        if new_hashes[digest] > 0:
+            new_hashes[digest] -= 1
+        else:
+            old_rest.append((key, level))
+    old_hashes = Counter(levelHash(level) for level in old_levels)
+    new_rest = []
+    for key, level in zip(levelKeys(new_levels), new_levels):
+        digest = levelHash(level)
+        if old_hashes[digest] > 0:
+            old_hashes[digest] -= 1
+        else:
+            new_rest.append((key, level))
+
+    ## 其余能级按能量配对
+    new_byKey = dict(new_rest)
+    old_keys = set()
+    for key, level in old_rest:
+        old_keys.add(key)
+        if key in new_byKey:
+            for change in levelFieldChanges(level, new_byKey[key]):
+                changes.append(dict(base, change="field", level=key[0], **change))
+        else:
+            changes.append(dict(base, change="level_removed", level=key[0]))
+    for key, level in new_rest:
+        if not key in old_keys:
+            changes.append(dict(base, change="level_added", level=key[0]))
+    return changes
+
+## 比较两份导出数据(NDcache.NuclidesData或核素字典)，逐条产生变化记录
+## 核素按新数据中的顺序，删去的核素在最后
+def diffExports(old_data, new_data):
+    hashed = hasattr(old_data, "recordHash") and hasattr(new_data, "recordHash")
+    for name in new_data:
+        if not name in old_data:
+            new = new_data[name]
+            yield {"nuclide": name, "z": new["z"], "n": new["n"], "change": "nuclide_added"}
+            continue
+        if hashed and old_data.recordHash(name) == new_data.recordHash(name):
+            continue
+        old = old_data[name]
+        new = new_data[name]
+        if not hashed and old == new:
+            continue
+        yield from nuclideChanges(name, old, new)
+    for name in old_data:
+        if not name in new_data:
+            old = old_data[name]
+            yield {"nuclide": name, "z": old["z"], "n": old["n"], "change": "nuclide_removed"}
+
+## 变化记录所属的核素图类别
+def changeCellType(change):
+    kind = change["change"]
+    if kind == "nuclide_added":
+        return "added"
+    if kind == "nuclide_removed":
+        return "removed"
+    if kind in ("level_added", "level_removed"):
+        return "levels"
+    if change["field"] == "halflife":
+        return "halflife"
+    if change["field"] == "decayModes":
+        return "decay"
+    return "other"
+
+## 按核素汇总变化，返回核素图所用的分类结果[{"z", "n", "type"}]，格式同NuclidesClassifiedHalflife.json
+## new_data(NDcache.NuclidesData或核素字典)给出时其中无变化的核素记为same，删去的核素位于其在旧数据中的位置
+def diffCells(changes, new_data=None):
+    cells = {}
+    for change in changes:
+        cell_type = changeCellType(change)
+        key = (change["z"], change["n"])
+        if not key in cells or CELL_TYPES.index(cell_type) < CELL_TYPES.index(cells[key]):
+            cells[key] = cell_type
+    rows = []
+    if not new_data is None:
+        table = getattr(new_data, "table", None)
+        if table is None:
+            table = NDtable.tableOf(new_data)[0]
+        for z, n in zip(table.z.tolist(), table.n.tolist()):
+            if not (z, n) in cells:
+                rows.append({"z": z, "n": n, "type": "same"})
+    rows.extend({"z": z, "n": n, "type": cell_type} for (z, n), cell_type in cells.items())
+    return rows
+
+def diffSummary(changes):
+    summary = {kind: 0 for kind in CHANGE_KINDS}
+    nuclides = set()
+    for change in changes:
+        summary[change["change"]] += 1
+        nuclides.add(change["nuclide"])
+    summary["nuclides_changed"] = len(nuclides)
+    return summary
+
+def writeJsonLines(changes, file):
+    count = 0
+    for change in changes:
+        file.write(json.dumps(change, ensure_ascii=False) + "\n")
+        count += 1
+    return count
+
+## 差异核素图，返回matplotlib的Figure，用毕以NDplot.closeFigure()释放
+def diffChart(cells, area=((0,0),(118,177)), text_mode=0, have_legend=True):
+    import NDplot
+    return NDplot.nucildesChartPlotPLT(4, area, text_mode, have_legend, cells=cells)
+
+## 用法：python NDdiff.py 旧导出数据 [新导出数据] [-o 变化记录.jsonl] [--chart 核素图.svg|png]
+## 未给出新导出数据时与data目录中的导出数据比较，变化记录默认写到标准输出，摘要写到标准错误
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="比较两份nndc导出数据")
+    parser.add_argument("old")
+    parser.add_argument("new", nargs="?", default=nuclides_data_path)
+    parser.add_argument("-o", "--output", default="-")
+    parser.add_argument("--chart", default=None)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    old_data = NDdata.getNuclides(args.old)
+    new_data = NDdata.getNuclides(args.new)
+    changes = list(diffExports(old_data, new_data))
+
+    if args.output == "-":
+        writeJsonLines(changes, sys.stdout)
+    else:
+        with open(args.output, "w", encoding="utf-8", newline="") as file:
+            writeJsonLines(changes, file)
+
+    if not args.chart is None:
+        import NDplot
+        fig = diffChart(diffCells(changes, new_data))
+        try:
+            fig.savefig(args.chart)
+        finally:
+            NDplot.closeFigure(fig)
+
+    summary = diffSummary(changes)
+    summary["sec"] = time.perf_counter() - start
+    print(json.dumps(summary), file=sys.stderr)
@@ -0,0 +1,157 @@
+import csv
+import gzip
+import importlib.util
+import io
+import json
+import os
+
+import numpy as np
+
+import NDcache
+import NDfilter
+
+## 筛选结果的流式导出
+## 输入为逐个产生(核素名称, 核素数据)的迭代器，逐个核素写出，不再先拼出整个结果的字符串
+## 格式：json(与原先相同的字典，紧凑写法)、jsonl(每行一个核素)、csv(同NDfilter.nuclideData_dict2dataframe()的各列)、parquet
+## 除parquet外均可选gzip压缩
+## parquet需要pyarrow，未安装时不提供此格式
+
+have_pyarrow = not importlib.util.find_spec("pyarrow") is None
+EXPORT_FORMATS = ("json", "jsonl", "csv", "parquet") if have_pyarrow else ("json", "jsonl", "csv")
+
+## 所选格式所需的库未安装
+class ExportUnavailable(RuntimeError):
+    pass
+
+## parquet每组的核素数
+parquet_chunk_nuclides = 1024
+
+## 按核素索引逐个取出筛选结果，核素数据为数据集中的原对象，不另行复制
+def iterRecords(table, indices, nuclides_data=None):
+    if nuclides_data is None:
+        nuclides_data = table.source
+    for idx in indices:
+        name = table.names[idx]
+        yield name, nuclides_data[name]
+
+## 按核素索引逐个取出筛选结果的紧凑json文本
+## 数据集经NDcache读取时直接取自其字符串表，不再解析后重新序列化
+def iterRecordsJson(table, indices, nuclides_data=None):
+    if nuclides_data is None:
+        nuclides_data = table.source
+    if isinstance(nuclides_data, NDcache.NuclidesData):
+        for idx in indices:
+            name = table.names[idx]
+            yield name, nuclides_data.recordJson(name)
+    else:
+        for name, data in iterRecords(table, indices, nuclides_data):
+            yield name, dumpRecord(data)
+
+def dumpRecord(data):
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+## gzip头中不记录文件名及时间，内容相同的导出得到相同的文件
+def openText(path, compress=False):
+    if compress:
+        raw = open(path, "wb")
+        return io.TextIOWrapper(GzipWriter(raw), encoding="utf-8", newline="")
+    return open(path, "w", encoding="utf-8", newline="")
+
+## 关闭时一并关闭底层文件的GzipFile
+class GzipWriter(gzip.GzipFile):
+    def __init__(self, raw):
+        super().__init__(filename="", mode="wb", fileobj=raw, mtime=0)
+        self._raw = raw
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            self._raw.close()
+
+## json及jsonl的输入为(核素名称, 紧凑json文本)
+def writeJson(texts, file):
+    count = 0
+    file.write("{")
+    for name, text in texts:
+        if count > 0:
+            file.write(",\n")
+        file.write(json.dumps(name, ensure_ascii=False) + ":" + text)
+        count += 1
+    file.write("}\n")
+    return count
+
+def writeJsonLines(texts, file):
+    count = 0
+    for name, text in texts:
+        file.write(text + "\n")
+        count += 1
+    return count
+
+def writeCSV(records, file):
+    count = 0
+    writer = csv.writer(file)
+    writer.writerow(NDfilter.DATAFRAME_COLUMNS)
+    for name, data in records:
+        writer.writerows(NDfilter.nuclideData_dict2rows(data))
+        count += 1
+    return count
+
+## parquet需要pyarrow，每parquet_chunk_nuclides个核素写出一组
+def writeParquet(records, path):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as error:
+        raise ExportUnavailable("parquet格式需要安装pyarrow") from error
+
+    count = 0
+    chunk = []
+    with pq.ParquetWriter(path, NDfilter.arrowSchema()) as writer:
+        for name, data in records:
+            chunk.append(data)
+            count += 1
+            if len(chunk) >= parquet_chunk_nuclides:
+                writer.write_table(NDfilter.nuclidesData_dict2arrow(chunk))
+                chunk = []
+        if len(chunk) > 0:
+            writer.write_table(NDfilter.nuclidesData_dict2arrow(chunk))
+    return count
+
+def exportSuffix(fmt, compress=False):
+    if fmt == "parquet" or not compress:
+        return "." + fmt
+    return "." + fmt + ".gz"
+
+## 将records写入path，返回写出的核素数
+## records为(核素名称, 核素数据)的迭代器，texts为(核素名称, 紧凑json文本)的迭代器，json及jsonl格式时优先使用texts
+def exportRecords(records, path, fmt="json", compress=False, texts=None):
+    if fmt == "parquet" and not have_pyarrow:
+        raise ExportUnavailable("parquet格式需要安装pyarrow")
+    if not fmt in EXPORT_FORMATS:
+        raise ValueError(f"unknown export format: {fmt}")
+
+    ## 先写入临时文件，完成后再替换，中途出错不会留下不完整的结果文件
+    tmp_path = path + ".tmp"
+    try:
+        if fmt == "parquet":
+            count = writeParquet(records, tmp_path)
+        else:
+            if fmt in ("json", "jsonl"):
+                if texts is None:
+                    texts = ((name, dumpRecord(data)) for name, data in records)
+                records = texts
+            writers = {"json": writeJson, "jsonl": writeJsonLines, "csv": writeCSV}
+            with openText(tmp_path, compress) as file:
+                count = writers[fmt](records, file)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return count
+
+## 导出核素表中掩码所选的核素
+def exportMasked(table, mask, path, fmt="json", compress=False, nuclides_data=None):
+    indices = np.flatnonzero(mask)
+    if fmt in ("json", "jsonl"):
+        return exportRecords(None, path, fmt, compress, texts=iterRecordsJson(table, indices, nuclides_data))
+    return exportRecords(iterRecords(table, indices, nuclides_data), path, fmt, compress)
@@ -0,0 +1,134 @@
+import hashlib
+import os
+import threading
+import time
+
+import NDpaths
+
+## 导出文件区
+## 筛选、查找等生成的结果文件统一写入此目录，文件名为内容的哈希，内容相同的导出只保留一个文件
+## 后台线程定期清理：超过保存时间(按最后一次使用计)的文件删除，总大小超出上限时再按使用时间删除最旧的文件
+## 返回给界面的文件由gradio另行复制，删除此处的文件不影响已返回的结果
+
+export_dir = NDpaths.cachePath("exports")
+
+class ExportArea:
+    def __init__(self, directory=export_dir, ttl_sec=3600, max_bytes=256 * 2**20, sweep_interval_sec=60):
+        self.directory = directory
+        self.ttl_sec = ttl_sec
+        self.max_bytes = max_bytes
+        self.sweep_interval_sec = sweep_interval_sec
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self.stored = 0
+        self.deduplicated = 0
+        self.evicted = 0
+
+    ## 由writer(path)写出文件，返回以内容哈希命名的文件路径
+    ## suffix为文件后缀(如".json")，内容相同者返回已有的文件
+    def store(self, writer, suffix=""):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = os.path.join(self.directory, f".tmp{os.getpid()}-{threading.get_ident()}{suffix}")
+        try:
+            writer(tmp_path)
+            digest = hashlib.sha256()
+            with open(tmp_path, "rb") as file:
+                for block in iter(lambda: file.read(2**20), b""):
+                    digest.update(block)
+            path = os.path.join(self.directory, digest.hexdigest()[:32] + suffix)
+
+            with self._lock:
+                if os.path.exists(path):
+                    ## 更新使用时间，供清理时判断
+                    os.utime(path)
+                    self.deduplicated += 1
+                else:
+                    os.replace(tmp_path, path)
+                    self.stored += 1
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return path
+
+    def storeBytes(self, data, suffix=""):
+        def writer(path):
+            with open(path, "wb") as file:
+                file.write(data)
+        return self.store(writer, suffix)
+
+    ## 删除超过保存时间的文件，之后总大小仍超出上限时按使用时间删除最旧的文件
+    def sweep(self, now=None):
+        if now is None:
+            now = time.time()
+        with self._lock:
+            if not os.path.isdir(self.directory):
+                return 0
+            files = []
+            removed = 0
+            for entry in os.scandir(self.directory):
+                if not entry.is_file():
+                    continue
+                stat = entry.stat()
+                ## 未完成的临时文件只按保存时间删除
+                if entry.name.startswith(".tmp"):
+                    if now - stat.st_mtime > self.ttl_sec:
+                        removed += removeFile(entry.path)
+                    continue
+                if now - stat.st_mtime > self.ttl_sec:
+                    removed += removeFile(entry.path)
+                else:
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+
+            total = sum(size for _, size, _ in files)
+            files.sort()
+            for mtime, size, path in files:
+                if total <= self.max_bytes:
+                    break
+                removed += removeFile(path)
+                total -= size
+            self.evicted += removed
+            return removed
+
+    ## 启动后台清理线程(重复调用无影响)
+    def start(self):
+        with self._lock:
+            if not self._thread is None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="ExportAreaSweeper", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if not self._thread is None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.sweep_interval_sec):
+            try:
+                self.sweep()
+            except OSError:
+                pass
+
+    ## 文件数、总大小及写入、去重、清理的次数
+    def stats(self):
+        files = 0
+        total = 0
+        if os.path.isdir(self.directory):
+            for entry in os.scandir(self.directory):
+                if entry.is_file() and not entry.name.startswith(".tmp"):
+                    files += 1
+                    total += entry.stat().st_size
+        with self._lock:
+            return {"files": files, "bytes": total, "stored": self.stored, "deduplicated": self.deduplicated, "evicted": self.evicted}
+
+def removeFile(path):
+    try:
+        os.remove(path)
+        return 1
+    except FileNotFoundError:
+        return 0
+
+export_area = ExportArea()
@@ -1,186 +1,108 @@
-import json
 import os
-import re
-import copy
-import pandas as pd
+from collections.abc import Mapping
 
-## 半衰期单位转换字典
-HL_UNITS = {"fs": 1e-15, "ps": 1e-12, "ns": 1e-9, "us": 1e-6, "ms": 1e-3, "s": 1, "m": 60, "h": 3600, "d": 86400, "y": 31557600, "ky": 31557600e3, "My": 31557600e6, "Gy": 31557600e9}
-nuclides_data_path = "data/nndc_nudat_data_export.json"
+import numpy as np
 
-def nuclidesFilterZNA(nuclides_data, Z_min=None, Z_max=None, Z_oe_idx=0, N_min=None, N_max=None, N_oe_idx=0, A_min=None, A_max=None, A_oe_idx=0):
-    filtered = {}
-    for name, data in nuclides_data.items():
-        fh = True
-        if not (Z_min is None or data['z'] >= Z_min):
-            fh = False
-        if not (Z_max is None or data['z'] <= Z_max):
-            fh = False
-        if not (N_min is None or data['n'] >= N_min):
-            fh = False
-        if not (N_max is None or data['n'] <= N_max):
-            fh = False
-        if not (A_min is None or data['a'] >= A_min):
-            fh = False
-        if not (A_max is None or data['a'] <= A_max):
-            fh = False
-        
-        if Z_oe_idx == 1:
-            if data['z'] % 2 == 0:
-                fh = False
-        elif Z_oe_idx == 2:
-            if data['z'] % 2 == 1:
-                fh = False
-
-        if N_oe_idx == 1:
-            if data['n'] % 2 == 0:
-                fh = False
-        elif N_oe_idx == 2:
-            if data['n'] % 2 == 1:
-                fh = False
-
-        if A_oe_idx == 1:
-            if data['a'] % 2 == 0:
-                fh = False
-        elif A_oe_idx == 2:
-            if data['a'] % 2 == 1:
-                fh = False
-        
-        if fh:
-            filtered[name] = data
+import NDdata
+import NDindex
+import NDpaths
+import NDtable
 
-    return filtered
+nuclides_data_path = NDpaths.nuclides_data_path
+
+def nuclidesFilterZNA(nuclides_data, Z_min=None, Z_max=None, Z_oe_idx=0, N_min=None, N_max=None, N_oe_idx=0, A_min=None, A_max=None, A_oe_idx=0):
+    table, rows = NDtable.tableOf(nuclides_data)
+    mask = table.maskZNA(Z_min, Z_max, Z_oe_idx, N_min, N_max, N_oe_idx, A_min, A_max, A_oe_idx)
+    return NDtable.filterByMask(nuclides_data, table, rows, mask)
         
 def nuclidesFilterHalflife(nuclides_data, hl_min_sec=0, hl_max_sec=None):
-    filtered = {}
-    if hl_min_sec == None:
-        if hl_max_sec == None:
-            for name, data in nuclides_data.items():
-                if "levels" in data:
-                    for level in data["levels"]:
-                        if "halflife" in level:
-                            if level["halflife"]["value"] == "STABLE":
-                                filtered[name] = data
-                                break
-    else:
-        if hl_max_sec == None:
-            for name, data in nuclides_data.items():
-                if "levels" in data:
-                    for level in data["levels"]:
-                        if "halflife" in level:
-                            if level["halflife"]["value"] == "STABLE":
-                                filtered[name] = data
-                                break
-                            else:
-                                if not level["halflife"]["unit"] in HL_UNITS:
-                                    break
-                                hl_sec = level["halflife"]["value"] * HL_UNITS[level["halflife"]["unit"]]
-                                if hl_sec > hl_min_sec:
-                                    filtered[name] = data
-                                    break
-        else:
-            for name, data in nuclides_data.items():
-                if "levels" in data:
-                    for level in data["levels"]:
-                        if "halflife" in level:
-                            if level["halflife"]["value"] == "STABLE":
-                                pass
-                            else:
-                                if not level["halflife"]["unit"] in HL_UNITS:
-                                    break
-                                hl_sec = level["halflife"]["value"] * HL_UNITS[level["halflife"]["unit"]]
-                                if hl_sec > hl_min_sec and hl_sec < hl_max_sec:
-                                    filtered[name] = data
-                                    break
-
-    return filtered
+    table, rows = NDtable.tableOf(nuclides_data)
+    mask = table.maskHalflife(hl_min_sec, hl_max_sec)
+    return NDtable.filterByMask(nuclides_data, table, rows, mask)
 
 def nuclidesFilterDecayModes(nuclides_data, dm_enable_idx, decay_modes):
-    filtered = {}
-    nuclides_decayModes = {}
-    for name, data in nuclides_data.items():
-        decayModes = []
-        if "levels" in data:
-            for level in data["levels"]:
-                if "decayModes" in level:
-                    for decayData in level["decayModes"]["observed"]:
-                        if not decayData["mode"] in decayModes:
-                            decayModes.append(decayData["mode"])
-        nuclides_decayModes[name] = copy.deepcopy(decayModes)
-
-    decay_modes_series = pd.Series(decay_modes)
-
-    ## nndc导出的数据里有两处写作"β⁻"了
-    replace_dict = {"β⁻": "B-"}
-
-    for name, decayModes in nuclides_decayModes.items():
-        nuclide_decayModes_series = pd.Series(decayModes)
-        nuclide_decayModes_series = nuclide_decayModes_series.replace(replace_dict)
-
-        if dm_enable_idx == 1:
-            if decay_modes_series.isin(nuclide_decayModes_series).all():
-                filtered[name] = nuclides_data[name]
-        elif dm_enable_idx == 2:
-            if decay_modes_series.isin(nuclide_decayModes_series).any():
-                filtered[name] = nuclides_data[name]
-
-    return filtered
+    table, rows = NDtable.tableOf(nuclides_data)
+    mask = table.maskDecayModes(dm_enable_idx, decay_modes)
+    return NDtable.filterByMask(nuclides_data, table, rows, mask)
+
+## 含有符合条件的同核异能态(非第一个能级且有半衰期数据)的核素
+## e_min、e_max为能级能量(keV)，其余同nuclidesFilterHalflife()及nuclidesFilterDecayModes()，为None时不限制
+def nuclidesFilterIsomers(nuclides_data, hl_min_sec=None, hl_max_sec=None, e_min=None, e_max=None, dm_enable_idx=0, decay_modes=()):
+    table, rows = NDtable.tableOf(nuclides_data)
+    mask = table.maskIsomers(hl_min_sec, hl_max_sec, e_min, e_max, dm_enable_idx, decay_modes)
+    return NDtable.filterByMask(nuclides_data, table, rows, mask)
 
 def nuclidesSearchingNom(nuclides_data, nuclide_nom):
-    nuclide = None
-    element = None
-    nuclide_A = None
-    if not re.fullmatch(rf"([A-Za-z]+)([-_|]*)([0-9]+)", nuclide_nom) == None:
-        match00 = re.fullmatch(rf"([A-Za-z]+)([-_|]*)([0-9]+)", nuclide_nom)
-        element = match00.group(1)
-        nuclide_A = match00.group(3)
-    elif not re.fullmatch(rf"([0-9]+)([-_|]*)([A-Za-z]+)", nuclide_nom) == None:
-        match00 = re.fullmatch(rf"([0-9]+)([-_|]*)([A-Za-z]+)", nuclide_nom)
-        element = match00.group(3)
-        nuclide_A = match00.group(1)
-
-    if not (element == None or nuclide_A == None):
-        if not element in ("n", "N"):
-            if len(element) == 1:
-                element = element.upper()
-            else:
-                element = element[:1].upper() + element[1:].lower()
-        while nuclide_A.startswith("0"):
-            nuclide_A = nuclide_A[1:]
-        nom = nuclide_A + element
-        if nom in nuclides_data:
-            nuclide = nuclides_data[nom]
-    
-    return nuclide
+    return NDindex.indexOf(nuclides_data).searchNom(nuclide_nom)
 
 def nuclidesSearchingZN(nuclides_data, Z_in=0, N_in=0):
-    nuclide = None
-    for nom, data in nuclides_data.items():
-        if data["z"] == Z_in and data["n"] == N_in:
-            nuclide = data
-            break
-
-    return nuclide
+    return NDindex.indexOf(nuclides_data).searchZN(Z_in, N_in)
 
 def nuclidesSearchingZA(nuclides_data, Z_in=0, A_in=0):
-    nuclide = None
-    for nom, data in nuclides_data.items():
-        if data["z"] == Z_in and data["a"] == A_in:
-            nuclide = data
-            break
-
-    return nuclide
+    return NDindex.indexOf(nuclides_data).searchZA(Z_in, A_in)
 
 def nuclidesSearchingNA(nuclides_data, N_in=0, A_in=0):
-    nuclide = None
-    for nom, data in nuclides_data.items():
-        if data["n"] == N_in and data["a"] == A_in:
-            nuclide = data
-            break
+    return NDindex.indexOf(nuclides_data).searchNA(N_in, A_in)
+
+## nuclideData_dict2dataframe()的各列
+DATAFRAME_COLUMNS = ["Nuclide", "Z", "N", "A", "E(level)", "E(level) unit", "Spin Parity", "Mass Excess", "Mass Excess unit", "Mass Excess uncertainty", "Halflife", "Halflife unit", "Halflife uncertainty", "Decay Mode", "Branch Ratio"]
 
-    return nuclide
+## 各列的类型，未列出的列为字符串
+DATAFRAME_DTYPES = {"Z": "int64", "N": "int64", "A": "int64", "E(level)": "float64", "Mass Excess": "float64", "Mass Excess uncertainty": "float64", "Halflife": "float64", "Branch Ratio": "float64"}
 
+## pandas只在生成DataFrame时导入，只做筛选、查找时不需要
 def nuclideData_dict2dataframe(nuclideData_dict):
+    import pandas as pd
+    return pd.DataFrame(nuclideData_dict2rows(nuclideData_dict), columns=DATAFRAME_COLUMNS)
+
+## 将多个核素的数据一次性展开为各列的列表
+## nuclides可为核素数据的字典、核素数据的迭代器或NDtable.NuclidesTable(按表中顺序)
+def nuclidesData_dict2columns(nuclides):
+    if isinstance(nuclides, NDtable.NuclidesTable):
+        table = nuclides
+        nuclides = (table.source[name] for name in table.names)
+    elif isinstance(nuclides, Mapping):
+        nuclides = nuclides.values()
+
+    rows = []
+    for nuclideData_dict in nuclides:
+        rows.extend(nuclideData_dict2rows(nuclideData_dict))
+    if len(rows) == 0:
+        return {column: [] for column in DATAFRAME_COLUMNS}
+    return dict(zip(DATAFRAME_COLUMNS, zip(*rows)))
+
+## 多个核素展开后的整张表，各列同nuclideData_dict2dataframe()，类型见DATAFRAME_DTYPES
+def nuclidesData_dict2dataframe(nuclides):
+    import pandas as pd
+    columns = nuclidesData_dict2columns(nuclides)
+    data = {}
+    for column in DATAFRAME_COLUMNS:
+        if column in DATAFRAME_DTYPES:
+            data[column] = np.array(columns[column], dtype=DATAFRAME_DTYPES[column])
+        else:
+            data[column] = pd.array(columns[column], dtype=object)
+    return pd.DataFrame(data, columns=DATAFRAME_COLUMNS)
+
+## 同nuclidesData_dict2dataframe()，返回pyarrow.Table(需要pyarrow)
+def nuclidesData_dict2arrow(nuclides):
+    import pyarrow as pa
+    columns = nuclidesData_dict2columns(nuclides)
+    schema = arrowSchema()
+    arrays = []
+    for field in schema:
+        values = columns[field.name]
+        if field.type == pa.string():
+            values = [None if value is None else str(value) for value in values]
+        arrays.append(pa.array(values, type=field.type))
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+def arrowSchema():
+    import pyarrow as pa
+    types = {"int64": pa.int64(), "float64": pa.float64()}
+    return pa.schema([(column, types[DATAFRAME_DTYPES[column]] if column in DATAFRAME_DTYPES else pa.string()) for column in DATAFRAME_COLUMNS])
+
+## 将单个核素的数据展开为行(每个能级的每个衰变模式一行)，各列同DATAFRAME_COLUMNS
+def nuclideData_dict2rows(nuclideData_dict):
     nom = nuclideData_dict["name"]
     z = nuclideData_dict["z"]
     n = nuclideData_dict["n"]
@@ -199,8 +121,8 @@ def nuclideData_dict2dataframe(nuclideData_dict):
         if not "massExcess" in level:
             pass
         else:
-            massExcess = level["massExcess"]["unit"]
-            massExcess_unit = level["massExcess"]["value"]
+            massExcess = level["massExcess"]["value"]
+            massExcess_unit = level["massExcess"]["unit"]
             massExcess_unc = level["massExcess"]["uncertainty"]
 
         ## 半衰期
@@ -241,11 +163,10 @@ def nuclideData_dict2dataframe(nuclideData_dict):
             for decayMode in level["decayModes"]["observed"]:
                 data.append((nom, z, n, a, level["energy"]["value"], level["energy"]["unit"], spinParity, massExcess, massExcess_unit, massExcess_unc, hl, hl_unit, hl_unc, decayMode["mode"], decayMode["value"]))
 
-    nuclideDataframe = pd.DataFrame(data, columns=["Nuclide", "Z", "N", "A", "E(level)", "E(level) unit", "Spin Parity", "Mass Excess", "Mass Excess unit", "Mass Excess uncertainty", "Halflife", "Halflife unit", "Halflife uncertainty", "Decay Mode", "Branch Ratio"])
-
-    return nuclideDataframe
+    return data
 
 def nuclideData_dict2dataframeCompact(nuclideData_dict):
+    import pandas as pd
     data = []
     for level in nuclideData_dict["levels"]:
         ## 自旋宇称
@@ -285,106 +206,19 @@ def nuclideData_dict2dataframeCompact(nuclideData_dict):
 
     return nuclideDataframe
 
+## 基态半衰期分类，由核素表的基态汇总记录得到
 def nuclidesClassifyHalflife(data_path):
-    with open (data_path,'r', encoding='utf-8') as file:
-        nuclides_data = json.load(file)
-
-    classified = []
-    for nom, data in nuclides_data.items():
-        z = data["z"]
-        n = data["n"]
-        hl_type = "UN"
-
-        if len(data["levels"]) == 0:
-            hl_type = "UN"
-        elif not "halflife" in data["levels"][0]:
-            hl_type = "UN"
-        elif data["levels"][0]["halflife"]["value"] == "STABLE":
-            hl_type = "ST"
-        elif not data["levels"][0]["halflife"]["unit"] in HL_UNITS:
-            hl_type = "SU"
-        else:
-            hl_sec = data["levels"][0]["halflife"]["value"] * HL_UNITS[data["levels"][0]["halflife"]["unit"]]
-            if hl_sec < 1e-7:
-                hl_type = "l100ns"
-            elif hl_sec < 1e-6:
-                hl_type = "100ns"
-            elif hl_sec < 1e-5:
-                hl_type = "1us"
-            elif hl_sec < 1e-4:
-                hl_type = "10us"
-            elif hl_sec < 1e-3:
-                hl_type = "100us"
-            elif hl_sec < 1e-2:
-                hl_type = "1ms"
-            elif hl_sec < 1e-1:
-                hl_type = "10ms"
-            elif hl_sec < 1:
-                hl_type = "100ms"
-            elif hl_sec < 10:
-                hl_type = "1s"
-            elif hl_sec < 100:
-                hl_type = "10s"
-            elif hl_sec < 1e3:
-                hl_type = "100s"
-            elif hl_sec < 1e4:
-                hl_type = "1ks"
-            elif hl_sec < 1e5:
-                hl_type = "10ks"
-            elif hl_sec < 1e7:
-                hl_type = "100ks"
-            elif hl_sec < 1e10:
-                hl_type = "10Ms"
-            elif hl_sec < 1e15:
-                hl_type = "1e10s"
-            else:
-                hl_type = "1e15s"
-        
-        classified.append({"z":z, "n":n, "type":hl_type})
-
-    return classified
+    table = NDdata.getNuclides(data_path).table
+    return [{"z":ground.z, "n":ground.n, "type":ground.halflife_type} for ground in table.groundStates()]
 
+## 基态主要衰变模式(分支比最大者)分类
 def nuclidesClassifyDecayMode(data_path):
-    with open (data_path,'r', encoding='utf-8') as file:
-        nuclides_data = json.load(file)
-
-    classified = []
-    for nom, data in nuclides_data.items():
-        z = data["z"]
-        n = data["n"]
-        dm_type = "UNKNOWN"
-
-        if len(data["levels"]) == 0:
-            dm_type = "UNKNOWN"
-        elif not "decayModes" in data["levels"][0]:
-            dm_type = "UNKNOWN"
-            if "halflife" in data["levels"][0]:
-                if data["levels"][0]["halflife"]["value"] == "STABLE":
-                    dm_type = "STABLE"
-        else:
-            decay_modes = data["levels"][0]["decayModes"]["observed"] + data["levels"][0]["decayModes"]["predicted"]
-            if len(decay_modes) == 0:
-                dm_type = "UNKNOWN"
-            else:
-                ## 据分支比排序
-                dms1 = []
-                dms2 = []
-                dmsd = {}
-                dmsd1 = []
-                for decay_mode in decay_modes:  
-                    if not "value" in decay_mode:
-                        dms2.append(decay_mode)
-                    else:
-                        dmsd[decay_mode["mode"]] = decay_mode
-                        dmsd1.append((decay_mode["value"], decay_mode["mode"]))
-                dmsdf = pd.DataFrame(dmsd1, columns=["value", "mode"])
-                dmsdf.sort_values(by="value", ascending=False, inplace=True)
-                for mode in dmsdf["mode"]:
-                    dms1.append(dmsd[mode])
-                dms = dms1 + dms2
-                dm_type = dms[0]["mode"]
-        classified.append({"z":z, "n":n, "type":dm_type})
-
-    return classified
+    table = NDdata.getNuclides(data_path).table
+    return [{"z":ground.z, "n":ground.n, "type":ground.dominant_mode} for ground in table.groundStates()]
+
+## 最长寿命同核异能态的半衰期分类，无同核异能态的为"NONE"
+def nuclidesClassifyIsomer(data_path):
+    table = NDdata.getNuclides(data_path).table
+    return [{"z":z, "n":n, "type":isomer_type} for z, n, isomer_type in zip(table.z.tolist(), table.n.tolist(), table.isomerTypes())]
 
 ##test
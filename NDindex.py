@@ -0,0 +1,101 @@
+import re
+import threading
+
+## 核素名称的两种写法：元素在前(th-232)或质量数在前(232Th)
+NOM_PATTERN_EA = re.compile(r"([A-Za-z]+)([-_|]*)([0-9]+)")
+NOM_PATTERN_AE = re.compile(r"([0-9]+)([-_|]*)([A-Za-z]+)")
+
+## 将输入的核素名称规范化为数据集中的写法(如232Th)，无法识别时返回None
+def normalizeNom(nuclide_nom):
+    element = None
+    nuclide_A = None
+    match00 = NOM_PATTERN_EA.fullmatch(nuclide_nom)
+    if not match00 is None:
+        element = match00.group(1)
+        nuclide_A = match00.group(3)
+    else:
+        match00 = NOM_PATTERN_AE.fullmatch(nuclide_nom)
+        if not match00 is None:
+            element = match00.group(3)
+            nuclide_A = match00.group(1)
+
+    if element is None or nuclide_A is None:
+        return None
+
+    if not element in ("n", "N"):
+        if len(element) == 1:
+            element = element.upper()
+        else:
+            element = element[:1].upper() + element[1:].lower()
+    nuclide_A = nuclide_A.lstrip("0")
+    return nuclide_A + element
+
+## 核素查找索引
+## 由数据集一次性构建，(Z,N)、(Z,A)、(N,A)及规范化名称均为字典查找
+## 与原先的线性查找一致，键重复时保留数据集中的第一个核素
+class NuclideIndex:
+    def __init__(self, nuclides_data):
+        self.source = nuclides_data
+        self.by_nom = {}
+        self.by_ZN = {}
+        self.by_ZA = {}
+        self.by_NA = {}
+        for nom, data in nuclides_data.items():
+            self.by_nom.setdefault(nom, data)
+            self.by_ZN.setdefault((data["z"], data["n"]), data)
+            self.by_ZA.setdefault((data["z"], data["a"]), data)
+            self.by_NA.setdefault((data["n"], data["a"]), data)
+
+    def __len__(self):
+        return len(self.source)
+
+    def searchNom(self, nuclide_nom):
+        nom = normalizeNom(nuclide_nom)
+        if nom is None:
+            return None
+        return self.by_nom.get(nom)
+
+    def searchZN(self, Z_in=0, N_in=0):
+        return self.by_ZN.get((Z_in, N_in))
+
+    def searchZA(self, Z_in=0, A_in=0):
+        return self.by_ZA.get((Z_in, A_in))
+
+    def searchNA(self, N_in=0, A_in=0):
+        return self.by_NA.get((N_in, A_in))
+
+    ## 批量查找，mode为"nom"、"ZN"、"ZA"、"NA"之一
+    ## 返回与keys等长的列表，未找到的为None
+    def searchMany(self, mode, keys):
+        if mode == "nom":
+            return [self.searchNom(key) for key in keys]
+        elif mode == "ZN":
+            lookup = self.by_ZN
+        elif mode == "ZA":
+            lookup = self.by_ZA
+        elif mode == "NA":
+            lookup = self.by_NA
+        else:
+            raise ValueError(f"unknown search mode: {mode}")
+        return [lookup.get(tuple(key)) for key in keys]
+
+## 已构建的索引，按数据集对象复用
+## 界面的各请求在不同线程中处理，增删经_indexes_lock；构建索引时不持有锁，同时构建的以先加入的为准
+_indexes = []
+_indexes_max = 4
+_indexes_lock = threading.Lock()
+
+def indexOf(nuclides_data):
+    with _indexes_lock:
+        for index in _indexes:
+            if index.source is nuclides_data:
+                return index
+
+    index = NuclideIndex(nuclides_data)
+    with _indexes_lock:
+        for other in _indexes:
+            if other.source is nuclides_data:
+                return other
+        _indexes.insert(0, index)
+        del _indexes[_indexes_max:]
+    return index
@@ -0,0 +1,125 @@
+import argparse
+import csv
+import json
+import re
+import sys
+
+import NDdata
+import NDindex
+import NDpaths
+
+## 批量查找核素
+## 输入为核素名称(如"232Th, th-232, U235")或(Z,N)、(Z,A)、(N,A)数对，经预先构建的NDindex索引逐个查找
+## 结果逐条写出为csv或jsonl，命令行使用时不导入gradio、pandas及matplotlib
+
+nuclides_data_path = NDpaths.nuclides_data_path
+
+LOOKUP_MODES = ("nom", "ZN", "ZA", "NA")
+OUTPUT_FORMATS = ("csv", "jsonl")
+OUTPUT_FIELDS = ["query", "found", "name", "z", "n", "a"]
+
+## 名称之间的分隔符；名称内部的空格会被去掉(同app.process_search)
+NAME_SEPARATORS = re.compile(r"[,;\t\r\n]+")
+PAIR_PATTERN = re.compile(r"\s*\(?\s*(-?[0-9]+)\s*[,;\s]\s*(-?[0-9]+)\s*\)?\s*")
+
+## 将文本行拆分为待查找的键
+## mode为"nom"时每行可含多个名称；其余模式每行一个数对，如"92,143"或"(92, 143)"
+def parseKeys(lines, mode="nom"):
+    for line in lines:
+        if mode == "nom":
+            for name in NAME_SEPARATORS.split(line):
+                name = name.replace(" ", "")
+                if name != "":
+                    yield name
+        else:
+            line = line.strip()
+            if line == "":
+                continue
+            match00 = PAIR_PATTERN.fullmatch(line)
+            if match00 is None:
+                yield line
+            else:
+                yield (int(match00.group(1)), int(match00.group(2)))
+
+## 逐个查找，产生与OUTPUT_FIELDS对应的字典
+## keys为名称或数对，无法解析的数对(原样保留的字符串)视为未找到
+def resolveMany(keys, mode="nom", index=None):
+    if not mode in LOOKUP_MODES:
+        raise ValueError(f"unknown lookup mode: {mode}")
+    if index is None:
+        index = NDindex.indexOf(NDdata.getNuclides(nuclides_data_path))
+
+    search = {"nom": index.searchNom, "ZN": index.searchZN, "ZA": index.searchZA, "NA": index.searchNA}[mode]
+    for key in keys:
+        data = None
+        if mode == "nom":
+            query = key
+            data = search(key)
+        elif isinstance(key, str):
+            query = key
+        else:
+            query = f"{key[0]},{key[1]}"
+            data = search(key[0], key[1])
+
+        if data is None:
+            yield {"query": query, "found": False, "name": None, "z": None, "n": None, "a": None}
+        else:
+            yield {"query": query, "found": True, "name": data["name"], "z": data["z"], "n": data["n"], "a": data["a"]}
+
+def writeCSV(results, file):
+    count = 0
+    writer = csv.DictWriter(file, fieldnames=OUTPUT_FIELDS)
+    writer.writeheader()
+    for result in results:
+        writer.writerow(result)
+        count += 1
+    return count
+
+def writeJsonLines(results, file):
+    count = 0
+    for result in results:
+        file.write(json.dumps(result, ensure_ascii=False) + "\n")
+        count += 1
+    return count
+
+## 查找lines中的全部键并写入file，返回(总数, 找到的数目)
+def lookupLines(lines, file, mode="nom", fmt="csv"):
+    if not fmt in OUTPUT_FORMATS:
+        raise ValueError(f"unknown output format: {fmt}")
+    found = [0]
+    def counted(results):
+        for result in results:
+            if result["found"]:
+                found[0] += 1
+            yield result
+    results = counted(resolveMany(parseKeys(lines, mode), mode))
+    if fmt == "csv":
+        count = writeCSV(results, file)
+    else:
+        count = writeJsonLines(results, file)
+    return count, found[0]
+
+def iterFileLines(paths):
+    for path in paths:
+        if path == "-":
+            yield from sys.stdin
+        else:
+            with open(path, "r", encoding="utf-8") as file:
+                yield from file
+
+## 用法：python NDlookup.py [-m nom|ZN|ZA|NA] [-f csv|jsonl] [-o 输出文件] [输入文件 ...]
+## 未给出输入文件时由标准输入读取，未给出输出文件时写到标准输出
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="批量查找核素")
+    parser.add_argument("inputs", nargs="*", default=["-"])
+    parser.add_argument("-m", "--mode", choices=LOOKUP_MODES, default="nom")
+    parser.add_argument("-f", "--format", choices=OUTPUT_FORMATS, default="csv")
+    parser.add_argument("-o", "--output", default="-")
+    args = parser.parse_args()
+
+    if args.output == "-":
+        count, found = lookupLines(iterFileLines(args.inputs), sys.stdout, args.mode, args.format)
+    else:
+        with open(args.output, "w", encoding="utf-8", newline="") as file:
+            count, found = lookupLines(iterFileLines(args.inputs), file, args.mode, args.format)
+    print(f"{found}/{count}", file=sys.stderr)
@@ -0,0 +1,34 @@
+import os
+
+## 数据文件及缓存目录的路径
+## 均相对于本文件所在目录解析，与运行时的工作目录无关
+
+package_dir = os.path.dirname(os.path.abspath(__file__))
+data_dir = os.path.join(package_dir, "data")
+cache_dir = os.path.join(data_dir, "cache")
+
+def dataPath(*parts):
+    return os.path.join(data_dir, *parts)
+
+def cachePath(*parts):
+    return os.path.join(cache_dir, *parts)
+
+## 本目录以外的数据文件(如NDdiff、NDbuild的--export所给的导出数据)的缓存目录，位于用户的缓存目录中，不写入本目录
+user_cache_dir = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"), "NuclearDataTools")
+
+## 数据文件是否位于data目录中(Windows下不在同一盘符时commonpath抛出ValueError)
+def isPackageData(path):
+    try:
+        return os.path.commonpath([os.path.abspath(path), data_dir]) == data_dir
+    except ValueError:
+        return False
+
+nuclides_data_path = dataPath("nndc_nudat_data_export.json")
+data_synthesisMethods_path = dataPath("Nuclides_synthesisMethods.json")
+ElementsList_path = dataPath("ElementsList.json")
+data_NuclidesClassifiedHalflife_path = dataPath("NuclidesClassifiedHalflife.json")
+data_NuclidesClassifiedDecayModes_path = dataPath("NuclidesClassifiedDecayModes.json")
+haveDecayPage_path = dataPath("haveDecayPage.json")
+
+## 核素图所用的数据文件，内容变化时渲染缓存失效
+chart_data_paths = (nuclides_data_path, ElementsList_path, data_NuclidesClassifiedHalflife_path, data_NuclidesClassifiedDecayModes_path, data_synthesisMethods_path)
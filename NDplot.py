@@ -1,12 +1,12 @@
-import copy
-import json
 import math
-import re
 import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
 #import matplotlib.colors as mcolors
-from matplotlib.patches import Patch
+
+import NDdata
+import NDpaths
+import NDtable
+
+## matplotlib只在绘图的函数中导入，仅使用颜色网格、图例等数据时(如NDchart、NDtiles)不加载
 
 ## the synthesis methods: Mass Spectroscopy, Radioactive Decay, Light Particles, Fission, Fusion, Spallation, Projectile Fragmentation, and Transfer/Deep Inelastic Scattering
 colors_synthesisMethods = {
@@ -101,16 +101,133 @@ legends_DecayModes = {
     "UNKNOWN":"UNKNOWN"
 }
 
-nuclides_data_path = "data/nndc_nudat_data_export.json"
-data_synthesisMethods_path = "data/Nuclides_synthesisMethods.json"
-ElementsList_path = "data/ElementsList.json"
-data_NuclidesClassifiedHalflife_path = "data/NuclidesClassifiedHalflife.json"
-data_NuclidesClassifiedDecayModes_path = "data/NuclidesClassifiedDecayModes.json"
+## 同核异能态，plot_mode=3：按最长寿命同核异能态的半衰期上色，颜色同colors_halflife
+colors_isomer = {tag: color for tag, color in colors_halflife.items() if tag != "ST"}
+colors_isomer["NONE"] = (240, 240, 240)
+
+legends_isomer = {tag: label for tag, label in legends_halflife.items() if tag != "ST"}
+legends_isomer["1e15s"] = ">1e15s or Stable"
+legends_isomer["NONE"] = "No isomer"
+
+## 两份导出数据的差异(NDdiff.diffCells())，plot_mode=4
+colors_diff = {
+    "added"   : (82, 181, 82),
+    "removed" : (0, 0, 0),
+    "halflife": (255, 148, 115),
+    "decay"   : (99, 198, 222),
+    "levels"  : (156, 123, 189),
+    "other"   : (255, 255, 66),
+    "same"    : (224, 224, 224)
+}
+
+legends_diff = {
+    "added"   : "Added",
+    "removed" : "Removed",
+    "halflife": "Halflife changed",
+    "decay"   : "DecayModes changed",
+    "levels"  : "Levels added/removed",
+    "other"   : "Other data changed",
+    "same"    : "Unchanged"
+}
+
+nuclides_data_path = NDpaths.nuclides_data_path
+
+## 坐标轴标题的字体，其余文字使用matplotlib的默认字体；NDchart直接写出的核素图同此
+label_font = 'Times New Roman'
+data_synthesisMethods_path = NDpaths.data_synthesisMethods_path
+ElementsList_path = NDpaths.ElementsList_path
+data_NuclidesClassifiedHalflife_path = NDpaths.data_NuclidesClassifiedHalflife_path
+data_NuclidesClassifiedDecayModes_path = NDpaths.data_NuclidesClassifiedDecayModes_path
 
 ## 使用matplotlib绘图
 ## 入参为核素分类模式、所绘制核素区域、显示信息、有无图例
-## area部分待完善
-def nucildesChartPlotPLT(plot_mode=0, area=((0,0),(118,177)), text_mode=0, have_legend=True):
+## area为((Z最小值, N最小值), (Z最大值, N最大值))，方块位置及刻度均为实际的Z、N
+## cells为[{"z", "n", "type"}]，给出时代替该模式的分类数据，差异模式(4)须给出
+## highlight为[(Z, N)]，给出时这些核素加框，其余核素淡化(如NDdecay.decayChainCells()给出的衰变链)
+def nucildesChartPlotPLT(plot_mode=0, area=((0,0),(118,177)), text_mode=0, have_legend=True, batched_text=True, cells=None, highlight=None):
+    from matplotlib.figure import Figure
+
+    layout = chartLayout(area, text_mode)
+    z_min, n_min, z_max, n_max = layout["area"]
+    area_ysize, area_xsize = layout["area_size"]
+    fontsize_label = layout["fontsize_label"]
+    fontsize_ticks = layout["fontsize_ticks"]
+    dpi = layout["dpi"]
+    dx = layout["dx"]
+    dy = layout["dy"]
+
+    ## 使用面向对象的Figure接口，不经过pyplot的全局状态，可在多个线程中分别绘制
+    ## 用毕由调用方以closeFigure()释放
+    fig = Figure(figsize=layout["figsize"], dpi=dpi)
+    ax = fig.add_subplot()
+
+
+    ## 核素区域绘制，默认白色背景
+    bg_color = (255, 255, 255)
+    color_data = np.full((area_ysize, area_xsize, 3), bg_color)
+
+    xposg = layout["xposg"]
+    yposg = layout["yposg"]
+
+    xgrid = np.tile(xposg.reshape(1, -1), (area_ysize + 1, 1))
+    ygrid = np.tile(yposg.reshape(-1, 1), (1, area_xsize + 1))
+
+    xgridI = xgrid / dpi
+    ygridI = ygrid / dpi
+
+    ## 根据核素分类模式上色
+    color_data = nucildesChartPlotPLTColor(color_data, plot_mode, z_min, n_min ,z_max, n_max, cells)
+
+    ## 高亮以外的核素向白色淡化
+    if not highlight is None:
+        highlight_mask = highlightMask(highlight, z_min, n_min, z_max, n_max)
+        color_data = dimColors(color_data, ~highlight_mask)
+
+    ## 停用imshow转用pcolormesh以便控制各网格大小以及绘制边框
+    #ax.imshow(color_data, origin="lower", extent=[n_min-0.5, n_max+0.5, z_min-0.5, z_max+0.5])
+    ax.pcolormesh(xgridI, ygridI, color_data.astype(np.uint8), edgecolors="white", linewidth=layout["edge_linewidth"])
+    if not highlight is None:
+        ax.add_collection(highlightCollection(highlight_mask, xposg, yposg, dpi, layout["edge_linewidth"]), autolim=False)
+
+
+    ## 绘制坐标轴
+    ax.set_xlim(layout["xlim"])
+    ax.set_ylim(layout["ylim"])
+    ax.set_xlabel("Neutron number", fontsize=fontsize_label, font=label_font)
+    ax.set_ylabel("Proton number" , fontsize=fontsize_label, font=label_font)
+
+    ## 刻度绘制，同样取整十 (ticks_step = 10)
+    ax.set_xticks(layout["xtickspos"], layout["xticks"], fontsize=fontsize_ticks)
+    ax.set_yticks(layout["ytickspos"], layout["yticks"], fontsize=fontsize_ticks)
+
+    ## 图例添加
+    ## 默认大小匹配全图绘制
+    if have_legend:
+        legend_handles = legendHandlesGet(plot_mode)
+        ax.legend(handles=legend_handles, loc="lower right", fontsize=legendFontsize(len(legend_handles), fontsize_ticks))
+
+    ## 添加显示信息
+    ## batched_text为True时所有文本按字符合并为PathCollection绘制，否则每个核素调用一次ax.text
+    if text_mode in text_layouts:
+        text_data = nucildesChartPlotPLTText(plot_mode, z_min, n_min ,z_max, n_max, cells)
+        if len(text_data) > 0:
+            texts, xy, text_colors = textLayerData(text_data, text_mode, color_data, dx, dy, dpi, n_min, z_min)
+            y_ratio, fontsize_text, va = text_layouts[text_mode]
+            if batched_text:
+                for collection in textLayerCollections(fig, ax, texts, xy, text_colors, fontsize_text, va):
+                    ax.add_collection(collection, autolim=False)
+            else:
+                for text, (txposi, typosi), text_color in zip(texts, xy, text_colors):
+                    ax.text(txposi, typosi, text, ha="center", va=va, ma="center", color=text_color, fontsize=fontsize_text)
+
+    #fig.savefig("test.svg", format="svg")
+    #fig.savefig("test.png", format="png")
+
+    return fig
+
+## 核素图的版面：图片大小、方块及刻度的位置(以英寸为单位的数据坐标)、坐标轴范围及字号
+## 由nucildesChartPlotPLT()及NDchart共用，两者绘制的图版面一致
+def chartLayout(area=((0,0),(118,177)), text_mode=0):
     ## 确定绘制核素区域
     z_min, n_min = area[0]
     z_max, n_max = area[1]
@@ -156,302 +273,362 @@ def nucildesChartPlotPLT(plot_mode=0, area=((0,0),(118,177)), text_mode=0, have_
     x_max = math.ceil(n_max / 10) * 10
     y_min = math.floor(z_min / 10) * 10
     y_max = math.ceil(z_max / 10) * 10
-
-    fig = plt.figure(figsize=(10*resize_ratio*(x_max-x_min)/200, 6*resize_ratio*(y_max-y_min)/130), dpi=dpi)
-    ax = plt.gca()
-
-
-    ## 核素区域绘制，默认白色背景
-    bg_color = (255, 255, 255)
-    color_data = np.full((area_ysize, area_xsize, 3), bg_color)
+    ## 区域恰为整十的单行或单列时，至少绘制十格的范围
+    if x_max == x_min:
+        x_max = x_min + 10
+    if y_max == y_min:
+        y_max = y_min + 10
 
     dx = nbwidth  * resize_ratio
     dy = nbheight * resize_ratio
-    xposg = np.arange(0, area_xsize*dx + dx, dx)
-    yposg = np.arange(0, area_ysize*dy + dy, dy)
-
-    xgrid = np.tile(xposg.reshape(1, -1), (area_ysize + 1, 1))
-    ygrid = np.tile(yposg.reshape(-1, 1), (1, area_xsize + 1))
-
-    xgridI = xgrid / dpi
-    ygridI = ygrid / dpi
-
-    ## 根据核素分类模式上色
-    color_data = nucildesChartPlotPLTColor(copy.deepcopy(color_data), plot_mode, z_min, n_min ,z_max, n_max)
-
-    ## 停用imshow转用pcolormesh以便控制各网格大小以及绘制边框
-    #ax.imshow(color_data, origin="lower", extent=[n_min-0.5, n_max+0.5, z_min-0.5, z_max+0.5])
-    ax.pcolormesh(xgridI, ygridI, color_data.astype(np.uint8), edgecolors="white", linewidth=4*resize_ratio/dpi)
-
-
-    ## 绘制坐标轴
-    ax.set_xlim(((x_min-5)*dx/dpi, (x_max+20)*dx/dpi))
-    ax.set_ylim(((y_min-5)*dy/dpi, (y_max+10)*dy/dpi))
-    ax.set_xlabel("Neutron number", fontsize=fontsize_label, font='Times New Roman')
-    ax.set_ylabel("Proton number" , fontsize=fontsize_label, font='Times New Roman')
 
     ## 刻度绘制，同样取整十 (ticks_step = 10)
     xticks = np.arange(x_min, x_max + 20 + ticks_step, ticks_step)
     yticks = np.arange(y_min, y_max + 10 + ticks_step, ticks_step)
     xtickspos = (xticks * dx + np.ones(len(xticks)) * 0.5 * dx) / dpi
     ytickspos = (yticks * dy + np.ones(len(yticks)) * 0.5 * dy) / dpi
-    ax.set_xticks(xtickspos, xticks, fontsize=fontsize_ticks)
-    ax.set_yticks(ytickspos, yticks, fontsize=fontsize_ticks)
-
-    ## 图例添加
-    ## 默认大小匹配全图绘制
-    if have_legend:
-        legend_handles = legendHandlesGet(plot_mode)
-        if len(legend_handles) < 13:
-            fontsize_legend = fontsize_ticks
-        else:
-            fontsize_legend = fontsize_ticks * 0.6
-        plt.legend(handles=legend_handles, loc="lower right", fontsize=fontsize_legend)
 
-    ## 添加显示信息
-    if not text_mode == 0:
-        color_weight = np.array((0.299, 0.587, 0.114))
-        text_data = nucildesChartPlotPLTText(plot_mode, z_min, n_min ,z_max, n_max)
-
-        ## 显示元素名称
-        if text_mode == 1:
-            for tdata in text_data:
-                ## 根据方块颜色选择文本颜色(黑或白)
-                base_color = color_data[tdata["pos"][1]][tdata["pos"][0]]
-                if np.dot(color_weight, base_color) > 128:
-                    text_color = "black"
-                else:
-                    text_color = "white"
-
-                txposi = (tdata["pos"][0] + 0.5) * dx / dpi
-                typosi = (tdata["pos"][1] + 0.5) * dy / dpi
-                ax.text(txposi, typosi, tdata["text01"], ha="center", va="center", color=text_color, fontsize=6)
-
-        ## 显示核素名称
-        elif text_mode == 2:
-            for tdata in text_data:
-                ## 根据方块颜色选择文本颜色(黑或白)
-                base_color = color_data[tdata["pos"][1]][tdata["pos"][0]]
-                if np.dot(color_weight, base_color) > 128:
-                    text_color = "black"
-                else:
-                    text_color = "white"
-
-                txposi = (tdata["pos"][0] + 0.5) * dx / dpi
-                typosi = (tdata["pos"][1] + 0.5) * dy / dpi
-                ax.text(txposi, typosi, tdata["text02"], ha="center", va="center", color=text_color, fontsize=6)
-
-        ## 显示详细信息
-        elif text_mode == 3:
-            for tdata in text_data:
-                ## 根据方块颜色选择文本颜色(黑或白)
-                base_color = color_data[tdata["pos"][1]][tdata["pos"][0]]
-                if np.dot(color_weight, base_color) > 128:
-                    text_color = "black"
-                else:
-                    text_color = "white"
-
-                txposi = (tdata["pos"][0] + 0.5) * dx / dpi
-                typosi = (tdata["pos"][1] + 0.85) * dy / dpi
-                text = tdata["text02"] + "\n" + tdata["text03"]
-                ax.text(txposi, typosi, text, ha="center", va="top", ma="center", color=text_color, fontsize=2.4)
-                
-        
-    
-    #fig.savefig("test.svg", format="svg")
-    #fig.savefig("test.png", format="png")
-    #plt.show()
-
-    return fig
-
-def nucildesChartPlotPLTColor(color_data, mode, z_min, n_min ,z_max, n_max):
-    ## 据半衰期上色
-    ## 默认使用基态数据
+    ## 坐标轴范围；刻度超出范围时matplotlib会扩展范围至最后一个刻度，此处一并计入
+    xlim = ((x_min-5)*dx/dpi, (x_max+20)*dx/dpi)
+    ylim = ((y_min-5)*dy/dpi, (y_max+10)*dy/dpi)
+
+    return {
+        "area": (z_min, n_min, z_max, n_max),
+        "area_size": (area_ysize, area_xsize),
+        "resize_ratio": resize_ratio,
+        "fontsize_label": fontsize_label,
+        "fontsize_ticks": fontsize_ticks,
+        "dpi": dpi,
+        "dx": dx,
+        "dy": dy,
+        "figsize": (10*resize_ratio*(x_max-x_min)/200, 6*resize_ratio*(y_max-y_min)/130),
+        "xposg": (n_min + np.arange(area_xsize + 1)) * dx,
+        "yposg": (z_min + np.arange(area_ysize + 1)) * dy,
+        "xlim": xlim,
+        "ylim": ylim,
+        "xlim_shown": (min(xlim[0], xtickspos[0]), max(xlim[1], xtickspos[-1])),
+        "ylim_shown": (min(ylim[0], ytickspos[0]), max(ylim[1], ytickspos[-1])),
+        "xticks": xticks,
+        "yticks": yticks,
+        "xtickspos": xtickspos,
+        "ytickspos": ytickspos,
+        "edge_linewidth": 4*resize_ratio/dpi
+    }
+
+## 图例字号：图例项较多时缩小
+def legendFontsize(count, fontsize_ticks):
+    if count < 13:
+        return fontsize_ticks
+    return fontsize_ticks * 0.6
+
+## 释放nucildesChartPlotPLT()返回的图，清除其中的全部artist
+def closeFigure(fig):
+    fig.clear()
+
+def nucildesChartPlotPLTColor(color_data, mode, z_min, n_min ,z_max, n_max, cells=None):
+    ## 据半衰期(0)、衰变模式(1)、合成方法(2)、同核异能态(3)、两份导出数据的差异(4)上色
+    ## 半衰期及衰变模式默认使用基态数据，分别来自NDfilter.nuclidesClassifyHalflife()及NDfilter.nuclidesClassifyDecayMode()
     ## nndc上的nudat3绘制时若基态无数据则会使用激发态的数据，此处与其不同 比如：137Pm、154Lu、161Ta 等
-    if mode == 0:
-        ## 自NDfilter.nuclidesClassifyHalflife()
-        with open(data_NuclidesClassifiedHalflife_path, "r", encoding="utf8") as file:
-            data = json.load(file)
+    if mode in (0, 1, 2, 3) or (mode == 4 and not cells is None):
+        z, n, codes = nuclidesCategoryCodes(mode, cells)
+        rasterizeColors(color_data, z, n, codes, colors_lut[mode], z_min, n_min, z_max, n_max)
 
-        for row in data:
-            if (row["z"] >= z_min and row["z"] <= z_max) and (row["n"] >= n_min and row["n"] <= n_max):
-                ypos = row["z"] - z_min
-                xpos = row["n"] - n_min
-                if row["type"] in colors_halflife:
-                    color_data[ypos][xpos] = np.array(colors_halflife[row["type"]])
-
-    ## 据衰变模式上色
-    elif mode == 1:
-        ## 自NDfilter.nuclidesClassifyDecayMode()
-        with open(data_NuclidesClassifiedDecayModes_path, "r", encoding="utf8") as file:
-            data = json.load(file)
-
-        for row in data:
-            if (row["z"] >= z_min and row["z"] <= z_max) and (row["n"] >= n_min and row["n"] <= n_max):
-                ypos = row["z"] - z_min
-                xpos = row["n"] - n_min
-                if row["type"] in colors_DecayModes:
-                    color_data[ypos][xpos] = np.array(colors_DecayModes[row["type"]])
-                elif row["type"] in ("2B-", "β⁻"):
-                    color_data[ypos][xpos] = np.array(colors_DecayModes["B-"])
-                elif row["type"] in ("2P", "3P"):
-                    color_data[ypos][xpos] = np.array(colors_DecayModes["P"])
-                elif row["type"] in ("2N"):
-                    color_data[ypos][xpos] = np.array(colors_DecayModes["N"])
-                else:
-                    color_data[ypos][xpos] = np.array(colors_DecayModes["UNKNOWN"])
-
-    ## 据合成方法上色
-    elif mode == 2:
-        with open(data_synthesisMethods_path, "r", encoding="utf8") as file:
-            data = json.load(file)
-
-        for row in data:
-            if (row["z"] >= z_min and row["z"] <= z_max) and (row["n"] >= n_min and row["n"] <= n_max):
-                ypos = row["z"] - z_min
-                xpos = row["n"] - n_min
-                if row["type"] in colors_synthesisMethods:
-                    color_data[ypos][xpos] = np.array(colors_synthesisMethods[row["type"]])
+    return color_data
 
+## 各分类模式的类别编码及颜色查找表，编码即类别在颜色字典中的顺序
+colors_byMode = {0: colors_halflife, 1: colors_DecayModes, 2: colors_synthesisMethods, 3: colors_isomer, 4: colors_diff}
+colors_lut = {mode: np.array(list(colors.values())) for mode, colors in colors_byMode.items()}
+paths_byMode = {0: data_NuclidesClassifiedHalflife_path, 1: data_NuclidesClassifiedDecayModes_path, 2: data_synthesisMethods_path}
+
+## 衰变模式的别名，以及不在颜色字典中的类别的归属
+## 半衰期、合成方法模式下未知类别不上色(编码为-1)，衰变模式下归为UNKNOWN
+aliases_DecayModes = {
+    "2B-": "B-",
+    "β⁻" : "B-",
+    "2P" : "P",
+    "3P" : "P",
+    "2N" : "N"
+}
+## 同核异能态模式下最长寿命者为STABLE的归入"1e15s"(同半衰期模式的图例)
+aliases_isomer = {"ST": "1e15s"}
+aliases_byMode = {0: {}, 1: aliases_DecayModes, 2: {}, 3: aliases_isomer, 4: {}}
+fallback_byMode = {0: None, 1: "UNKNOWN", 2: None, 3: None, 4: None}
+
+## 分类结果按数据集对象缓存，数据文件更新后重新编码
+## 同核异能态模式的分类由核素表的能级列得到，按核素表缓存；给出cells时以其代替数据文件，不缓存
+_category_codes = {}
+
+def nuclidesCategoryCodes(mode, cells=None):
+    if not cells is None:
+        data = cells
+    elif mode == 3:
+        data = NDdata.getNuclides(nuclides_data_path).table
+    else:
+        data = NDdata.getJson(paths_byMode[mode])
+    cached = _category_codes.get(mode)
+    if not cached is None and cached[0] is data:
+        return cached[1]
+
+    code_of = {tag: idx for idx, tag in enumerate(colors_byMode[mode])}
+    for alias, tag in aliases_byMode[mode].items():
+        code_of[alias] = code_of[tag]
+    fallback = -1 if fallback_byMode[mode] is None else code_of[fallback_byMode[mode]]
+
+    if mode == 3 and cells is None:
+        z = data.z.astype(np.int32)
+        n = data.n.astype(np.int32)
+        codes = np.array([code_of.get(isomer_type, fallback) for isomer_type in data.isomerTypes()], dtype=np.int32)
+    else:
+        z = np.array([row["z"] for row in data], dtype=np.int32)
+        n = np.array([row["n"] for row in data], dtype=np.int32)
+        codes = np.array([code_of.get(row["type"], fallback) for row in data], dtype=np.int32)
+
+    if cells is None:
+        _category_codes[mode] = (data, (z, n, codes))
+    return z, n, codes
+
+## 以一次花式索引赋值填充颜色网格，编码为-1的核素保持原色
+def rasterizeColors(color_data, z, n, codes, lut, z_min, n_min, z_max, n_max):
+    inside = (z >= z_min) & (z <= z_max) & (n >= n_min) & (n <= n_max) & (codes >= 0)
+    color_data[z[inside] - z_min, n[inside] - n_min] = lut[codes[inside]]
     return color_data
 
-def legendHandlesGet(plot_mode):
-    handles = []
+## 高亮框的颜色及线宽(方块边框线宽的倍数)，其余核素与白色混合的比例
+highlight_color = (255, 0, 0)
+highlight_linewidth_ratio = 5
+highlight_dim = 0.75
+
+## highlight中位于区域内的核素，形如color_data的前两维
+def highlightMask(highlight, z_min, n_min, z_max, n_max):
+    mask = np.zeros((z_max - z_min + 1, n_max - n_min + 1), dtype=bool)
+    for z, n in highlight:
+        if z_min <= z <= z_max and n_min <= n <= n_max:
+            mask[z - z_min, n - n_min] = True
+    return mask
+
+def dimColors(color_data, mask):
+    color_data = color_data.astype(np.float64)
+    color_data[mask] = color_data[mask] * (1 - highlight_dim) + 255 * highlight_dim
+    return np.rint(color_data)
+
+## 高亮框，各方块的边界取自版面的xposg、yposg(像素)
+def highlightCollection(mask, xposg, yposg, dpi, edge_linewidth):
+    from matplotlib.collections import PolyCollection
+
+    rows, cols = np.nonzero(mask)
+    x0 = xposg[cols] / dpi
+    x1 = xposg[cols + 1] / dpi
+    y0 = yposg[rows] / dpi
+    y1 = yposg[rows + 1] / dpi
+    verts = np.stack([np.stack([x0, y0], axis=1), np.stack([x1, y0], axis=1), np.stack([x1, y1], axis=1), np.stack([x0, y1], axis=1)], axis=1)
+    return PolyCollection(verts, facecolors="none", edgecolors=[np.array(highlight_color)/255.], linewidths=edge_linewidth * highlight_linewidth_ratio)
+
+## 各显示信息模式下文本的纵向位置(方块内比例)、字号及纵向对齐方式
+## 1: 元素名称，2: 核素名称，3: 详细信息
+text_layouts = {
+    1: (0.5, 6, "center"),
+    2: (0.5, 6, "center"),
+    3: (0.85, 2.4, "top")
+}
+
+## 文本内容、位置(以英寸为单位的数据坐标)及颜色
+## text_data中的位置相对于区域左下角(n_min, z_min)，color_data同
+def textLayerData(text_data, text_mode, color_data, dx, dy, dpi, n_min=0, z_min=0):
+    pos = np.array([tdata["pos"] for tdata in text_data])
+    if text_mode == 1:
+        texts = [tdata["text01"] for tdata in text_data]
+    elif text_mode == 2:
+        texts = [tdata["text02"] for tdata in text_data]
+    else:
+        texts = [tdata["text02"] + "\n" + tdata["text03"] for tdata in text_data]
+
+    ## 根据方块颜色选择文本颜色(黑或白)
+    color_weight = np.array((0.299, 0.587, 0.114))
+    bright = color_data[pos[:, 1], pos[:, 0]] @ color_weight > 128
+    text_colors = np.where(bright, "black", "white")
+
+    y_ratio = text_layouts[text_mode][0]
+    xy = np.column_stack(((n_min + pos[:, 0] + 0.5) * dx / dpi, (z_min + pos[:, 1] + y_ratio) * dy / dpi))
+    return texts, xy, text_colors
+
+## 文本排版缓存：各字符及其相对于对齐点的位置，单位为磅
+_text_glyphs = {}
+## 单个字符的路径缓存，单位为磅，原点为基线上的起笔点
+_glyph_paths = {}
+
+def glyphPathGet(char, fontsize):
+    from matplotlib.textpath import TextPath
+
+    key = (char, fontsize)
+    if not key in _glyph_paths:
+        _glyph_paths[key] = TextPath((0, 0), char, size=fontsize)
+    return _glyph_paths[key]
+
+## 字符步进宽度及字偶距缓存，单位为磅
+_glyph_advances = {}
+_glyph_kernings = {}
+
+def glyphAdvanceGet(char, previous, fontsize):
+    from matplotlib.font_manager import FontProperties, findfont, get_font
+    from matplotlib.ft2font import Kerning, LoadFlags
+
+    if not (char, fontsize) in _glyph_advances:
+        font = get_font(findfont(FontProperties()))
+        font.set_size(fontsize, 72)
+        _glyph_advances[(char, fontsize)] = font.load_char(ord(char), flags=LoadFlags.NO_HINTING).linearHoriAdvance / 65536
+    if previous is None:
+        return 0., _glyph_advances[(char, fontsize)]
+    if not (previous, char, fontsize) in _glyph_kernings:
+        font = get_font(findfont(FontProperties()))
+        font.set_size(fontsize, 72)
+        _glyph_kernings[(previous, char, fontsize)] = font.get_kerning(font.get_char_index(ord(previous)), font.get_char_index(ord(char)), Kerning.DEFAULT) / 64
+    return _glyph_kernings[(previous, char, fontsize)], _glyph_advances[(char, fontsize)]
+
+_font_extents = {}
+
+def fontExtentsGet(fontsize):
+    if not fontsize in _font_extents:
+        extents = glyphPathGet("lp", fontsize).get_extents()
+        _font_extents[fontsize] = (extents.y0, extents.y1)
+    return _font_extents[fontsize]
+
+def textGlyphsGet(text, fontsize, va):
+    key = (text, fontsize, va)
+    if key in _text_glyphs:
+        return _text_glyphs[key]
+
+    ## 逐行排版并水平居中(ma="center")，行距同matplotlib默认的1.2倍
+    line_height = fontsize * 1.2
+    chars = []
+    positions = []
+    for idx, line in enumerate(text.split("\n")):
+        advances = []
+        x = 0.
+        previous = None
+        for char in line:
+            kerning, advance = glyphAdvanceGet(char, previous, fontsize)
+            x += kerning
+            advances.append(x)
+            x += advance
+            previous = char
+        for char, advance in zip(line, advances):
+            if char.strip() == "":
+                continue
+            chars.append(char)
+            positions.append((advance - x / 2, -idx * line_height))
+
+    ## 纵向对齐以字体的上下沿为准，以免不同字母的文本高低不一
+    ref_y0, ref_y1 = fontExtentsGet(fontsize)
+    positions = np.array(positions).reshape(-1, 2)
+    if va == "top":
+        positions[:, 1] -= ref_y1
+    else:
+        positions[:, 1] -= (ref_y0 + ref_y1) / 2
+
+    _text_glyphs[key] = (chars, positions)
+    return chars, positions
+
+## 将所有文本按字符合并为若干PathCollection，每种字符一个
+## 各字符的位置换算为以英寸为单位的图坐标，须在坐标轴范围确定后调用
+## 导出svg时每种字符只定义一次，其余以<use>引用
+## 字号很小时笔画不足一像素，须关闭对齐像素(snap)，否则横平竖直的字形(如T、I、L)会缺笔
+def textLayerCollections(fig, ax, texts, xy, text_colors, fontsize, va):
+    from matplotlib.collections import PathCollection
+    from matplotlib.transforms import Affine2D
+
+    xy_inches = fig.dpi_scale_trans.inverted().transform(ax.transData.transform(xy))
+
+    offsets = {}
+    facecolors = {}
+    for text, pos, text_color in zip(texts, xy_inches, text_colors):
+        chars, positions = textGlyphsGet(text, fontsize, va)
+        for char, glyph_pos in zip(chars, positions):
+            offsets.setdefault(char, []).append(pos + glyph_pos / 72)
+            facecolors.setdefault(char, []).append(text_color)
+
+    collections = []
+    for char in offsets:
+        collections.append(PathCollection([glyphPathGet(char, fontsize)], offsets=np.array(offsets[char]), offset_transform=fig.dpi_scale_trans, transform=Affine2D().scale(1 / 72) + fig.dpi_scale_trans, facecolors=facecolors[char], edgecolors="none", linewidths=0, snap=False))
+    return collections
+
+## 图例各项的颜色(0~255)及文字，顺序同颜色字典
+def legendEntriesGet(plot_mode):
+    entries = []
     if plot_mode == 0:
         for hl_tag in colors_halflife:
             if hl_tag == "ST":
                 pass
             elif hl_tag == "1e15s":
-                handles.append(Patch(facecolor=np.array(colors_halflife[hl_tag])/255., label=">1e15s or Stable"))
+                entries.append((colors_halflife[hl_tag], ">1e15s or Stable"))
             else:
-                handles.append(Patch(facecolor=np.array(colors_halflife[hl_tag])/255., label=legends_halflife[hl_tag]))
+                entries.append((colors_halflife[hl_tag], legends_halflife[hl_tag]))
 
     elif plot_mode == 1:
         for decay_mode in colors_DecayModes:
-            handles.append(Patch(facecolor=np.array(colors_DecayModes[decay_mode])/255., label=legends_DecayModes[decay_mode]))
+            entries.append((colors_DecayModes[decay_mode], legends_DecayModes[decay_mode]))
 
     elif plot_mode == 2:
         for synthesis_method in colors_synthesisMethods:
-            handles.append(Patch(facecolor=np.array(colors_synthesisMethods[synthesis_method])/255., label=names_synthesisMethods[synthesis_method]))
+            entries.append((colors_synthesisMethods[synthesis_method], names_synthesisMethods[synthesis_method]))
 
-    return handles
+    elif plot_mode == 3:
+        for isomer_type in colors_isomer:
+            entries.append((colors_isomer[isomer_type], legends_isomer[isomer_type]))
 
-def nucildesChartPlotPLTText(plot_mode, z_min, n_min ,z_max, n_max):
-    with open(ElementsList_path, "r", encoding="utf8") as file:
-        elements_list = json.load(file)
+    elif plot_mode == 4:
+        for cell_type in colors_diff:
+            entries.append((colors_diff[cell_type], legends_diff[cell_type]))
+
+    return entries
+
+def legendHandlesGet(plot_mode):
+    from matplotlib.patches import Patch
+
+    return [Patch(facecolor=np.array(color)/255., label=label) for color, label in legendEntriesGet(plot_mode)]
+
+def nucildesChartPlotPLTText(plot_mode, z_min, n_min ,z_max, n_max, cells=None):
+    elements_list = NDdata.getJson(ElementsList_path)
 
     text_data = []
     if plot_mode == 0 or plot_mode == 1:
-        with open(nuclides_data_path, "r", encoding="utf8") as file:
-            data = json.load(file)
-
-        ## 填充半衰期及衰变模式信息
-        ## 对于衰变模式多于三种的，只显示其前三种(仿nndc)
-        ## 对于过长的数字，将会对其进行截断
-        for nom, ndata in data.items():
-            if (ndata["z"] >= z_min and ndata["z"] <= z_max) and (ndata["n"] >= n_min and ndata["n"] <= n_max):
-                ypos = ndata["z"] - z_min
-                xpos = ndata["n"] - n_min
-                text01 = elements_list[str(ndata["z"])]
-                text02 = str(ndata["z"]+ndata["n"]) + text01
-
-                hlt = ""
-                dmst = []
-                if len(ndata["levels"]) == 0:
-                    hlt = ""
-                    dmst = []
-                else:
-                    if not "halflife" in ndata["levels"][0]:
-                        hlt = ""
-                    elif not "value" in ndata["levels"][0]["halflife"]:
-                        hlt = ""
-                    elif ndata["levels"][0]["halflife"]["value"] == "STABLE":
-                        hlt = "STABLE"
-                    else:
-                        hlv = ndata["levels"][0]["halflife"]["value"]
-                        if hlv > 1e4:
-                            hlt = f"{hlv:.2e}"
-                        else:
-                            hlt = str(hlv)
-
-                        if ndata["levels"][0]["halflife"]["unit"] == "m":
-                            hlt = hlt + " min"
-                        else:
-                            hlt = hlt + " " + ndata["levels"][0]["halflife"]["unit"]
-
-                    if not "decayModes" in ndata["levels"][0]:
-                        dmst = []
-                    else:
-                        decay_modes = ndata["levels"][0]["decayModes"]["observed"] + ndata["levels"][0]["decayModes"]["predicted"]
-                        if len(decay_modes) == 0:
-                            dmst = []
-                        else:
-                            ## 据分支比排序
-                            dms1 = []
-                            dms2 = []
-                            dmsd = {}
-                            dmsd1 = []
-                            for decay_mode in decay_modes:  
-                                if not "value" in decay_mode:
-                                    dms2.append(decay_mode)
-                                else:
-                                    dmsd[decay_mode["mode"]] = decay_mode
-                                    dmsd1.append((decay_mode["value"], decay_mode["mode"]))
-                            dmsdf = pd.DataFrame(dmsd1, columns=["value", "mode"])
-                            dmsdf.sort_values(by="value", ascending=False, inplace=True)
-                            for mode in dmsdf["mode"]:
-                                dms1.append(dmsd[mode])
-                            dms = dms1 + dms2
-                            ###
-                            for decay_mode in dms:
-                                text = decay_mode["mode"]
-                                if not "value" in decay_mode:
-                                    text = text + " ?"
-                                else:
-                                    dmv = decay_mode["value"]
-                                    dmt = str(dmv)
-                                    if len(dmt) > 7:
-                                        if re.search(rf"([eE])", dmt) == None:
-                                            if dmv > 1e-3:
-                                                dmt = dmt[:7]
-                                            else:
-                                                match00 = re.fullmatch(rf"(0+)(\.)(0+)([1-9]+)", dmt)
-                                                if not match00 == None:
-                                                    ne = match00.group(4)
-                                                    if len(ne) < 3:
-                                                        dmt = f"{dmv:e}"
-                                                    else:
-                                                        dmt = f"{dmv:.2e}"
-                                    if decay_mode["uncertainty"]["type"] == "limit":
-                                        if decay_mode["uncertainty"]["limitType"] == "lower":
-                                            if decay_mode["uncertainty"]["isInclusive"] == True:
-                                                text = text + " ≥ " + dmt + "%"
-                                            else:
-                                                text = text + " > " + dmt + "%"
-                                        elif decay_mode["uncertainty"]["limitType"] == "upper":
-                                            if decay_mode["uncertainty"]["isInclusive"] == True:
-                                                text = text + " ≤ " + dmt + "%"
-                                            else:
-                                                text = text + " < " + dmt + "%"
-                                    else:
-                                        text = text + " = " + dmt + "%"
-                                dmst.append(text)
-                text03 = hlt + "\n"
-                if not len(dmst) > 0:
-                    pass
-                elif len(dmst) <= 3:
-                    for dmt in dmst:
-                        text03 = text03 + "\n" + dmt
-                else:
-                    for idx in range(0, 3):
-                        text03 = text03 + "\n" + dmst[idx]
-                
-                text_data.append({"pos":(xpos, ypos), "text01":text01, "text02":text02, "text03":text03})
-
-    ## 填充合成方法信息
-    elif plot_mode == 2:       
-        with open(data_synthesisMethods_path, "r", encoding="utf8") as file:
-            data = json.load(file)
+        table = NDdata.getNuclides(nuclides_data_path).table
+
+        ## 填充半衰期及衰变模式信息，文本来自核素表的基态汇总记录
+        ## 由核素表先选出区域内的核素，区域外的核素无需解析
+        ground_states = table.groundStates()
+        for idx in np.flatnonzero(table.maskZNA(z_min, z_max, 0, n_min, n_max)):
+            ground = ground_states[idx]
+            ypos = ground.z - z_min
+            xpos = ground.n - n_min
+            text01 = elements_list[str(ground.z)]
+            text02 = str(ground.z+ground.n) + text01
+            text03 = ground.detail_label
+            text_data.append({"pos":(xpos, ypos), "text01":text01, "text02":text02, "text03":text03})
+
+    ## 填充同核异能态信息：数目，及最长寿命者的能量、半衰期
+    elif plot_mode == 3 and cells is None:
+        nuclides_data = NDdata.getNuclides(nuclides_data_path)
+        table = nuclides_data.table
+        counts, longest = table.isomerSummary()
+        for idx in np.flatnonzero(table.maskZNA(z_min, z_max, 0, n_min, n_max)):
+            z = int(table.z[idx])
+            n = int(table.n[idx])
+            text01 = elements_list[str(z)]
+            text02 = str(z+n) + text01
+            text03 = ""
+            if longest[idx] >= 0:
+                level = nuclides_data[table.names[idx]]["levels"][table.level_rank[longest[idx]]]
+                text03 = "\n".join((f"{counts[idx]} isomer" + ("s" if counts[idx] > 1 else ""), "", NDtable.energyLabel(level), NDtable.halflifeLabel(level)))
+            text_data.append({"pos":(n - n_min, z - z_min), "text01":text01, "text02":text02, "text03":text03})
+
+    ## 填充合成方法信息，差异模式下为各核素的差异类别
+    elif plot_mode in (2, 3, 4):
+        if not cells is None:
+            data = cells
+        elif plot_mode == 2:
+            data = NDdata.getJson(data_synthesisMethods_path)
+        else:
+            data = []
 
         for row in data:
             if (row["z"] >= z_min and row["z"] <= z_max) and (row["n"] >= n_min and row["n"] <= n_max):
@@ -0,0 +1,275 @@
+import hashlib
+import io
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import NDcache
+import NDdata
+import NDpaths
+
+## 核素图渲染缓存
+## 键为(分类模式, 区域, 显示信息, 图例, 格式)及所用数据集的内容哈希
+## 内存中以LRU保存最近经getBytes()读取的图片字节(写入时不保存，只取文件路径时不占用内存)，磁盘上按总大小淘汰最久未使用的文件
+## 命中时直接返回已有的图片，不再经过matplotlib
+## 无显示信息(text_mode=0)的svg、png由NDchart直接写出，其余经matplotlib绘制
+
+render_cache_dir = NDpaths.cachePath("render")
+
+## 绘制方式变化(如字体)后递增，已缓存的旧图片不再命中
+RENDER_VERSION = 2
+
+class RenderCache:
+    def __init__(self, cache_dir=render_cache_dir, max_memory_bytes=64 * 2**20, max_disk_bytes=512 * 2**20):
+        self.cache_dir = cache_dir
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def pathOf(self, key, fmt):
+        return os.path.join(self.cache_dir, key + "." + fmt)
+
+    ## 返回已缓存图片的文件路径，未缓存时返回None
+    def getPath(self, key, fmt):
+        path = self.pathOf(key, fmt)
+        with self._lock:
+            if os.path.exists(path):
+                ## 更新访问时间，供淘汰时判断
+                os.utime(path)
+                self.hits += 1
+                return path
+            self.misses += 1
+            return None
+
+    def getBytes(self, key, fmt):
+        with self._lock:
+            if (key, fmt) in self._memory:
+                self._memory.move_to_end((key, fmt))
+                self.hits += 1
+                return self._memory[(key, fmt)]
+        path = self.getPath(key, fmt)
+        if path is None:
+            return None
+        with open(path, "rb") as file:
+            data = file.read()
+        self._remember(key, fmt, data)
+        return data
+
+    def put(self, key, fmt, data):
+        path = self.pathOf(key, fmt)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = path + ".tmp" + str(threading.get_ident())
+        with open(tmp_path, "wb") as file:
+            file.write(data)
+        os.replace(tmp_path, path)
+        ## 内存中的旧内容作废，下次getBytes()时由文件读取
+        with self._lock:
+            if (key, fmt) in self._memory:
+                self._memory_bytes -= len(self._memory.pop((key, fmt)))
+        self.evict()
+        return path
+
+    def _remember(self, key, fmt, data):
+        with self._lock:
+            if (key, fmt) in self._memory:
+                self._memory_bytes -= len(self._memory.pop((key, fmt)))
+            if len(data) > self.max_memory_bytes:
+                return
+            self._memory[(key, fmt)] = data
+            self._memory_bytes += len(data)
+            while self._memory_bytes > self.max_memory_bytes:
+                _, old = self._memory.popitem(last=False)
+                self._memory_bytes -= len(old)
+
+    ## 磁盘缓存超出上限时，按访问时间删除最旧的文件
+    def evict(self):
+        with self._lock:
+            if not os.path.isdir(self.cache_dir):
+                return
+            files = []
+            total = 0
+            for entry in os.scandir(self.cache_dir):
+                if entry.is_file() and not ".tmp" in entry.name:
+                    stat = entry.stat()
+                    files.append((stat.st_atime, stat.st_size, entry.path))
+                    total += stat.st_size
+            files.sort()
+            for atime, size, path in files:
+                if total <= self.max_disk_bytes:
+                    break
+                os.remove(path)
+                total -= size
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "memory_items": len(self._memory), "memory_bytes": self._memory_bytes}
+
+render_cache = RenderCache()
+
+## 绘图所用数据集的内容哈希，数据文件更新后缓存键随之变化
+def chartDatasetHash():
+    digest = hashlib.sha1()
+    for path in NDpaths.chart_data_paths:
+        digest.update(NDdata.registry.get(path, NDcache.fileHash).encode())
+    return digest.hexdigest()
+
+def chartKey(plot_mode, area, text_mode, have_legend):
+    (z_min, n_min), (z_max, n_max) = area
+    params = f"{RENDER_VERSION}|{int(plot_mode)}|{int(z_min)},{int(n_min)},{int(z_max)},{int(n_max)}|{int(text_mode)}|{bool(have_legend)}|{chartDatasetHash()}"
+    return hashlib.sha1(params.encode()).hexdigest()
+
+## 已缓存的各格式核素图的文件路径，以及尚未缓存的格式
+def cachedChartFiles(plot_mode=0, area=((0,0),(118,177)), text_mode=0, have_legend=True, fmts=("svg",), cache=render_cache):
+    key = chartKey(plot_mode, area, text_mode, have_legend)
+    paths = {}
+    missing = []
+    for fmt in fmts:
+        path = cache.getPath(key, fmt)
+        if path is None:
+            missing.append(fmt)
+        else:
+            paths[fmt] = path
+    return paths, missing
+
+## 由NDchart直接写出的格式，置空则全部经matplotlib绘制
+direct_formats = ("svg", "png")
+
+## 返回各格式核素图的文件路径，未缓存的格式由同一张图一次性导出
+def chartFiles(plot_mode=0, area=((0,0),(118,177)), text_mode=0, have_legend=True, fmts=("svg",), cache=render_cache):
+    paths, missing = cachedChartFiles(plot_mode, area, text_mode, have_legend, fmts, cache)
+
+    if len(missing) > 0 and text_mode == 0 and all(fmt in direct_formats for fmt in missing):
+        import NDchart
+        key = chartKey(plot_mode, area, text_mode, have_legend)
+        for fmt in missing:
+            paths[fmt] = cache.put(key, fmt, NDchart.chartBytes(plot_mode, area, text_mode, have_legend, fmt))
+    elif len(missing) > 0:
+        import NDplot
+        key = chartKey(plot_mode, area, text_mode, have_legend)
+        fig = NDplot.nucildesChartPlotPLT(plot_mode, area, text_mode, have_legend)
+        try:
+            for fmt in missing:
+                buffer = io.BytesIO()
+                fig.savefig(buffer, format=fmt)
+                paths[fmt] = cache.put(key, fmt, buffer.getvalue())
+        finally:
+            NDplot.closeFigure(fig)
+
+    return paths
+
+def chartBytes(plot_mode=0, area=((0,0),(118,177)), text_mode=0, have_legend=True, fmt="png", cache=render_cache):
+    key = chartKey(plot_mode, area, text_mode, have_legend)
+    data = cache.getBytes(key, fmt)
+    if data is None:
+        chartFiles(plot_mode, area, text_mode, have_legend, (fmt,), cache)
+        data = cache.getBytes(key, fmt)
+    return data
+
+## 渲染进程池繁忙(排队的任务已达上限)
+class RenderBusy(RuntimeError):
+    pass
+
+## 核素图渲染进程池
+## 未缓存的核素图交由子进程绘制，绘制结果写入磁盘缓存后返回文件路径；已缓存的直接在调用线程中返回
+## max_workers为进程数，为0时在调用线程中绘制；max_queue为同时提交(含正在绘制)的任务数上限，超出时抛出RenderBusy
+## 子进程以spawn方式启动，不继承调用进程中的线程及锁
+class RenderPool:
+    def __init__(self, max_workers=2, max_queue=8):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_queue)
+        self.submitted = 0
+        self.rejected = 0
+
+    def _executorGet(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+            return self._executor
+
+    ## 预先启动全部子进程并导入绘图模块，首次绘制时无需等待
+    def start(self):
+        if self.max_workers == 0:
+            return
+        executor = self._executorGet()
+        for future in [executor.submit(workerWarmUp) for _ in range(self.max_workers)]:
+            future.result()
+
+    ## 提交任务，返回Future
+    def submit(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise RenderBusy(f"more than {self.max_queue} renders queued")
+        try:
+            future = self._executorGet().submit(fn, *args)
+        except BrokenProcessPool:
+            self._slots.release()
+            self._reset()
+            raise
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._lock:
+            self.submitted += 1
+        future.add_done_callback(lambda future: self._slots.release())
+        return future
+
+    ## 同chartFiles()，未缓存时由子进程绘制
+    def chartFiles(self, plot_mode=0, area=((0,0),(118,177)), text_mode=0, have_legend=True, fmts=("svg",), timeout=None):
+        paths, missing = cachedChartFiles(plot_mode, area, text_mode, have_legend, fmts)
+        if len(missing) == 0:
+            return paths
+        if self.max_workers == 0:
+            return chartFiles(plot_mode, area, text_mode, have_legend, fmts)
+        try:
+            return self.submit(chartFiles, plot_mode, area, text_mode, have_legend, tuple(fmts)).result(timeout)
+        except BrokenProcessPool:
+            ## 子进程异常退出后进程池不可再用，下次提交时重建
+            self._reset()
+            raise
+
+    ## 由子进程执行fn(*args)并返回其结果，max_workers为0时在调用线程中执行
+    ## fn及其参数、返回值须可pickle，同样受max_queue限制
+    def run(self, fn, *args, timeout=None):
+        if self.max_workers == 0:
+            return fn(*args)
+        try:
+            return self.submit(fn, *args).result(timeout)
+        except BrokenProcessPool:
+            self._reset()
+            raise
+
+    def _reset(self):
+        with self._lock:
+            executor = self._executor
+            self._executor = None
+        if not executor is None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            executor = self._executor
+            self._executor = None
+        if not executor is None:
+            executor.shutdown(wait=wait)
+
+    def stats(self):
+        with self._lock:
+            return {"max_workers": self.max_workers, "max_queue": self.max_queue, "submitted": self.submitted, "rejected": self.rejected}
+
+## 子进程的预热：导入绘图模块(只为载入模块，不使用其中的名称)并计算数据集哈希
+def workerWarmUp():
+    import NDchart  # noqa: F401
+    import NDplot  # noqa: F401
+    chartDatasetHash()
+    return os.getpid()
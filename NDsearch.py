@@ -0,0 +1,132 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import NDdata
+import NDfiles
+import NDfilter
+import NDpaths
+
+## 核素查找结果的缓存
+## 核素数据是固定的，同一核素、预览模式及文件类型的查找结果(文本、预览表格、结果文件)只生成一次
+## 缓存条目数有上限，按LRU淘汰，淘汰时一并删除其结果文件(没有其他条目使用时)
+## 结果文件写入NDfiles的导出文件区，被后台清理时下次查找重新生成
+## 键中含数据集的内容哈希，数据文件更新后旧结果不再命中
+
+haveDecayPage_path = NDpaths.haveDecayPage_path
+export_area = NDfiles.export_area
+
+## 由核素数据生成查找结果：(文本, 预览表格, 结果文件路径)
+## preview_mode: 0为紧凑，1为常规；file_type: 0为json，1为csv，其他为不生成文件
+def searchResponse(result, preview_mode, file_type):
+    ## 文本
+    name = result["name"]
+    result_text = f"{name}"
+    if len(result["levels"]) == 0:
+        result_text = result_text + "\n此核素无数据"
+    result_text = result_text + "\n\nnndc页面：\n\ngetdataset:\n" + f"https://www.nndc.bnl.gov/nudat3/getdataset.jsp?nucleus={name}&unc=NDS"
+    haveDecayPage = NDdata.getJson(haveDecayPage_path)
+    if haveDecayPage[name]:
+        result_text = result_text + "\n\ndecaysearchdirect:\n" + f"https://www.nndc.bnl.gov/nudat3/decaysearchdirect.jsp?nuc={name}&unc=NDS"
+
+    ## 预览表格
+    result_dataframe = None
+    if preview_mode == 0:
+        result_dataframe = NDfilter.nuclideData_dict2dataframeCompact(result)
+    elif preview_mode == 1:
+        result_dataframe = NDfilter.nuclideData_dict2dataframe(result)
+
+    ## 文件
+    if file_type == 0:
+        def writer(path):
+            with open(path, "w") as file:
+                json.dump(result, file, indent=2)
+        result_file_path = export_area.store(writer, ".json")
+    elif file_type == 1:
+        if preview_mode == 1:
+            tmpDataframe = result_dataframe
+        else:
+            tmpDataframe = NDfilter.nuclideData_dict2dataframe(result)
+        def writer(path):
+            with open(path, "w") as file:
+                tmpDataframe.to_csv(file, index=False)
+        result_file_path = export_area.store(writer, ".csv")
+    else:
+        result_file_path = None
+
+    return result_text, result_dataframe, result_file_path
+
+class SearchCache:
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def keyOf(nuclides_data, name, preview_mode, file_type):
+        return (getattr(nuclides_data, "content_hash", id(nuclides_data)), name, preview_mode, file_type)
+
+    ## 取得nuclides_data中名为name的核素的查找结果，未缓存或结果文件已被删除时重新生成
+    def get(self, nuclides_data, name, preview_mode, file_type):
+        key = self.keyOf(nuclides_data, name, preview_mode, file_type)
+        with self._lock:
+            response = self._entries.get(key)
+            if not response is None and (response[2] is None or os.path.exists(response[2])):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return response
+            self.misses += 1
+
+        response = searchResponse(nuclides_data[name], preview_mode, file_type)
+
+        with self._lock:
+            ## 生成期间可能已由其他线程写入，保留先写入的结果
+            existing = self._entries.get(key)
+            if not existing is None and (existing[2] is None or os.path.exists(existing[2])):
+                return existing
+            self._entries[key] = response
+            while len(self._entries) > self.max_entries:
+                _, old = self._entries.popitem(last=False)
+                self._release(old[2])
+                self.evictions += 1
+        return response
+
+    ## 结果文件以内容命名，可能为多个条目共用，没有其他条目使用时才删除
+    def _release(self, path):
+        if path is None:
+            return
+        for response in self._entries.values():
+            if response[2] == path:
+                return
+        NDfiles.removeFile(path)
+
+    ## 预先生成常用核素的查找结果
+    def warmUp(self, nuclides_data, names, preview_modes=(0, 1), file_types=(0, 1)):
+        count = 0
+        for name in names:
+            if not name in nuclides_data:
+                continue
+            for preview_mode in preview_modes:
+                for file_type in file_types:
+                    self.get(nuclides_data, name, preview_mode, file_type)
+                    count += 1
+        return count
+
+    ## 清空缓存并删除全部结果文件
+    def clear(self):
+        with self._lock:
+            paths = set(response[2] for response in self._entries.values())
+            self._entries.clear()
+            for path in paths:
+                if not path is None:
+                    NDfiles.removeFile(path)
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "entries": len(self._entries)}
+
+search_cache = SearchCache()
@@ -0,0 +1,510 @@
+import re
+import threading
+
+import numpy as np
+
+## 半衰期单位转换字典
+HL_UNITS = {"fs": 1e-15, "ps": 1e-12, "ns": 1e-9, "us": 1e-6, "ms": 1e-3, "s": 1, "m": 60, "h": 3600, "d": 86400, "y": 31557600, "ky": 31557600e3, "My": 31557600e6, "Gy": 31557600e9}
+
+## nndc导出的数据里有两处写作"β⁻"了
+DECAYMODE_REPLACE = {"β⁻": "B-"}
+
+## 能级半衰期类型
+HL_KIND_NONE = 0    # 无半衰期数据
+HL_KIND_STABLE = 1  # STABLE
+HL_KIND_VALUE = 2   # 单位可换算为秒
+HL_KIND_SU = 3      # 特殊单位(keV、MeV等)
+
+## 基态半衰期分类，半衰期(秒)小于各上限者归入对应类别，均不小于时为"1e15s"
+HL_TYPE_BOUNDS = np.array([1e-7, 1e-6, 1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1, 10, 100, 1e3, 1e4, 1e5, 1e7, 1e10, 1e15])
+HL_TYPE_NAMES = ("l100ns", "100ns", "1us", "10us", "100us", "1ms", "10ms", "100ms", "1s", "10s", "100s", "1ks", "10ks", "100ks", "10Ms", "1e10s", "1e15s")
+
+## 能级能量单位转换字典(换算为keV)
+ENERGY_UNITS = {"eV": 1e-3, "keV": 1, "MeV": 1e3}
+
+## 自旋宇称文本中第一组候选值，如"(5/2-,7/2-)"中的"5/2-"
+SPIN_PARITY_PATTERN = re.compile(r"([0-9]+)(/2)?\s*([+-]?)")
+
+## 列式核素表
+## 由nndc导出的数据一次性构建，筛选时以numpy向量运算代替逐个核素遍历字典
+## 核素顺序与原字典一致，各筛选方法返回布尔掩码，可直接进行与运算后再取索引
+## 能级数据以CSR形式保存：全部核素的能级依次排成各列(level_*)，level_offsets为各核素能级的起止位置
+class NuclidesTable:
+    def __init__(self, nuclides_data):
+        self.source = nuclides_data
+        self.names = np.array(list(nuclides_data.keys()), dtype=object)
+        self.name_idx = {name: idx for idx, name in enumerate(self.names)}
+        size = len(self.names)
+
+        self.z = np.empty(size, dtype=np.int32)
+        self.n = np.empty(size, dtype=np.int32)
+        self.a = np.empty(size, dtype=np.int32)
+        ## 基态半衰期(秒)，稳定核素为inf，无数据或特殊单位为nan
+        self.halflife_sec = np.full(size, np.nan)
+        self.stable = np.zeros(size, dtype=bool)
+        ## 各能级观测到的衰变模式之并集
+        self.decay_mask = np.zeros(size, dtype=np.uint64)
+        self.level_offsets = np.zeros(size + 1, dtype=np.int64)
+
+        self.decay_modes = []
+        self.decay_mode_bit = {}
+        self._ground_states = None
+        self._halflife_index = None
+        self._isomer_summary = None
+
+        level_hl_sec = []
+        level_hl_kind = []
+        level_energy = []
+        level_energy_offset = []
+        level_spin2 = []
+        level_parity = []
+        level_decay_mask = []
+        for idx, data in enumerate(nuclides_data.values()):
+            self.z[idx] = data["z"]
+            self.n[idx] = data["n"]
+            self.a[idx] = data["a"]
+
+            levels = data.get("levels", [])
+            self.level_offsets[idx + 1] = self.level_offsets[idx] + len(levels)
+
+            mask = 0
+            for level in levels:
+                hl_kind, hl_sec = levelHalflife(level)
+                level_hl_kind.append(hl_kind)
+                level_hl_sec.append(hl_sec)
+                energy, has_offset = levelEnergy(level)
+                level_energy.append(energy)
+                level_energy_offset.append(has_offset)
+                spin2, parity = spinParityCode(level.get("spinParity"))
+                level_spin2.append(spin2)
+                level_parity.append(parity)
+                level_mask = 0
+                if "decayModes" in level:
+                    for decayData in level["decayModes"]["observed"]:
+                        level_mask |= self.decayModeBit(DECAYMODE_REPLACE.get(decayData["mode"], decayData["mode"]))
+                level_decay_mask.append(level_mask)
+                mask |= level_mask
+            self.decay_mask[idx] = mask
+
+            if len(levels) > 0:
+                hl_kind = level_hl_kind[self.level_offsets[idx]]
+                if hl_kind == HL_KIND_STABLE:
+                    self.stable[idx] = True
+                    self.halflife_sec[idx] = np.inf
+                elif hl_kind == HL_KIND_VALUE:
+                    self.halflife_sec[idx] = level_hl_sec[self.level_offsets[idx]]
+
+        self.level_hl_sec = np.array(level_hl_sec, dtype=np.float64)
+        self.level_hl_kind = np.array(level_hl_kind, dtype=np.int8)
+        ## 能级能量(keV)，无数据为nan；level_energy_offset为能量相对于未知能级(如"0+X")者
+        self.level_energy = np.array(level_energy, dtype=np.float64)
+        self.level_energy_offset = np.array(level_energy_offset, dtype=bool)
+        ## 自旋宇称编码：自旋的2倍(未知为-1)及宇称(+1、-1，未知为0)，取第一组候选值
+        self.level_spin2 = np.array(level_spin2, dtype=np.int16)
+        self.level_parity = np.array(level_parity, dtype=np.int8)
+        ## 各能级观测到的衰变模式
+        self.level_decay_mask = np.array(level_decay_mask, dtype=np.uint64)
+        self._levelIndexSet()
+
+    ## 可直接保存为numpy数组的列，用于NDcache的二进制缓存
+    COLUMNS = ("z", "n", "a", "halflife_sec", "stable", "decay_mask", "level_offsets", "level_hl_sec", "level_hl_kind", "level_energy", "level_energy_offset", "level_spin2", "level_parity", "level_decay_mask")
+
+    ## 由已保存的列恢复核素表，不再遍历字典
+    @classmethod
+    def fromColumns(cls, nuclides_data, names, decay_modes, columns):
+        table = cls.__new__(cls)
+        table.source = nuclides_data
+        table.names = np.array(names, dtype=object)
+        table.name_idx = {name: idx for idx, name in enumerate(table.names)}
+        table.decay_modes = list(decay_modes)
+        table.decay_mode_bit = {mode: 1 << idx for idx, mode in enumerate(table.decay_modes)}
+        for column in cls.COLUMNS:
+            setattr(table, column, columns[column])
+        table._levelIndexSet()
+        table._ground_states = None
+        table._halflife_index = None
+        table._isomer_summary = None
+        return table
+
+    ## 各能级所属核素的索引，及其在该核素中的序号(0为第一个能级，即基态)
+    def _levelIndexSet(self):
+        self.level_owner = np.repeat(np.arange(len(self.names)), np.diff(self.level_offsets))
+        self.level_rank = np.arange(len(self.level_owner)) - self.level_offsets[self.level_owner]
+
+    def columns(self):
+        return {column: getattr(self, column) for column in self.COLUMNS}
+
+    def __len__(self):
+        return len(self.names)
+
+    def decayModeBit(self, mode):
+        if not mode in self.decay_mode_bit:
+            if len(self.decay_modes) >= 64:
+                raise ValueError("too many decay modes for a 64-bit mask")
+            self.decay_mode_bit[mode] = 1 << len(self.decay_modes)
+            self.decay_modes.append(mode)
+        return self.decay_mode_bit[mode]
+
+    ## 与NDfilter.nuclidesFilterZNA()的条件一致
+    def maskZNA(self, Z_min=None, Z_max=None, Z_oe_idx=0, N_min=None, N_max=None, N_oe_idx=0, A_min=None, A_max=None, A_oe_idx=0):
+        mask = np.ones(len(self), dtype=bool)
+        for values, v_min, v_max, oe_idx in ((self.z, Z_min, Z_max, Z_oe_idx), (self.n, N_min, N_max, N_oe_idx), (self.a, A_min, A_max, A_oe_idx)):
+            if not v_min is None:
+                mask &= values >= v_min
+            if not v_max is None:
+                mask &= values <= v_max
+            if oe_idx == 1:
+                mask &= values % 2 == 1
+            elif oe_idx == 2:
+                mask &= values % 2 == 0
+        return mask
+
+    ## 与NDfilter.nuclidesFilterHalflife()的条件一致
+    ## 按顺序遍历各能级，第一个"起决定作用"的能级决定该核素是否入选：
+    ##   仅下限时，STABLE、特殊单位、半衰期大于下限的能级起决定作用，特殊单位则排除
+    ##   有上下限时，特殊单位、半衰期处于区间内的能级起决定作用，特殊单位则排除
+    ##   均无时，含STABLE能级者入选
+    ## 经半衰期排序索引查询，开销与区间内的能级数相当
+    def maskHalflife(self, hl_min_sec=0, hl_max_sec=None):
+        if self._halflife_index is None:
+            self._halflife_index = HalflifeIndex(self)
+        return self._halflife_index.mask(hl_min_sec, hl_max_sec)
+
+    ## 同maskHalflife()，逐一比较全部能级，用于核对及基准测试
+    def maskHalflifeScan(self, hl_min_sec=0, hl_max_sec=None):
+        mask = np.zeros(len(self), dtype=bool)
+        kind = self.level_hl_kind
+        if hl_min_sec is None:
+            if hl_max_sec is None:
+                mask[self.level_owner[kind == HL_KIND_STABLE]] = True
+            return mask
+
+        with np.errstate(invalid="ignore"):
+            if hl_max_sec is None:
+                included = (kind == HL_KIND_STABLE) | ((kind == HL_KIND_VALUE) & (self.level_hl_sec > hl_min_sec))
+            else:
+                included = (kind == HL_KIND_VALUE) & (self.level_hl_sec > hl_min_sec) & (self.level_hl_sec < hl_max_sec)
+        decisive = np.flatnonzero(included | (kind == HL_KIND_SU))
+        owners, first = np.unique(self.level_owner[decisive], return_index=True)
+        mask[owners[included[decisive[first]]]] = True
+        return mask
+
+    ## 与NDfilter.nuclidesFilterDecayModes()的条件一致
+    ## dm_enable_idx: 1为包含所有所选衰变模式(and)，2为包含任意所选衰变模式(or)，
+    ##                3为不包含任何所选衰变模式(not)，4为恰好包含所选衰变模式(exact)
+    ## 衰变模式为各能级观测到的衰变模式之并集，"β⁻"视同"B-"
+    def maskDecayModes(self, dm_enable_idx, decay_modes):
+        return self.maskDecayModeBits(self.decay_mask, dm_enable_idx, decay_modes)
+
+    ## 按衰变模式掩码masks(核素或能级的)判断，参数同maskDecayModes()
+    def maskDecayModeBits(self, masks, dm_enable_idx, decay_modes):
+        query = 0
+        unknown = False
+        for mode in decay_modes:
+            mode = DECAYMODE_REPLACE.get(mode, mode)
+            if mode in self.decay_mode_bit:
+                query |= self.decay_mode_bit[mode]
+            else:
+                unknown = True
+        query = np.uint64(query)
+
+        if dm_enable_idx == 1:
+            if unknown:
+                return np.zeros(len(masks), dtype=bool)
+            return (masks & query) == query
+        elif dm_enable_idx == 2:
+            return (masks & query) != 0
+        elif dm_enable_idx == 3:
+            return (masks & query) == 0
+        elif dm_enable_idx == 4:
+            if unknown:
+                return np.zeros(len(masks), dtype=bool)
+            return masks == query
+        return np.zeros(len(masks), dtype=bool)
+
+    ## 同核异能态：非第一个能级且有半衰期数据(可换算为秒或STABLE)的能级
+    ## 返回能级的布尔掩码，各条件为None时不限制；STABLE视为半衰期无穷大
+    ## 能量相对于未知能级(如"0+X")的能级，其能量只知下限，有能量上限时排除
+    ## decay_modes及dm_enable_idx同maskDecayModes()，按该能级观测到的衰变模式判断
+    def maskIsomerLevels(self, hl_min_sec=None, hl_max_sec=None, e_min=None, e_max=None, dm_enable_idx=0, decay_modes=()):
+        kind = self.level_hl_kind
+        mask = (self.level_rank > 0) & ((kind == HL_KIND_VALUE) | (kind == HL_KIND_STABLE))
+        hl_sec = np.where(kind == HL_KIND_STABLE, np.inf, self.level_hl_sec)
+        with np.errstate(invalid="ignore"):
+            if not hl_min_sec is None:
+                mask &= hl_sec > hl_min_sec
+            if not hl_max_sec is None:
+                mask &= hl_sec < hl_max_sec
+            if not e_min is None:
+                mask &= self.level_energy >= e_min
+            if not e_max is None:
+                mask &= (self.level_energy <= e_max) & ~self.level_energy_offset
+        if dm_enable_idx in (1, 2, 3, 4):
+            mask &= self.maskDecayModeBits(self.level_decay_mask, dm_enable_idx, decay_modes)
+        return mask
+
+    ## 含有符合条件的同核异能态的核素，参数同maskIsomerLevels()
+    def maskIsomers(self, hl_min_sec=None, hl_max_sec=None, e_min=None, e_max=None, dm_enable_idx=0, decay_modes=()):
+        mask = np.zeros(len(self), dtype=bool)
+        mask[self.level_owner[self.maskIsomerLevels(hl_min_sec, hl_max_sec, e_min, e_max, dm_enable_idx, decay_modes)]] = True
+        return mask
+
+    ## 各核素的同核异能态数目，及其中半衰期最长者的能级索引(无则为-1)，首次使用时一次性生成
+    def isomerSummary(self):
+        if self._isomer_summary is None:
+            levels = np.flatnonzero(self.maskIsomerLevels())
+            owners = self.level_owner[levels]
+            counts = np.bincount(owners, minlength=len(self))
+            longest = np.full(len(self), -1, dtype=np.int64)
+            hl_sec = np.where(self.level_hl_kind[levels] == HL_KIND_STABLE, np.inf, self.level_hl_sec[levels])
+            ## 按半衰期由短到长排序后赋值，同一核素中最后写入的即最长者；半衰期相同时取靠前的能级
+            order = np.lexsort((-levels, hl_sec))
+            longest[owners[order]] = levels[order]
+            self._isomer_summary = (counts, longest)
+        return self._isomer_summary
+
+    ## 各核素最长寿命同核异能态的半衰期分类(同halflifeType())，无同核异能态的为"NONE"
+    def isomerTypes(self):
+        counts, longest = self.isomerSummary()
+        return [halflifeType(self.level_hl_kind[level], self.level_hl_sec[level]) if level >= 0 else "NONE" for level in longest.tolist()]
+
+    ## 各核素基态的汇总记录(GroundState)，首次使用时一次性生成
+    def groundStates(self):
+        if self._ground_states is None:
+            self._ground_states = [GroundState(name, self.source[name]) for name in self.names]
+        return self._ground_states
+
+    ## 由核素索引取回原字典数据，保持索引顺序
+    def toDict(self, indices, nuclides_data=None):
+        if nuclides_data is None:
+            nuclides_data = self.source
+        return {self.names[idx]: nuclides_data[self.names[idx]] for idx in indices}
+
+    ## 若nuclides_data为本表数据的子集(同一批字典对象)，返回其各核素在本表中的索引，否则返回None
+    def rowsOf(self, nuclides_data):
+        rows = np.empty(len(nuclides_data), dtype=np.int64)
+        for pos, (name, data) in enumerate(nuclides_data.items()):
+            idx = self.name_idx.get(name)
+            if idx is None or not self.source[name] is data:
+                return None
+            rows[pos] = idx
+        return rows
+
+def levelHalflife(level):
+    if not "halflife" in level:
+        return HL_KIND_NONE, np.nan
+    if level["halflife"]["value"] == "STABLE":
+        return HL_KIND_STABLE, np.nan
+    if not level["halflife"]["unit"] in HL_UNITS:
+        return HL_KIND_SU, np.nan
+    return HL_KIND_VALUE, level["halflife"]["value"] * HL_UNITS[level["halflife"]["unit"]]
+
+## 能级能量(keV)及其是否相对于未知能级
+def levelEnergy(level):
+    energy = level.get("energy", {})
+    if not isinstance(energy.get("value"), (int, float)) or not energy.get("unit") in ENERGY_UNITS:
+        return np.nan, "offset" in energy
+    return energy["value"] * ENERGY_UNITS[energy["unit"]], "offset" in energy
+
+## 能级能量的文本，如"58.59 keV"、"0+X keV"
+def energyLabel(level):
+    energy = level.get("energy", {})
+    label = str(energy.get("value"))
+    if "offset" in energy:
+        label += "+" + str(energy["offset"])
+    return label + " " + str(energy.get("unit", ""))
+
+## 自旋宇称编码，返回(自旋的2倍, 宇称)
+## 取第一组候选值，括号(暂定)不区分，如"(5/2-,7/2-)"为(5, -1)、"1(-)"为(2, -1)、"(0,1,2)"为(0, 0)；无法解析时为(-1, 0)
+def spinParityCode(spin_parity):
+    if not isinstance(spin_parity, str):
+        return -1, 0
+    first = spin_parity.replace("(", "").replace(")", "").split(",")[0]
+    match00 = SPIN_PARITY_PATTERN.match(first.strip())
+    if match00 is None:
+        return -1, 0
+    spin2 = int(match00.group(1)) * (1 if match00.group(2) else 2)
+    parity = {"+": 1, "-": -1}.get(match00.group(3), 0)
+    return spin2, parity
+
+## 能级半衰期排序索引
+## 可换算为秒的能级按半衰期排序，并记录各能级所属的核素；STABLE及特殊单位的能级另行记录
+## 半衰期区间查询为两次searchsorted，再按核素取第一个起决定作用的能级
+class HalflifeIndex:
+    def __init__(self, table):
+        self.size = len(table)
+        self.level_owner = table.level_owner
+        self.level_hl_kind = table.level_hl_kind
+        value_levels = np.flatnonzero(table.level_hl_kind == HL_KIND_VALUE)
+        order = np.argsort(table.level_hl_sec[value_levels], kind="stable")
+        ## 排序后的半衰期及对应的能级索引
+        self.hl_sorted = table.level_hl_sec[value_levels][order]
+        self.hl_levels = value_levels[order]
+        self.stable_levels = np.flatnonzero(table.level_hl_kind == HL_KIND_STABLE)
+        self.su_levels = np.flatnonzero(table.level_hl_kind == HL_KIND_SU)
+
+    def mask(self, hl_min_sec=0, hl_max_sec=None):
+        mask = np.zeros(self.size, dtype=bool)
+        if hl_min_sec is None:
+            if hl_max_sec is None:
+                mask[self.level_owner[self.stable_levels]] = True
+            return mask
+
+        lo = np.searchsorted(self.hl_sorted, hl_min_sec, side="right")
+        if hl_max_sec is None:
+            decisive = (self.hl_levels[lo:], self.stable_levels, self.su_levels)
+        else:
+            hi = max(lo, np.searchsorted(self.hl_sorted, hl_max_sec, side="left"))
+            decisive = (self.hl_levels[lo:hi], self.su_levels)
+
+        ## 能级索引按核素顺序排列，排序后各核素的第一个即起决定作用的能级
+        decisive = np.sort(np.concatenate(decisive))
+        owners = self.level_owner[decisive]
+        first = np.flatnonzero(np.diff(owners, prepend=-1) != 0)
+        included = self.level_hl_kind[decisive[first]] != HL_KIND_SU
+        mask[owners[first[included]]] = True
+        return mask
+
+## 基态半衰期的分类，与原NDfilter.nuclidesClassifyHalflife()一致
+def halflifeType(hl_kind, hl_sec):
+    if hl_kind == HL_KIND_NONE:
+        return "UN"
+    elif hl_kind == HL_KIND_STABLE:
+        return "ST"
+    elif hl_kind == HL_KIND_SU:
+        return "SU"
+    return HL_TYPE_NAMES[np.searchsorted(HL_TYPE_BOUNDS, hl_sec, side="right")]
+
+## 核素图上显示的半衰期文本
+def halflifeLabel(level):
+    if not "halflife" in level:
+        return ""
+    elif not "value" in level["halflife"]:
+        return ""
+    elif level["halflife"]["value"] == "STABLE":
+        return "STABLE"
+
+    hlv = level["halflife"]["value"]
+    if hlv > 1e4:
+        hlt = f"{hlv:.2e}"
+    else:
+        hlt = str(hlv)
+
+    if level["halflife"]["unit"] == "m":
+        return hlt + " min"
+    return hlt + " " + level["halflife"]["unit"]
+
+## 核素图上显示的衰变模式文本，如"B- = 100%"
+## 对于过长的数字，将会对其进行截断
+def decayModeLabel(decay_mode):
+    text = decay_mode["mode"]
+    if not "value" in decay_mode:
+        return text + " ?"
+
+    dmv = decay_mode["value"]
+    dmt = str(dmv)
+    if len(dmt) > 7:
+        if re.search(r"([eE])", dmt) == None:
+            if dmv > 1e-3:
+                dmt = dmt[:7]
+            else:
+                match00 = re.fullmatch(r"(0+)(\.)(0+)([1-9]+)", dmt)
+                if not match00 == None:
+                    ne = match00.group(4)
+                    if len(ne) < 3:
+                        dmt = f"{dmv:e}"
+                    else:
+                        dmt = f"{dmv:.2e}"
+    if decay_mode["uncertainty"]["type"] == "limit":
+        if decay_mode["uncertainty"]["limitType"] == "lower":
+            if decay_mode["uncertainty"]["isInclusive"] == True:
+                return text + " ≥ " + dmt + "%"
+            return text + " > " + dmt + "%"
+        elif decay_mode["uncertainty"]["limitType"] == "upper":
+            if decay_mode["uncertainty"]["isInclusive"] == True:
+                return text + " ≤ " + dmt + "%"
+            return text + " < " + dmt + "%"
+        return text
+    return text + " = " + dmt + "%"
+
+## 据分支比由大到小排序，分支比相同者保持原顺序，无分支比者排在最后
+## 同一模式出现多次时取其最后一条(与原先按模式建立字典的做法一致)
+def sortDecayModes(decay_modes):
+    with_value = []
+    without_value = []
+    by_mode = {}
+    for decay_mode in decay_modes:
+        if not "value" in decay_mode:
+            without_value.append(decay_mode)
+        else:
+            by_mode[decay_mode["mode"]] = decay_mode
+            with_value.append(decay_mode)
+    with_value.sort(key=lambda decay_mode: -decay_mode["value"])
+    return [by_mode[decay_mode["mode"]] for decay_mode in with_value] + without_value
+
+## 单个核素基态的汇总记录
+## 半衰期(秒)及分类、按分支比排序的衰变模式、主要衰变模式及核素图上显示的文本，
+## 供半衰期/衰变模式分类及核素图文本共用
+class GroundState:
+    __slots__ = ("name", "z", "n", "hl_kind", "halflife_sec", "halflife_type", "decay_modes", "dominant_mode", "halflife_label", "decay_labels", "detail_label")
+
+    def __init__(self, name, data):
+        self.name = name
+        self.z = data["z"]
+        self.n = data["n"]
+        levels = data.get("levels", [])
+
+        if len(levels) == 0:
+            self.hl_kind, self.halflife_sec = HL_KIND_NONE, np.nan
+            self.halflife_label = ""
+            sorted_modes = []
+            self.dominant_mode = "UNKNOWN"
+        else:
+            ground = levels[0]
+            self.hl_kind, self.halflife_sec = levelHalflife(ground)
+            self.halflife_label = halflifeLabel(ground)
+            if not "decayModes" in ground:
+                sorted_modes = []
+                self.dominant_mode = "STABLE" if self.hl_kind == HL_KIND_STABLE else "UNKNOWN"
+            else:
+                sorted_modes = sortDecayModes(ground["decayModes"]["observed"] + ground["decayModes"]["predicted"])
+                self.dominant_mode = sorted_modes[0]["mode"] if len(sorted_modes) > 0 else "UNKNOWN"
+
+        self.halflife_type = halflifeType(self.hl_kind, self.halflife_sec)
+        self.decay_modes = tuple(decay_mode["mode"] for decay_mode in sorted_modes)
+        self.decay_labels = tuple(decayModeLabel(decay_mode) for decay_mode in sorted_modes)
+
+        ## 半衰期及衰变模式，对于衰变模式多于三种的，只显示其前三种(仿nndc)
+        self.detail_label = "\n".join((self.halflife_label, "") + self.decay_labels[:3])
+
+## 已构建的核素表，筛选链中传入的子集字典可复用其母表
+## 界面的各请求在不同线程中处理，增删经_tables_lock；构建核素表时不持有锁
+_tables = []
+_tables_max = 4
+_tables_lock = threading.Lock()
+
+def registerTable(table):
+    with _tables_lock:
+        _tables[:] = [t for t in _tables if not t.source is table.source]
+        _tables.insert(0, table)
+        del _tables[_tables_max:]
+
+## 返回可用于nuclides_data的核素表，以及nuclides_data各核素在表中的索引
+def tableOf(nuclides_data):
+    with _tables_lock:
+        tables = list(_tables)
+    for table in tables:
+        if table.source is nuclides_data:
+            return table, np.arange(len(table))
+    for table in tables:
+        rows = table.rowsOf(nuclides_data)
+        if not rows is None:
+            return table, rows
+
+    table = NuclidesTable(nuclides_data)
+    registerTable(table)
+    return table, np.arange(len(table))
+
+## 在nuclides_data(可为子集)上应用掩码，返回筛选后的字典
+def filterByMask(nuclides_data, table, rows, mask):
+    return table.toDict(rows[mask[rows]], nuclides_data)
@@ -0,0 +1,245 @@
+import hashlib
+import io
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+import NDdata
+import NDpaths
+import NDrender
+
+## 核素图瓦片
+## 将核素图按TILE_CELLS×TILE_CELLS个方块切分，在多个缩放级别上分别预先绘制(金字塔)
+## 低缩放级别只有颜色，直接由颜色网格按像素复制生成；高缩放级别叠加元素名称、核素名称及详细信息
+## 查看任意(Z,N)区域时只取用并拼接覆盖该区域的瓦片，开销与区域大小相当，而与全图无关
+## 区域图片的宽、高不超过max_window_px，区域较大时改用较低的缩放级别
+
+TILE_CELLS = 16
+
+## 各缩放级别：方块边长(像素)、显示信息模式(同NDplot.nucildesChartPlotPLT的text_mode)
+tile_levels = {
+    0: (4, 0),
+    1: (10, 0),
+    2: (24, 1),
+    3: (60, 2),
+    4: (160, 3)
+}
+
+## 各显示信息模式下字号与方块边长之比
+tile_text_scales = {1: 0.3, 2: 0.22, 3: 0.088}
+
+## 区域图片宽、高的上限(像素)
+max_window_px = 4096
+
+## 全图范围，与NDplot.nucildesChartPlotPLT的默认区域一致
+chart_area = ((0,0),(118,177))
+
+tile_cache = NDrender.RenderCache(cache_dir=NDpaths.cachePath("tiles"), max_memory_bytes=32 * 2**20, max_disk_bytes=1024 * 2**20)
+
+## 解码后的瓦片，按总字节数限制(最高级别的瓦片每个约19MB)
+_tile_arrays = OrderedDict()
+_tile_arrays_max_bytes = 256 * 2**20
+_tile_arrays_bytes = 0
+_lock = threading.Lock()
+
+## 全图颜色网格，按数据集哈希缓存
+_color_grids = {}
+
+## 显示信息模式所对应的缩放级别：显示信息模式不超过text_mode的最高级别
+def levelForTextMode(text_mode):
+    level = min(tile_levels)
+    for candidate, (cell_px, level_text_mode) in sorted(tile_levels.items()):
+        if level_text_mode <= text_mode:
+            level = candidate
+    return level
+
+## 区域图片所用的缩放级别：不超过max_level且图片宽、高均不超过max_window_px的最高级别
+def levelForWindow(area, max_level=None):
+    (z_min, n_min), (z_max, n_max) = area
+    cells = max(z_max - z_min + 1, n_max - n_min + 1)
+    level = min(tile_levels)
+    for candidate, (cell_px, text_mode) in sorted(tile_levels.items()):
+        if not max_level is None and candidate > max_level:
+            break
+        if cells * cell_px <= max_window_px:
+            level = candidate
+    return level
+
+def tileKey(plot_mode, level, tz, tn):
+    params = f"tile|{int(plot_mode)}|{int(level)}|{int(tz)}|{int(tn)}|{TILE_CELLS}|{tile_levels[level]}|{NDrender.chartDatasetHash()}"
+    return hashlib.sha1(params.encode()).hexdigest()
+
+def chartColorGrid(plot_mode):
+    import NDplot
+    dataset_hash = NDrender.chartDatasetHash()
+    key = (plot_mode, dataset_hash)
+    with _lock:
+        grid = _color_grids.get(key)
+    if grid is None:
+        (z_min, n_min), (z_max, n_max) = chart_area
+        grid = np.full((z_max - z_min + 1, n_max - n_min + 1, 3), 255, dtype=np.uint8)
+        NDplot.nucildesChartPlotPLTColor(grid, plot_mode, z_min, n_min, z_max, n_max)
+        with _lock:
+            _color_grids.clear()
+            _color_grids[key] = grid
+    return grid
+
+## 绘制单个瓦片，返回(高, 宽, 3)的uint8数组，第一行为该瓦片Z最大的一侧
+def renderTile(plot_mode, level, tz, tn):
+    cell_px, text_mode = tile_levels[level]
+    z0 = tz * TILE_CELLS
+    n0 = tn * TILE_CELLS
+
+    ## 取颜色网格中对应的部分，超出全图的部分为白色
+    chart_grid = chartColorGrid(plot_mode)
+    grid = np.full((TILE_CELLS, TILE_CELLS, 3), 255, dtype=np.uint8)
+    part = chart_grid[z0:z0 + TILE_CELLS, n0:n0 + TILE_CELLS]
+    grid[:part.shape[0], :part.shape[1]] = part
+
+    ## 像素复制，方块间留白色间隔
+    image = np.repeat(np.repeat(grid, cell_px, axis=0), cell_px, axis=1)
+    if cell_px >= 8:
+        gap = max(1, cell_px // 20)
+        for offset in range(gap):
+            image[offset::cell_px, :] = 255
+            image[:, offset::cell_px] = 255
+    image = image[::-1]
+
+    if text_mode > 0 and part.size > 0:
+        image = tileTextDraw(image, grid, plot_mode, text_mode, cell_px, z0, n0)
+
+    return np.ascontiguousarray(image)
+
+## 在瓦片上叠加文本，使用面向对象的Figure接口，不经过pyplot
+def tileTextDraw(image, grid, plot_mode, text_mode, cell_px, z0, n0):
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    import NDplot
+
+    text_data = NDplot.nucildesChartPlotPLTText(plot_mode, z0, n0, z0 + TILE_CELLS - 1, n0 + TILE_CELLS - 1)
+    if len(text_data) == 0:
+        return image
+
+    size = TILE_CELLS * cell_px
+    dpi = 100
+    fig = Figure(figsize=(size / dpi, size / dpi), dpi=dpi)
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_axes((0, 0, 1, 1))
+    ax.set_axis_off()
+    ax.imshow(image, extent=(n0, n0 + TILE_CELLS, z0, z0 + TILE_CELLS), origin="upper", interpolation="nearest")
+    ax.set_xlim(n0, n0 + TILE_CELLS)
+    ax.set_ylim(z0, z0 + TILE_CELLS)
+
+    texts, xy, text_colors = NDplot.textLayerData(text_data, text_mode, grid, 1, 1, 1, n0, z0)
+    fontsize = tile_text_scales[text_mode] * cell_px * 72 / dpi
+    va = NDplot.text_layouts[text_mode][2]
+    for collection in NDplot.textLayerCollections(fig, ax, texts, xy, text_colors, fontsize, va):
+        ax.add_collection(collection, autolim=False)
+
+    canvas.draw()
+    return np.asarray(canvas.buffer_rgba())[:, :, :3].copy()
+
+def encodePNG(image):
+    from PIL import Image
+    buffer = io.BytesIO()
+    Image.fromarray(image).save(buffer, format="png")
+    return buffer.getvalue()
+
+def decodePNG(data):
+    from PIL import Image
+    return np.asarray(Image.open(io.BytesIO(data)).convert("RGB"))
+
+## 取得瓦片：依次查找已解码的瓦片、渲染缓存，均未命中时绘制并写入缓存
+def getTile(plot_mode, level, tz, tn):
+    global _tile_arrays_bytes
+    key = tileKey(plot_mode, level, tz, tn)
+    with _lock:
+        if key in _tile_arrays:
+            _tile_arrays.move_to_end(key)
+            return _tile_arrays[key]
+
+    data = tile_cache.getBytes(key, "png")
+    if data is None:
+        image = renderTile(plot_mode, level, tz, tn)
+        tile_cache.put(key, "png", encodePNG(image))
+    else:
+        image = decodePNG(data)
+
+    with _lock:
+        if not key in _tile_arrays:
+            _tile_arrays[key] = image
+            _tile_arrays_bytes += image.nbytes
+        while _tile_arrays_bytes > _tile_arrays_max_bytes and len(_tile_arrays) > 1:
+            _, evicted = _tile_arrays.popitem(last=False)
+            _tile_arrays_bytes -= evicted.nbytes
+    return image
+
+## 拼接覆盖area的瓦片，返回(高, 宽, 3)的uint8数组，第一行为Z最大的一侧
+## 只分配区域大小的数组，各瓦片只复制与区域重叠的部分；宽、高超出max_window_px时抛出ValueError
+def windowImage(plot_mode=0, area=chart_area, level=1):
+    cell_px = tile_levels[level][0]
+    (z_min, n_min), (z_max, n_max) = area
+    height = (z_max - z_min + 1) * cell_px
+    width = (n_max - n_min + 1) * cell_px
+    if height > max_window_px or width > max_window_px:
+        raise ValueError(f"window of {width}x{height} px exceeds {max_window_px} px, use a lower level")
+
+    canvas = np.empty((height, width, 3), dtype=np.uint8)
+    for tz in range(z_min // TILE_CELLS, z_max // TILE_CELLS + 1):
+        ## 瓦片与区域在Z方向上重叠的方块
+        z_lo = max(z_min, tz * TILE_CELLS)
+        z_hi = min(z_max, (tz + 1) * TILE_CELLS - 1)
+        for tn in range(n_min // TILE_CELLS, n_max // TILE_CELLS + 1):
+            n_lo = max(n_min, tn * TILE_CELLS)
+            n_hi = min(n_max, (tn + 1) * TILE_CELLS - 1)
+            tile = getTile(plot_mode, level, tz, tn)
+            ## 瓦片及区域图片的第一行均为Z最大的一侧
+            tile_top = ((tz + 1) * TILE_CELLS - 1 - z_hi) * cell_px
+            tile_left = (n_lo - tn * TILE_CELLS) * cell_px
+            row = (z_max - z_hi) * cell_px
+            col = (n_lo - n_min) * cell_px
+            rows = (z_hi - z_lo + 1) * cell_px
+            cols = (n_hi - n_lo + 1) * cell_px
+            canvas[row:row + rows, col:col + cols] = tile[tile_top:tile_top + rows, tile_left:tile_left + cols]
+    return canvas
+
+def windowKey(plot_mode, area, level):
+    (z_min, n_min), (z_max, n_max) = area
+    params = f"window|{int(plot_mode)}|{int(z_min)},{int(n_min)},{int(z_max)},{int(n_max)}|{int(level)}|{TILE_CELLS}|{tile_levels[level]}|{NDrender.chartDatasetHash()}"
+    return hashlib.sha1(params.encode()).hexdigest()
+
+## 已缓存的区域图片的文件路径，未缓存时为None
+def cachedWindowFile(plot_mode=0, area=chart_area, level=1):
+    return tile_cache.getPath(windowKey(plot_mode, area, level), "png")
+
+## 区域图片的文件路径，同样经渲染缓存，重复请求直接返回
+def windowFile(plot_mode=0, area=chart_area, level=1):
+    key = windowKey(plot_mode, area, level)
+    path = tile_cache.getPath(key, "png")
+    if path is None:
+        path = tile_cache.put(key, "png", encodePNG(windowImage(plot_mode, area, level)))
+    return path
+
+## 含有核素的瓦片
+def occupiedTiles():
+    table = NDdata.getNuclides(NDpaths.nuclides_data_path).table
+    return sorted(set(zip((table.z // TILE_CELLS).tolist(), (table.n // TILE_CELLS).tolist())))
+
+## 预先生成瓦片金字塔，返回生成(或已存在)的瓦片数
+def buildPyramid(plot_modes=(0, 1, 2), levels=None):
+    if levels is None:
+        levels = list(tile_levels)
+    count = 0
+    for plot_mode in plot_modes:
+        for level in levels:
+            for tz, tn in occupiedTiles():
+                getTile(plot_mode, level, tz, tn)
+                count += 1
+    return count
+
+## 用法：python NDtiles.py [缩放级别 ...]
+if __name__ == "__main__":
+    levels = [int(arg) for arg in sys.argv[1:]] or None
+    print(buildPyramid(levels=levels))
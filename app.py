@@ -1,93 +1,90 @@
-import gradio as gr
-import pandas as pd
-import json
-from tempfile import NamedTemporaryFile
-
-import NDfilter
+import numpy as np
+
+## 渲染子进程(spawn)以__mp_main__重新导入本文件，只需要其中的绘图函数，不导入gradio也不构建界面
+if __name__ != "__mp_main__":
+    import gradio as gr
+
+import NDdata
+import NDdecay
+import NDexport
+import NDfiles
+import NDindex
+import NDpaths
 import NDplot
+import NDrender
+import NDsearch
+import NDtiles
+import NDtable
 
 ## 核素筛选
-def process_filters(Z_min, Z_max, Z_oe_idx, N_min, N_max, N_oe_idx, A_min, A_max, A_oe_idx, hl_enable_idx, hl_min, hl_min_unit, hl_max, hl_max_unit, dm_enable_idx, decay_modes):
+def process_filters(Z_min, Z_max, Z_oe_idx, N_min, N_max, N_oe_idx, A_min, A_max, A_oe_idx, hl_enable_idx, hl_min, hl_min_unit, hl_max, hl_max_unit, dm_enable_idx, decay_modes, export_format="json", export_gzip=False):
+
+    nuclides_table = NDdata.getNuclides(nuclides_data_path).table
 
-    filtered_data = NDfilter.nuclidesFilterZNA(nuclides_data, Z_min, Z_max, Z_oe_idx, N_min, N_max, N_oe_idx, A_min, A_max, A_oe_idx)
+    ## 各筛选条件均为核素表上的布尔掩码，依次取与
+    mask = nuclides_table.maskZNA(Z_min, Z_max, Z_oe_idx, N_min, N_max, N_oe_idx, A_min, A_max, A_oe_idx)
 
     # 根据母核半衰期进行筛选
     if hl_enable_idx == 1:
         hl_min_sec = HLunit_convert(hl_min, hl_min_unit)
         hl_max_sec = HLunit_convert(hl_max, hl_max_unit)
-        filtered_data = NDfilter.nuclidesFilterHalflife(filtered_data, hl_min_sec, hl_max_sec)
+        mask &= nuclides_table.maskHalflife(hl_min_sec, hl_max_sec)
 
     # 根据衰变模式进行筛选
     if dm_enable_idx > 0 and decay_modes:
-        filtered_data = NDfilter.nuclidesFilterDecayModes(filtered_data, dm_enable_idx, decay_modes)
+        mask &= nuclides_table.maskDecayModes(dm_enable_idx, decay_modes)
 
     # 结果处理
-    if len(filtered_data) == 0:
+    # 结果文件由NDexport逐个核素写出，保存于NDfiles的导出文件区
+    count = int(np.count_nonzero(mask))
+    if count == 0:
         result_text = "没有找到符合条件的核素"
         result_file_path = None
     else:
-        result_text = f"找到 {len(filtered_data)} 个符合条件的核素"
-        with NamedTemporaryFile(suffix=".json", delete=False, mode='w') as file:
-            json.dump(filtered_data, file, indent=2)
-            result_file_path = file.name
+        result_text = f"找到 {count} 个符合条件的核素"
+        try:
+            result_file_path = NDfiles.export_area.store(lambda path: NDexport.exportMasked(nuclides_table, mask, path, export_format, export_gzip), NDexport.exportSuffix(export_format, export_gzip))
+        except NDexport.ExportUnavailable as error:
+            raise gr.Error(f"无法导出：{error}")
     return result_text, result_file_path
 
 ## 核素查找
 def process_search(mode_idx, nom, z, n, a, preview_mode, file_type):
+    nuclides_data = NDdata.getNuclides(nuclides_data_path)
+    nuclides_index = NDindex.indexOf(nuclides_data)
+
     result = None
     if mode_idx == 0:
-        result = NDfilter.nuclidesSearchingNom(nuclides_data, nom.replace(" ", ""))
+        result = nuclides_index.searchNom(nom.replace(" ", ""))
     elif mode_idx == 1:
         if not (z == None or n == None):
-            result = NDfilter.nuclidesSearchingZN(nuclides_data, z, n)
+            result = nuclides_index.searchZN(z, n)
     elif mode_idx == 2:
         if not (z == None or a == None):
-            result = NDfilter.nuclidesSearchingZA(nuclides_data, z, a)
+            result = nuclides_index.searchZA(z, a)
     elif mode_idx == 3:
         if not (n == None or a == None):
-            result = NDfilter.nuclidesSearchingNA(nuclides_data, n, a)
+            result = nuclides_index.searchNA(n, a)
 
     ## 结果处理
+    ## 同一核素、预览模式及文件类型的结果经NDsearch缓存，重复查找直接返回
     if result == None:
         result_text = "没有找到此核素"
         result_dataframe = None
         result_file_path = None
+        chain_text = None
     else:
-        ## 文本
-        name = result["name"]
-        result_text = f"{name}"
-        if len(result["levels"]) == 0:
-            result_text = result_text + "\n此核素无数据"
-        result_text = result_text + "\n\nnndc页面：\n\ngetdataset:\n" + f"https://www.nndc.bnl.gov/nudat3/getdataset.jsp?nucleus={name}&unc=NDS"
-        ## temp
-        with open ("data/haveDecayPage.json",'r', encoding='utf-8') as file:
-            haveDecayPage = json.load(file)
-        if haveDecayPage[name]:
-            result_text = result_text + "\n\ndecaysearchdirect:\n" + f"https://www.nndc.bnl.gov/nudat3/decaysearchdirect.jsp?nuc={name}&unc=NDS"
-        
-        ## 预览表格
-        if preview_mode == 0:
-            result_dataframe = NDfilter.nuclideData_dict2dataframeCompact(result)
-        elif preview_mode == 1:
-            result_dataframe = NDfilter.nuclideData_dict2dataframe(result)
-
-        ## 文件
-        if file_type == 0:
-            with NamedTemporaryFile(suffix=".json", delete=False, mode='w') as file:
-                json.dump(result, file, indent=2)
-                result_file_path = file.name
-        elif file_type == 1:
-            if preview_mode == 1:
-                tmpDataframe = result_dataframe
-            else:
-                tmpDataframe = NDfilter.nuclideData_dict2dataframe(result)
-            with NamedTemporaryFile(suffix=".csv", delete=False, mode='w') as file:
-                tmpDataframe.to_csv(file, index=False)
-                result_file_path = file.name
-        else:
-            result_file_path = None
+        result_text, result_dataframe, result_file_path = NDsearch.search_cache.get(nuclides_data, result["name"], preview_mode, file_type)
+        chain_text = decayChainText(nuclides_data, result["name"])
+
+    return result_text, result_dataframe, result_file_path, chain_text
 
-    return result_text, result_dataframe, result_file_path
+## 衰变链：全部子孙核素及祖先核素，按衰变的先后排列
+def decayChainText(nuclides_data, name):
+    graph = NDdecay.graphOf(nuclides_data)
+    descendants = graph.descendants(name)
+    ancestors = graph.ancestors(name)
+    return f"子孙核素({len(descendants)})：{'、'.join(descendants) or '无'}\n祖先核素({len(ancestors)})：{'、'.join(ancestors) or '无'}"
 
 ## 核素图绘制
 def process_plot(plot_mode, text_mode, have_legend_idx, file_type3, using_filter, Z_min=0, Z_max=118, N_min=0, N_max=177):
@@ -98,25 +95,58 @@ def process_plot(plot_mode, text_mode, have_legend_idx, file_type3, using_filter
 
     area = ((0,0),(118,177))
     if using_filter == 1:
-        area = ((Z_min,N_min), (Z_max, N_max))
+        area = plotArea_convert(Z_min, Z_max, N_min, N_max)
 
-    result_fig = NDplot.nucildesChartPlotPLT(plot_mode, area, text_mode, have_legend)
+        ## 区域预览由瓦片拼接而成，导出文件仍由matplotlib绘制(含坐标轴及图例)
+        ## 缩放级别按显示信息模式选取，区域较大时降低级别使图片不超过NDtiles.max_window_px
+        preview_path = windowFile(plot_mode, area, NDtiles.levelForWindow(area, NDtiles.levelForTextMode(text_mode)))
+        if file_type3 in ("png", "svg"):
+            result_file_path = chartFiles(plot_mode, area, text_mode, have_legend, [file_type3])[file_type3]
+        else:
+            result_file_path = None
+        return preview_path, result_file_path
 
-    with NamedTemporaryFile(suffix=".svg", delete=False, mode='wb') as file:
-        result_fig.savefig(file, format="svg")
-        preview_svg_path = file.name
+    ## 预览使用png，导出格式另行生成；已绘制过的图直接由渲染缓存取得
+    fmts = ["png"]
+    if file_type3 in ("png", "svg") and not file_type3 in fmts:
+        fmts.append(file_type3)
+    paths = chartFiles(plot_mode, area, text_mode, have_legend, fmts)
 
-    if file_type3 == "png":
-        with NamedTemporaryFile(suffix=".png", delete=False, mode='wb') as file:
-            result_fig.savefig(file, format="png")
-            result_file_path = file.name
-    elif file_type3 == "svg":
-        result_file_path = preview_svg_path
+    preview_path = paths["png"]
+    if file_type3 in ("png", "svg"):
+        result_file_path = paths[file_type3]
     else:
         result_file_path = None
 
-    return result_fig, result_file_path
-
+    return preview_path, result_file_path
+
+## 由渲染进程池取得核素图文件，进程池繁忙时提示稍后再试
+def chartFiles(plot_mode, area, text_mode, have_legend, fmts):
+    try:
+        return render_pool.chartFiles(plot_mode, area, text_mode, have_legend, fmts)
+    except NDrender.RenderBusy:
+        raise gr.Error("绘图任务较多，请稍后再试")
+
+## 区域预览图片，未缓存时同样由渲染进程池生成
+def windowFile(plot_mode, area, level):
+    path = NDtiles.cachedWindowFile(plot_mode, area, level)
+    if not path is None:
+        return path
+    try:
+        return render_pool.run(NDtiles.windowFile, plot_mode, area, level)
+    except NDrender.RenderBusy:
+        raise gr.Error("绘图任务较多，请稍后再试")
+
+
+## 核素图绘制区域，未填写的边界取全图的边界，超出全图的部分截去
+def plotArea_convert(Z_min, Z_max, N_min, N_max):
+    z_lo = 0 if Z_min is None else min(max(int(Z_min), 0), 118)
+    z_hi = 118 if Z_max is None else min(max(int(Z_max), 0), 118)
+    n_lo = 0 if N_min is None else min(max(int(N_min), 0), 177)
+    n_hi = 177 if N_max is None else min(max(int(N_max), 0), 177)
+    z_lo, z_hi = min(z_lo, z_hi), max(z_lo, z_hi)
+    n_lo, n_hi = min(n_lo, n_hi), max(n_lo, n_hi)
+    return ((z_lo, n_lo), (z_hi, n_hi))
 
 ## 半衰期单位转换
 def HLunit_convert(hl, hl_unit):
@@ -150,200 +180,231 @@ def update_inputs3(using_filter):
         return [gr.Number(interactive=False, value=None)] * 4
 
 ## 导入数据集
-nuclides_data_path = "data/nndc_nudat_data_export.json"
-with open (nuclides_data_path,'r', encoding='utf-8') as file:
-    nuclides_data = json.load(file)
+nuclides_data_path = NDpaths.nuclides_data_path
+haveDecayPage_path = NDsearch.haveDecayPage_path
+
+## 启动时预先生成查找结果的常用核素，为空时不预先生成
+search_warmup_nuclides = ["1H", "2H", "3H", "4He", "12C", "14C", "16O", "40K", "60Co", "90Sr", "131I", "137Cs", "208Pb", "226Ra", "232Th", "235U", "238U", "239Pu"]
+
+## 预热：启动时读取各数据集并构建索引，之后的请求不再读取文件
+## 只在启动服务时进行(渲染子进程会重新导入本文件，无需预热)
+def warmUp():
+    NDindex.indexOf(NDdata.getNuclides(nuclides_data_path))
+    NDdata.getJson(haveDecayPage_path)
+    NDsearch.search_cache.warmUp(NDdata.getNuclides(nuclides_data_path), search_warmup_nuclides)
+    for path in (NDplot.data_NuclidesClassifiedHalflife_path, NDplot.data_NuclidesClassifiedDecayModes_path, NDplot.data_synthesisMethods_path, NDplot.ElementsList_path):
+        NDdata.getJson(path)
+
+## 核素图渲染进程池：进程数及同时提交的任务数上限
+render_pool = NDrender.RenderPool(max_workers=2, max_queue=8)
 
 ## 半衰期单位转换字典
-HL_UNITS = {"fs": 1e-15, "ps": 1e-12, "ns": 1e-9, "us": 1e-6, "ms": 1e-3, "s": 1, "m": 60, "h": 3600, "d": 86400, "y": 31557600, "ky": 31557600e3, "My": 31557600e6, "Gy": 31557600e9}
+HL_UNITS = NDtable.HL_UNITS
 
-with gr.Blocks(title="核数据工具") as demo:
-    gr.Markdown("""
+## 构建界面
+def buildDemo():
+    with gr.Blocks(title="核数据工具") as demo:
+        gr.Markdown("""
                 ## 核数据工具
                 可能是用来处理核数据的相关工具？？
 
                 目前功能有：核素筛选、核素查找、核素图绘制。
                 """)
     
-    with gr.Tab("核素筛选"):
-        gr.Markdown("""
+        with gr.Tab("核素筛选"):
+            gr.Markdown("""
                     ## 核素筛选
                     可以通过质子数(Z)、中子数(N)、质量数(A)以及母核半衰期、衰变模式等进行筛选
                     """)
-        with gr.Row():
-            with gr.Column(scale=1):
-                gr.Markdown("根据质子数(Z)、中子数(N)、质量数(A)进行筛选")
-            with gr.Column(scale=4):
-                with gr.Row():
-                    with gr.Column(min_width=240):
-                        gr.Markdown("质子数(Z)")
-                        Z_min = gr.Number(label="最小值", precision=0)
-                        Z_max = gr.Number(label="最大值", precision=0)
-                        Z_oe = gr.Dropdown(["任意", "奇Z", "偶Z"], label="奇偶", type="index", interactive=True)
-                    with gr.Column(min_width=240):
-                        gr.Markdown("中子数(N)")
-                        N_min = gr.Number(label="最小值", precision=0)
-                        N_max = gr.Number(label="最大值", precision=0)
-                        N_oe = gr.Dropdown(["任意", "奇N", "偶N"], label="奇偶", type="index", interactive=True)
-                    with gr.Column(min_width=240):
-                        gr.Markdown("质量数(A)")
-                        A_min = gr.Number(label="最小值", precision=0)
-                        A_max = gr.Number(label="最大值", precision=0)
-                        A_oe = gr.Dropdown(["任意", "奇A", "偶A"], label="奇偶", type="index", interactive=True)
-
-        with gr.Row():
-            with gr.Column(scale=1):
-                gr.Markdown("根据母核半衰期进行筛选")
-            with gr.Column(scale=4):
-                with gr.Row():
-                    hl_enable = gr.Radio(["不使用", "使用"], value="不使用", type="index", show_label=False)
-                    hl_min = gr.Number(label="最小值", minimum=0.)
-                    hl_min_unit = gr.Dropdown(["fs", "ps", "ns", "us", "ms", "s", "m", "h", "d", "y", "ky", "My", "Gy", "Stable"], value="fs", interactive=True)
-                    hl_max = gr.Number(label="最大值", minimum=0.)
-                    hl_max_unit = gr.Dropdown(["fs", "ps", "ns", "us", "ms", "s", "m", "h", "d", "y", "ky", "My", "Gy", "Stable"], value="Stable", interactive=True)
-
-        with gr.Row():
-            with gr.Column(scale=1):
-                gr.Markdown("根据衰变模式进行筛选")
-            with gr.Column(scale=4):
-                with gr.Row():
-                    dm_enable_idx = gr.Radio(["不使用", "筛选包含所有以下所选衰变模式的核素(and)", "筛选包含任意以下所选衰变模式的核素(or)"], value="不使用", type="index", interactive=True, show_label=False)
-                with gr.Row():
-                    decayModes = gr.CheckboxGroup(['B-', 'N', '2N', 'B-N', 'P', 'B-A', 'B-2N', 'B-3N', '2P', 'EC', 'A', 'B-4N', 'EC+B+', 'ECA', 'ECP', 'IT', 'EC2P', 'EC3P', 'ECAP', '3P', '2B-', 'ECSF', '14C', 'B-SF', '24NE', 'SF', '20O', '20NE', '25NE', '28MG', 'NE', '22NE', 'SI', 'MG', '34SI'], label="decayModes", interactive=True)
-
-        with gr.Row():
-            submit_btn = gr.Button("筛选", variant="primary")
-            reset_btn = gr.Button("重置条件", variant="primary")
+            with gr.Row():
+                with gr.Column(scale=1):
+                    gr.Markdown("根据质子数(Z)、中子数(N)、质量数(A)进行筛选")
+                with gr.Column(scale=4):
+                    with gr.Row():
+                        with gr.Column(min_width=240):
+                            gr.Markdown("质子数(Z)")
+                            Z_min = gr.Number(label="最小值", precision=0)
+                            Z_max = gr.Number(label="最大值", precision=0)
+                            Z_oe = gr.Dropdown(["任意", "奇Z", "偶Z"], label="奇偶", type="index", interactive=True)
+                        with gr.Column(min_width=240):
+                            gr.Markdown("中子数(N)")
+                            N_min = gr.Number(label="最小值", precision=0)
+                            N_max = gr.Number(label="最大值", precision=0)
+                            N_oe = gr.Dropdown(["任意", "奇N", "偶N"], label="奇偶", type="index", interactive=True)
+                        with gr.Column(min_width=240):
+                            gr.Markdown("质量数(A)")
+                            A_min = gr.Number(label="最小值", precision=0)
+                            A_max = gr.Number(label="最大值", precision=0)
+                            A_oe = gr.Dropdown(["任意", "奇A", "偶A"], label="奇偶", type="index", interactive=True)
+
+            with gr.Row():
+                with gr.Column(scale=1):
+                    gr.Markdown("根据母核半衰期进行筛选")
+                with gr.Column(scale=4):
+                    with gr.Row():
+                        hl_enable = gr.Radio(["不使用", "使用"], value="不使用", type="index", show_label=False)
+                        hl_min = gr.Number(label="最小值", minimum=0.)
+                        hl_min_unit = gr.Dropdown(["fs", "ps", "ns", "us", "ms", "s", "m", "h", "d", "y", "ky", "My", "Gy", "Stable"], value="fs", interactive=True)
+                        hl_max = gr.Number(label="最大值", minimum=0.)
+                        hl_max_unit = gr.Dropdown(["fs", "ps", "ns", "us", "ms", "s", "m", "h", "d", "y", "ky", "My", "Gy", "Stable"], value="Stable", interactive=True)
+
+            with gr.Row():
+                with gr.Column(scale=1):
+                    gr.Markdown("根据衰变模式进行筛选")
+                with gr.Column(scale=4):
+                    with gr.Row():
+                        dm_enable_idx = gr.Radio(["不使用", "筛选包含所有以下所选衰变模式的核素(and)", "筛选包含任意以下所选衰变模式的核素(or)", "筛选不包含任何以下所选衰变模式的核素(not)", "筛选恰好包含以下所选衰变模式的核素(exact)"], value="不使用", type="index", interactive=True, show_label=False)
+                    with gr.Row():
+                        decayModes = gr.CheckboxGroup(['B-', 'N', '2N', 'B-N', 'P', 'B-A', 'B-2N', 'B-3N', '2P', 'EC', 'A', 'B-4N', 'EC+B+', 'ECA', 'ECP', 'IT', 'EC2P', 'EC3P', 'ECAP', '3P', '2B-', 'ECSF', '14C', 'B-SF', '24NE', 'SF', '20O', '20NE', '25NE', '28MG', 'NE', '22NE', 'SI', 'MG', '34SI'], label="decayModes", interactive=True)
+
+            with gr.Row():
+                export_format = gr.Dropdown(list(NDexport.EXPORT_FORMATS), value="json", label="结果文件格式", interactive=True)
+                export_gzip = gr.Checkbox(value=False, label="gzip压缩(parquet除外)", interactive=True)
+                submit_btn = gr.Button("筛选", variant="primary")
+                reset_btn = gr.Button("重置条件", variant="primary")
         
-        with gr.Row():
-            result_text = gr.Textbox(label="筛选结果", interactive=False, show_copy_button=True)
-            result_file = gr.File(label="结果文件", interactive=False)
-
-        inputs = [
-            Z_min, Z_max, Z_oe,
-            N_min, N_max, N_oe,
-            A_min, A_max, A_oe,
-            hl_enable, hl_min, hl_min_unit, hl_max, hl_max_unit,
-            dm_enable_idx, decayModes
-        ]
+            with gr.Row():
+                result_text = gr.Textbox(label="筛选结果", interactive=False, show_copy_button=True)
+                result_file = gr.File(label="结果文件", interactive=False)
+
+            inputs = [
+                Z_min, Z_max, Z_oe,
+                N_min, N_max, N_oe,
+                A_min, A_max, A_oe,
+                hl_enable, hl_min, hl_min_unit, hl_max, hl_max_unit,
+                dm_enable_idx, decayModes
+            ]
         
-        submit_btn.click(
-            fn=process_filters,
-            inputs=inputs,
-            outputs=[result_text, result_file]
-        )
+            submit_btn.click(
+                fn=process_filters,
+                inputs=inputs + [export_format, export_gzip],
+                outputs=[result_text, result_file]
+            )
         
-        reset_btn.click(
-            fn=lambda: [None,None,"任意"]*3 + ["不使用", None, "fs", None, "Stable"] + ["不使用", []],
-            outputs=inputs
-        )
-
-
-    with gr.Tab("核素查找"):
-        gr.Markdown("## 核素查找")
-        with gr.Row():
-            with gr.Column(scale=3):
-                searchingMode = gr.Radio(["核素名称", "质子数(Z)、中子数(N)", "质子数(Z)、质量数(A)", "中子数(N)、质量数(A)"], value="核素名称", label="查找模式", interactive=True, type="index")
-                gr.Markdown("### 根据核素名称查找")
-                nuclide_in = gr.Textbox(value=None, info="请输入由质量数及元素名称所组成的核素名称，示例：232Th、232TH、th232、232-Th、th-232等。\n只要不太离谱就能识别……大概？")
-                gr.Markdown("### 根据质子数(Z)、中子数(N)、质量数(A)查找")
-                with gr.Row():
-                    Z_in = gr.Number(value=0, label="质子数(Z)", precision=0, interactive=False)
-                    N_in = gr.Number(value=0, label="中子数(N)", precision=0, interactive=False)
-                    A_in = gr.Number(value=0, label="质量数(A)", precision=0, interactive=False)
-                previewMode = gr.Radio(["紧凑", "常规"], value="紧凑", type="index", label="预览模式")
-                outputFileType = gr.Radio(["json", "csv"], value="json", type="index", label="导出文件格式")
-                with gr.Row():
-                    submit_btn2 = gr.Button("查找", variant="primary")
-                    reset_btn2 = gr.Button("重置条件", variant="primary")
-
-            with gr.Column(scale=2):
-                result_text2 = gr.Textbox(interactive=False, show_label=False)
-                preview_df = gr.Dataframe(label="数据预览", interactive=False)
-                result_file2 = gr.File(interactive=False)
-
-        searchingMode.change(
-            fn=update_inputs2,
-            inputs=searchingMode,
-            outputs=[nuclide_in, Z_in, N_in, A_in]
-        )
-
-        inputs2 = [
-            searchingMode,
-            nuclide_in,
-            Z_in, N_in, A_in,
-            previewMode, outputFileType
-        ]
-
-        submit_btn2.click(
-            fn=process_search,
-            inputs=inputs2,
-            outputs=[result_text2, preview_df, result_file2]
-        )
-
-        reset_btn2.click(
-            fn=lambda: [None]*4,
-            outputs=[nuclide_in, Z_in, N_in, A_in]
-        )
-
-    with gr.Tab("核素图绘制"):
-        gr.Markdown("""
+            reset_btn.click(
+                fn=lambda: [None,None,"任意"]*3 + ["不使用", None, "fs", None, "Stable"] + ["不使用", []],
+                outputs=inputs
+            )
+
+
+        with gr.Tab("核素查找"):
+            gr.Markdown("## 核素查找")
+            with gr.Row():
+                with gr.Column(scale=3):
+                    searchingMode = gr.Radio(["核素名称", "质子数(Z)、中子数(N)", "质子数(Z)、质量数(A)", "中子数(N)、质量数(A)"], value="核素名称", label="查找模式", interactive=True, type="index")
+                    gr.Markdown("### 根据核素名称查找")
+                    nuclide_in = gr.Textbox(value=None, info="请输入由质量数及元素名称所组成的核素名称，示例：232Th、232TH、th232、232-Th、th-232等。\n只要不太离谱就能识别……大概？")
+                    gr.Markdown("### 根据质子数(Z)、中子数(N)、质量数(A)查找")
+                    with gr.Row():
+                        Z_in = gr.Number(value=0, label="质子数(Z)", precision=0, interactive=False)
+                        N_in = gr.Number(value=0, label="中子数(N)", precision=0, interactive=False)
+                        A_in = gr.Number(value=0, label="质量数(A)", precision=0, interactive=False)
+                    previewMode = gr.Radio(["紧凑", "常规"], value="紧凑", type="index", label="预览模式")
+                    outputFileType = gr.Radio(["json", "csv"], value="json", type="index", label="导出文件格式")
+                    with gr.Row():
+                        submit_btn2 = gr.Button("查找", variant="primary")
+                        reset_btn2 = gr.Button("重置条件", variant="primary")
+
+                with gr.Column(scale=2):
+                    result_text2 = gr.Textbox(interactive=False, show_label=False)
+                    preview_df = gr.Dataframe(label="数据预览", interactive=False)
+                    result_file2 = gr.File(interactive=False)
+                    chain_text2 = gr.Textbox(label="衰变链", interactive=False, show_copy_button=True)
+
+            searchingMode.change(
+                fn=update_inputs2,
+                inputs=searchingMode,
+                outputs=[nuclide_in, Z_in, N_in, A_in]
+            )
+
+            inputs2 = [
+                searchingMode,
+                nuclide_in,
+                Z_in, N_in, A_in,
+                previewMode, outputFileType
+            ]
+
+            submit_btn2.click(
+                fn=process_search,
+                inputs=inputs2,
+                outputs=[result_text2, preview_df, result_file2, chain_text2]
+            )
+
+            reset_btn2.click(
+                fn=lambda: [None]*4,
+                outputs=[nuclide_in, Z_in, N_in, A_in]
+            )
+
+        with gr.Tab("核素图绘制"):
+            gr.Markdown("""
                     ## 核素图绘制
 
-                    可根据半衰期、衰变模式、合成方法等分类模式绘制核素图。
+                    可根据半衰期、衰变模式、合成方法、同核异能态等分类模式绘制核素图。
 
                     部分代码参考了Ming-Hao-Zhang的[Nuclei-Chart-Generator](https://github.com/Ming-Hao-Zhang/Nuclei-Chart-Generator)
                     """)
-        with gr.Row():
-            with gr.Column(scale=3):
-                img_preview = gr.Plot(label="图片预览")
-            with gr.Column(scale=2):
-                plot_mode = gr.Radio(["寿命", "衰变模式", "合成方法"], value="寿命", label="核素分类模式", type="index")
-                text_mode = gr.Radio(["无", "元素名称", "核素名称", "详细信息"], value="无", label="显示信息", type="index")
-                have_legend_idx = gr.Radio(["显示图例", "隐藏图例"], value="显示图例", label="图例", type="index")
-                file_type3 = gr.Radio(["svg", "png"], value="svg", label="导出格式", info="png为位图格式，svg为矢量图格式。\n显示详细信息时，受分辨率限制，png格式将会失真。如需高清晰度图像，请使用svg。")
-
-                with gr.Accordion(open=False, label="更多选项") as filter3:
-                    gr.Markdown("根据质子数(Z)、中子数(N)筛选 (未启用)")
-                    using_filter = gr.Radio(["不使用", "使用"], value="不使用", show_label=False, type='index', interactive=False)
-                    with gr.Row():
-                        with gr.Column(min_width=120):
-                            gr.Markdown("质子数(Z)")
-                            Z_min = gr.Number(label="最小值", precision=0, interactive=False)
-                            Z_max = gr.Number(label="最大值", precision=0, interactive=False)
-                        with gr.Column(min_width=120):
-                            gr.Markdown("中子数(N)")
-                            N_min = gr.Number(label="最小值", precision=0, interactive=False)
-                            N_max = gr.Number(label="最大值", precision=0, interactive=False)
-
-                with gr.Row():
-                    submit_btn3 = gr.Button("绘制", variant="primary")
-                    reset_btn3 = gr.Button("重置条件", variant="primary")
-
-                result_file3 = gr.File(interactive=False)
-
-        using_filter.change(
-            fn=update_inputs3,
-            inputs=using_filter,
-            outputs=[Z_min, Z_max, N_min, N_max]
-        )
-
-        filter3.collapse(
-            fn=lambda: "不使用",
-            outputs= using_filter
-        )
+            with gr.Row():
+                with gr.Column(scale=3):
+                    img_preview = gr.Image(label="图片预览", type="filepath", interactive=False)
+                with gr.Column(scale=2):
+                    plot_mode = gr.Radio(["寿命", "衰变模式", "合成方法", "同核异能态"], value="寿命", label="核素分类模式", type="index")
+                    text_mode = gr.Radio(["无", "元素名称", "核素名称", "详细信息"], value="无", label="显示信息", type="index")
+                    have_legend_idx = gr.Radio(["显示图例", "隐藏图例"], value="显示图例", label="图例", type="index")
+                    file_type3 = gr.Radio(["svg", "png"], value="svg", label="导出格式", info="png为位图格式，svg为矢量图格式。\n显示详细信息时，受分辨率限制，png格式将会失真。如需高清晰度图像，请使用svg。")
+
+                    with gr.Accordion(open=False, label="更多选项") as filter3:
+                        gr.Markdown("根据质子数(Z)、中子数(N)筛选")
+                        using_filter = gr.Radio(["不使用", "使用"], value="不使用", show_label=False, type='index', interactive=True)
+                        with gr.Row():
+                            with gr.Column(min_width=120):
+                                gr.Markdown("质子数(Z)")
+                                Z_min = gr.Number(label="最小值", precision=0, interactive=False)
+                                Z_max = gr.Number(label="最大值", precision=0, interactive=False)
+                            with gr.Column(min_width=120):
+                                gr.Markdown("中子数(N)")
+                                N_min = gr.Number(label="最小值", precision=0, interactive=False)
+                                N_max = gr.Number(label="最大值", precision=0, interactive=False)
 
-        inputs3 = [plot_mode, text_mode, have_legend_idx, file_type3, using_filter, Z_min, Z_max, N_min, N_max]
-
-        submit_btn3.click(
-            fn=process_plot,
-            inputs=inputs3,
-            outputs=[img_preview, result_file3]
-        )
-
-        reset_btn3.click(
-            fn=lambda: ["寿命", "无", "显示图例", "svg", "不使用"] + [None]*4,
-            outputs=inputs3
-        )
-
-    demo.launch()
\ No newline at end of file
+                    with gr.Row():
+                        submit_btn3 = gr.Button("绘制", variant="primary")
+                        reset_btn3 = gr.Button("重置条件", variant="primary")
+
+                    result_file3 = gr.File(interactive=False)
+
+            using_filter.change(
+                fn=update_inputs3,
+                inputs=using_filter,
+                outputs=[Z_min, Z_max, N_min, N_max]
+            )
+
+            filter3.collapse(
+                fn=lambda: "不使用",
+                outputs= using_filter
+            )
+
+            inputs3 = [plot_mode, text_mode, have_legend_idx, file_type3, using_filter, Z_min, Z_max, N_min, N_max]
+
+            submit_btn3.click(
+                fn=process_plot,
+                inputs=inputs3,
+                outputs=[img_preview, result_file3],
+                concurrency_limit=render_pool.max_queue
+            )
+
+            reset_btn3.click(
+                fn=lambda: ["寿命", "无", "显示图例", "svg", "不使用"] + [None]*4,
+                outputs=inputs3
+            )
+    return demo
+
+## 直接运行时构建界面并启动服务；被导入时只构建界面，不启动服务
+if __name__ == "__main__":
+    demo = buildDemo()
+    warmUp()
+    render_pool.start()
+    ## 导出文件区的后台清理
+    NDfiles.export_area.start()
+    ## 结果文件及核素图位于缓存目录，与工作目录无关
+    demo.launch(allowed_paths=[NDpaths.cache_dir])
+elif __name__ != "__mp_main__":
+    demo = buildDemo()
\ No newline at end of file
@@ -0,0 +1,59 @@
+## 无显示信息核素图的基准测试：matplotlib绘制与NDchart直接写出两种方式
+## 用法：在仓库根目录下运行 python benchmarks/bench_chart_writer.py [plot_mode ...]
+## 同时给出两种方式所得png的平均像素差(0~255)
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+import NDchart
+import NDplot
+
+def benchMatplotlib(plot_mode, area, fmts=("svg", "png")):
+    result = {"writer": "matplotlib", "plot_mode": plot_mode}
+    images = {}
+    for fmt in fmts:
+        start = time.perf_counter()
+        fig = NDplot.nucildesChartPlotPLT(plot_mode, area, 0, True)
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format=fmt)
+        NDplot.closeFigure(fig)
+        result[fmt + "_sec"] = time.perf_counter() - start
+        result[fmt + "_bytes"] = buffer.tell()
+        images[fmt] = buffer.getvalue()
+    return result, images
+
+def benchDirect(plot_mode, area, fmts=("svg", "png")):
+    result = {"writer": "NDchart", "plot_mode": plot_mode}
+    images = {}
+    for fmt in fmts:
+        start = time.perf_counter()
+        data = NDchart.chartBytes(plot_mode, area, 0, True, fmt)
+        result[fmt + "_sec"] = time.perf_counter() - start
+        result[fmt + "_bytes"] = len(data)
+        images[fmt] = data
+    return result, images
+
+def pngDifference(data_a, data_b):
+    from PIL import Image
+    image_a = np.asarray(Image.open(io.BytesIO(data_a)).convert("RGB"), dtype=np.int16)
+    image_b = np.asarray(Image.open(io.BytesIO(data_b)).convert("RGB"), dtype=np.int16)
+    if image_a.shape != image_b.shape:
+        return None
+    return float(np.abs(image_a - image_b).mean())
+
+if __name__ == "__main__":
+    plot_modes = [int(arg) for arg in sys.argv[1:]] or [0, 1, 2]
+    area = ((0,0),(118,177))
+    ## 预热数据集及字体，排除首次读取文件的时间
+    NDchart.chartGeometry(0, area)
+    for plot_mode in plot_modes:
+        result_plt, images_plt = benchMatplotlib(plot_mode, area)
+        result_direct, images_direct = benchDirect(plot_mode, area)
+        result_direct["png_mean_abs_diff"] = pngDifference(images_plt["png"], images_direct["png"])
+        print(result_plt)
+        print(result_direct)
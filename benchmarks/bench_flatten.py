@@ -0,0 +1,44 @@
+## 核素数据展开基准测试：逐个核素生成DataFrame再合并与一次性展开两种方式
+## 用法：在仓库根目录下运行 python benchmarks/bench_flatten.py [重复次数]
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import NDdata
+import NDfilter
+
+def benchFlatten(nuclides_data, repeat=3):
+    result = {"nuclides": len(nuclides_data)}
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        frames = [NDfilter.nuclideData_dict2dataframe(data) for data in nuclides_data.values()]
+        per_nuclide = pd.concat(frames, ignore_index=True)
+    result["per_nuclide_sec"] = (time.perf_counter() - start) / repeat
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        bulk = NDfilter.nuclidesData_dict2dataframe(nuclides_data)
+    result["bulk_sec"] = (time.perf_counter() - start) / repeat
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        NDfilter.nuclidesData_dict2dataframe(nuclides_data.table)
+    result["bulk_table_sec"] = (time.perf_counter() - start) / repeat
+
+    result["rows"] = len(bulk)
+    result["same_rows"] = len(per_nuclide) == len(bulk) and (per_nuclide["Nuclide"] == bulk["Nuclide"]).all()
+    result["bulk_bytes"] = int(bulk.memory_usage(deep=True).sum())
+    return result
+
+if __name__ == "__main__":
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    nuclides_data = NDdata.getNuclides(NDfilter.nuclides_data_path)
+    ## 预先解析全部核素，排除首次解析的时间
+    for data in nuclides_data.values():
+        pass
+    print(benchFlatten(nuclides_data, repeat))
@@ -0,0 +1,46 @@
+## 半衰期筛选基准测试：逐一比较全部能级与经排序索引查询两种方式
+## 用法：在仓库根目录下运行 python benchmarks/bench_halflife_index.py [重复次数]
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import NDdata
+import NDfilter
+
+## 各查询的(下限, 上限)，单位为秒
+queries = [
+    (0, None),
+    (1, None),
+    (3.15e7, None),
+    (1e-9, 1e-6),
+    (1, 3600),
+    (86400, 3.15e10),
+    (None, None),
+]
+
+def benchHalflife(table, hl_min_sec, hl_max_sec, repeat=200):
+    result = {"hl_min_sec": hl_min_sec, "hl_max_sec": hl_max_sec}
+    for name, method in (("scan", table.maskHalflifeScan), ("index", table.maskHalflife)):
+        method(hl_min_sec, hl_max_sec)
+        start = time.perf_counter()
+        for _ in range(repeat):
+            mask = method(hl_min_sec, hl_max_sec)
+        result[name + "_us"] = (time.perf_counter() - start) / repeat * 1e6
+        result[name + "_count"] = int(np.count_nonzero(mask))
+
+    ## 经NDfilter筛选出字典的完整开销
+    nuclides_data = NDdata.getNuclides(NDfilter.nuclides_data_path)
+    start = time.perf_counter()
+    NDfilter.nuclidesFilterHalflife(nuclides_data, hl_min_sec, hl_max_sec)
+    result["filter_us"] = (time.perf_counter() - start) * 1e6
+    return result
+
+if __name__ == "__main__":
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    table = NDdata.getNuclides(NDfilter.nuclides_data_path).table
+    for hl_min_sec, hl_max_sec in queries:
+        print(benchHalflife(table, hl_min_sec, hl_max_sec, repeat))
@@ -0,0 +1,54 @@
+## 导入时间基准测试：各使用场景在新进程中冷启动的耗时，以及是否载入了pandas、matplotlib、gradio
+## 各进程的工作目录为临时目录，同时检查数据路径与工作目录无关
+## 用法：在仓库根目录下运行 python benchmarks/bench_import.py [重复次数]
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+package_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+## 各场景执行的代码
+scenarios = {
+    "numpy": "import numpy",
+    "pandas": "import pandas",
+    "matplotlib.pyplot": "import matplotlib.pyplot",
+    "gradio": "import gradio",
+    "lookup": "import NDlookup; list(NDlookup.resolveMany(['232Th', 'U235']))",
+    "filter": "import NDdata, NDfilter; NDfilter.nuclidesFilterHalflife(NDfilter.nuclidesFilterZNA(NDdata.getNuclides(NDfilter.nuclides_data_path), 80, 100), 3600)",
+    "export": "import NDdata, NDexport, NDpaths; table = NDdata.getNuclides(NDpaths.nuclides_data_path).table; NDexport.exportMasked(table, table.maskZNA(90, 92), 'out.csv', 'csv')",
+    "plot": "import NDplot",
+    "app": "import app",
+}
+
+heavy_modules = ("pandas", "matplotlib", "gradio")
+
+child_template = """
+import os, sys, time, json
+start = time.perf_counter()
+sys.path.insert(0, {package_dir!r})
+{code}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"sec": elapsed, "loaded": [name for name in {heavy_modules!r} if name in sys.modules]}}))
+"""
+
+def benchScenario(name, repeat=3):
+    code = child_template.format(package_dir=package_dir, code=scenarios[name], heavy_modules=heavy_modules)
+    times = []
+    loaded = None
+    with tempfile.TemporaryDirectory() as work_dir:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            output = subprocess.run([sys.executable, "-c", code], cwd=work_dir, capture_output=True, text=True, check=True).stdout
+            wall = time.perf_counter() - start
+            result = json.loads(output.strip().splitlines()[-1])
+            times.append((result["sec"], wall))
+            loaded = result["loaded"]
+    return {"scenario": name, "import_sec": min(t[0] for t in times), "process_sec": min(t[1] for t in times), "loaded": loaded}
+
+if __name__ == "__main__":
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    for name in scenarios:
+        print(benchScenario(name, repeat))
@@ -0,0 +1,235 @@
+## 基准测试集：筛选、查找、分类、表格生成及核素图绘制，使用随附的数据集
+## 各项给出耗时(首次调用、最小值、中位数)、峰值内存及调用返回时仍占用的内存块数，结果以json输出，可与之前的结果比较
+## 耗时与内存分开测量：内存由tracemalloc跟踪，跟踪时执行变慢，只测一次
+## tracemalloc只记录经Python分配的内存，matplotlib(Agg)的绘图缓冲区等不计入
+## 用法：在仓库根目录下运行 python benchmarks/bench_suite.py [-k 名称的正则] [-r 重复次数] [-o 结果文件]
+##       [--compare 之前的结果文件] [--tolerance 倍数] [--thresholds 阈值文件]
+## 有超出阈值或较之前变慢、变大的项时以状态1退出
+import argparse
+import gc
+import io
+import json
+import os
+import platform
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+import NDdata
+import NDfilter
+import NDrender
+
+thresholds_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "thresholds.json")
+
+## 未指定重复次数时，按首次调用的耗时重复至约target_sec，次数在[min_repeat, max_repeat]之间
+## 首次调用超过slow_sec的项(如绘图)只重复一次
+target_sec = 0.2
+min_repeat = 3
+max_repeat = 1000
+slow_sec = 1.0
+
+## 比较时耗时的绝对余量，微秒级的项不因计时抖动判为变慢
+slack_sec = 0.001
+
+## 表格生成所用的核素：按名称排序后每隔dataframe_stride个取一个
+dataframe_stride = 36
+
+## 各测试项：(名称, 无参函数)
+def benchCases():
+    nuclides_data = NDdata.getNuclides(NDfilter.nuclides_data_path)
+    data_path = NDfilter.nuclides_data_path
+    sample = sorted(nuclides_data.keys())[::dataframe_stride]
+
+    cases = [
+        ("filter_ZNA", lambda: NDfilter.nuclidesFilterZNA(nuclides_data, 20, 100, 1, 30, 150, 0, None, None, 0)),
+        ("filter_ZNA_all", lambda: NDfilter.nuclidesFilterZNA(nuclides_data)),
+        ("filter_halflife", lambda: NDfilter.nuclidesFilterHalflife(nuclides_data, 1, 3.15e7)),
+        ("filter_halflife_stable", lambda: NDfilter.nuclidesFilterHalflife(nuclides_data, 3.15e15, None)),
+        ("filter_decaymodes_and", lambda: NDfilter.nuclidesFilterDecayModes(nuclides_data, 1, ["B-", "B-N"])),
+        ("filter_decaymodes_or", lambda: NDfilter.nuclidesFilterDecayModes(nuclides_data, 2, ["A", "SF", "P"])),
+        ("filter_isomers", lambda: NDfilter.nuclidesFilterIsomers(nuclides_data, 1e-3, None, None, 500)),
+        ("search_nom", lambda: NDfilter.nuclidesSearchingNom(nuclides_data, "232Th")),
+        ("search_ZN", lambda: NDfilter.nuclidesSearchingZN(nuclides_data, 90, 142)),
+        ("search_ZA", lambda: NDfilter.nuclidesSearchingZA(nuclides_data, 90, 232)),
+        ("search_NA", lambda: NDfilter.nuclidesSearchingNA(nuclides_data, 142, 232)),
+        ("classify_halflife", lambda: NDfilter.nuclidesClassifyHalflife(data_path)),
+        ("classify_decaymode", lambda: NDfilter.nuclidesClassifyDecayMode(data_path)),
+        ("dataframe", lambda: [NDfilter.nuclideData_dict2dataframe(nuclides_data[name]) for name in sample]),
+        ("dataframe_compact", lambda: [NDfilter.nuclideData_dict2dataframeCompact(nuclides_data[name]) for name in sample]),
+        ("decay_chains", decayChains(nuclides_data)),
+        ("decay_graph", decayGraph(nuclides_data)),
+    ]
+
+    ## 核素图：全图，各分类模式与显示信息的组合，绘制并导出png
+    for plot_mode in (0, 1, 2):
+        for text_mode in (0, 1, 2, 3):
+            cases.append((f"chart_plt[{plot_mode},{text_mode}]", chartPLT(plot_mode, text_mode)))
+    for plot_mode in (0, 1, 2):
+        for fmt in ("svg", "png"):
+            cases.append((f"chart_direct_{fmt}[{plot_mode},0]", chartDirect(plot_mode, fmt)))
+    return cases
+
+## 衰变链：若干重核及裂变产物，各自一组初始量，60个时刻
+def decayChains(nuclides_data):
+    import NDdecay
+    NDdecay.networkOf(nuclides_data)
+    inventories = [{name: 1.0} for name in ("238U", "235U", "232Th", "241Am", "252Cf", "137Cs", "90Sr", "99Mo")]
+    times = np.concatenate([[0], np.logspace(-6, 17, 59)])
+    return lambda: NDdecay.decayInventories(inventories, times, nuclides_data=nuclides_data)[1]
+
+## 衰变图：构建后查找若干核素的全部子孙及祖先核素，每次重新构建，不含闭包缓存的效果
+def decayGraph(nuclides_data):
+    import NDdecay
+    names = ("238U", "235U", "232Th", "252Cf", "206Pb", "208Pb", "137Cs", "12C")
+    def run():
+        graph = NDdecay.DecayGraph(nuclides_data)
+        return [graph.descendants(name) + graph.ancestors(name) for name in names]
+    return run
+
+def chartPLT(plot_mode, text_mode, fmt="png"):
+    import NDplot
+    def run():
+        fig = NDplot.nucildesChartPlotPLT(plot_mode, ((0,0),(118,177)), text_mode, True)
+        try:
+            buffer = io.BytesIO()
+            fig.savefig(buffer, format=fmt)
+            return buffer.getvalue()
+        finally:
+            NDplot.closeFigure(fig)
+    return run
+
+def chartDirect(plot_mode, fmt):
+    import NDchart
+    return lambda: NDchart.chartBytes(plot_mode, ((0,0),(118,177)), 0, True, fmt)
+
+## 结果的大小：字节数、条目数或行数
+def resultSize(result):
+    if isinstance(result, (bytes, str)):
+        return len(result)
+    if isinstance(result, list) and len(result) > 0 and hasattr(result[0], "shape"):
+        return int(sum(item.shape[0] for item in result))
+    if hasattr(result, "__len__"):
+        return len(result)
+    return None if result is None else 1
+
+def runCase(name, fn, repeat=None):
+    gc.collect()
+    start = time.perf_counter()
+    result = fn()
+    first_sec = time.perf_counter() - start
+    size = resultSize(result)
+    del result
+
+    if repeat is None:
+        if first_sec > slow_sec:
+            repeat = 1
+        else:
+            repeat = int(min(max_repeat, max(min_repeat, target_sec / max(first_sec, 1e-9))))
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    ## 峰值内存为调用期间相对于调用前的最大增量，内存块数为返回时仍占用的由本次调用分配的块(含返回值)
+    gc.collect()
+    tracemalloc.start()
+    base, _ = tracemalloc.get_traced_memory()
+    result = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    alloc_blocks = len(tracemalloc.take_snapshot().traces)
+    tracemalloc.stop()
+    del result
+
+    return {
+        "case": name,
+        "repeat": repeat,
+        "first_sec": first_sec,
+        "min_sec": min(times),
+        "median_sec": statistics.median(times),
+        "mean_sec": statistics.fmean(times),
+        "peak_bytes": peak - base,
+        "alloc_blocks": alloc_blocks,
+        "result_size": size
+    }
+
+def runSuite(pattern=None, repeat=None, log=None):
+    results = []
+    for name, fn in benchCases():
+        if not pattern is None and re.search(pattern, name) is None:
+            continue
+        result = runCase(name, fn, repeat)
+        results.append(result)
+        if not log is None:
+            print(f"{name}: median {result['median_sec'] * 1e3:.3f} ms, peak {result['peak_bytes'] / 2**20:.2f} MiB, {result['alloc_blocks']} blocks", file=log)
+    return results
+
+def environmentInfo():
+    import matplotlib
+    import pandas
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "pandas": pandas.__version__,
+        "matplotlib": matplotlib.__version__,
+        "dataset_hash": NDrender.chartDatasetHash(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S")
+    }
+
+## 与阈值及之前的结果比较，返回超出的项
+## 阈值文件为{名称: {"median_sec": 上限, "peak_bytes": 上限}}，之前的结果按tolerance倍判断
+def findRegressions(results, thresholds=None, baseline=None, tolerance=1.5):
+    regressions = []
+    previous = {}
+    if not baseline is None:
+        previous = {result["case"]: result for result in baseline["results"]}
+    for result in results:
+        name = result["case"]
+        for metric in ("median_sec", "peak_bytes"):
+            slack = slack_sec if metric == "median_sec" else 0
+            limit = None if thresholds is None else thresholds.get(name, {}).get(metric)
+            if not limit is None and result[metric] > limit:
+                regressions.append({"case": name, "metric": metric, "value": result[metric], "threshold": limit})
+            old = previous.get(name)
+            if not old is None and result[metric] > old[metric] * tolerance + slack:
+                regressions.append({"case": name, "metric": metric, "value": result[metric], "baseline": old[metric], "tolerance": tolerance})
+    return regressions
+
+def readJson(path):
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="基准测试集")
+    parser.add_argument("-k", "--pattern", default=None)
+    parser.add_argument("-r", "--repeat", type=int, default=None)
+    parser.add_argument("-o", "--output", default="-")
+    parser.add_argument("--compare", default=None)
+    parser.add_argument("--tolerance", type=float, default=1.5)
+    parser.add_argument("--thresholds", default=thresholds_path)
+    args = parser.parse_args()
+
+    ## 预先读取数据集，排除首次读取文件的时间
+    NDdata.getNuclides(NDfilter.nuclides_data_path)
+    results = runSuite(args.pattern, args.repeat, log=sys.stderr)
+
+    thresholds = readJson(args.thresholds) if not args.thresholds in (None, "") and os.path.exists(args.thresholds) else None
+    baseline = readJson(args.compare) if not args.compare is None else None
+    regressions = findRegressions(results, thresholds, baseline, args.tolerance)
+
+    report = {"environment": environmentInfo(), "results": results, "regressions": regressions}
+    if args.output == "-":
+        print(json.dumps(report, indent=2))
+    else:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+    for regression in regressions:
+        print("regression:", json.dumps(regression), file=sys.stderr)
+    sys.exit(1 if len(regressions) > 0 else 0)
@@ -0,0 +1,33 @@
+## 核素图文本层基准测试：逐个ax.text与合并为PathCollection两种方式
+## 用法：在仓库根目录下运行 python benchmarks/bench_text_layer.py [text_mode ...]
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import NDplot
+
+def benchTextLayer(text_mode, batched_text, fmts=("svg", "png")):
+    result = {"text_mode": text_mode, "batched_text": batched_text}
+    start = time.perf_counter()
+    fig = NDplot.nucildesChartPlotPLT(0, ((0,0),(118,177)), text_mode, True, batched_text=batched_text)
+    result["build_sec"] = time.perf_counter() - start
+    result["artists"] = len(fig.axes[0].texts) + len(fig.axes[0].collections)
+    for fmt in fmts:
+        buffer = io.BytesIO()
+        start = time.perf_counter()
+        fig.savefig(buffer, format=fmt)
+        result[fmt + "_sec"] = time.perf_counter() - start
+        result[fmt + "_bytes"] = buffer.tell()
+    NDplot.closeFigure(fig)
+    return result
+
+if __name__ == "__main__":
+    text_modes = [int(arg) for arg in sys.argv[1:]] or [1, 2, 3]
+    ## 预热数据集，排除首次读取文件的时间
+    NDplot.nucildesChartPlotPLTText(0, 0, 0, 118, 177)
+    for text_mode in text_modes:
+        for batched_text in (False, True):
+            print(benchTextLayer(text_mode, batched_text))